@@ -0,0 +1,240 @@
+"""
+catalog.py
+==========
+
+Holds a small SQLite catalogue of the metadata held in the headers of NASA Ames
+files, so that questions such as "which files hold methane between two dates"
+can be answered without re-reading every file. Example:
+
+import nappy.catalog
+
+# Scan a directory of files (only new or modified files are read)
+nappy.catalog.scan(["/data/faam/core"], catalog_file="faam.sqlite", workers=8)
+
+# Find files with a methane variable starting in July 2019
+paths = nappy.catalog.query("faam.sqlite", variable="methane",
+                            start_date="2019-07-01", end_date="2019-07-31")
+
+Only the file headers are read (using ``openNAFile(..., header_only=True)``).
+The catalogue records the size and modification time of each file and a
+re-scan only reads files that are new or have changed since the last scan.
+
+"""
+
+# Imports from python standard library
+import os
+import json
+import fnmatch
+import sqlite3
+import logging
+import concurrent.futures
+
+# Imports from nappy package
+import nappy.nappy_api
+import nappy.utils.na_cache
+
+log = logging.getLogger(__name__)
+
+_schema = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    ffi INTEGER,
+    date TEXT,
+    oname TEXT,
+    org TEXT,
+    sname TEXT,
+    mname TEXT,
+    xname TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS variables (
+    path TEXT,
+    kind TEXT,
+    name TEXT,
+    units TEXT,
+    long_name TEXT
+);
+CREATE INDEX IF NOT EXISTS variables_name ON variables (name);
+CREATE INDEX IF NOT EXISTS variables_path ON variables (path);
+CREATE INDEX IF NOT EXISTS files_date ON files (date);
+"""
+
+
+def getDefaultCatalogFile():
+    "Returns the path of the default catalogue file (in the nappy cache directory)."
+    return os.path.join(nappy.utils.na_cache.getCacheDir(), "catalog.sqlite")
+
+
+def _connect(catalog_file):
+    "Returns a connection to the catalogue, creating it if required."
+    catalog_dir = os.path.dirname(os.path.abspath(catalog_file))
+    if not os.path.isdir(catalog_dir):
+        os.makedirs(catalog_dir)
+
+    conn = sqlite3.connect(catalog_file)
+    conn.executescript(_schema)
+    return conn
+
+
+def _findFiles(paths, pattern):
+    "Returns a sorted list of the files in ``paths`` (files or directories) matching ``pattern``."
+    if isinstance(paths, str):
+        paths = [paths]
+
+    files = set()
+
+    for path in paths:
+        if os.path.isdir(path):
+            for (dir_path, dir_names, file_names) in os.walk(path):
+                for file_name in fnmatch.filter(file_names, pattern):
+                    files.add(os.path.abspath(os.path.join(dir_path, file_name)))
+        else:
+            files.add(os.path.abspath(path))
+
+    return sorted(files)
+
+
+def _readHeaderRecord(path):
+    """
+    Reads the header of NASA Ames file ``path`` and returns a tuple of:
+    (file_row, variable_rows) to insert into the catalogue. Errors are recorded
+    in the file row rather than raised.
+    """
+    stat = os.stat(path)
+    file_row = [path, stat.st_size, stat.st_mtime_ns] + [None] * 8
+    variable_rows = []
+
+    try:
+        fin = nappy.nappy_api.openNAFile(path, header_only=True)
+    except Exception as err:
+        file_row[-1] = "%s: %s" % (type(err).__name__, err)
+        return (file_row, variable_rows)
+
+    file_row[3:10] = [fin.FFI, "%04d-%02d-%02d" % tuple(fin.DATE), fin.ONAME, fin.ORG,
+                      fin.SNAME, fin.MNAME, json.dumps(fin.XNAME)]
+
+    for (kind, names, variables) in (("X", fin.XNAME, fin.getIndependentVariables()),
+                                     ("V", fin.VNAME, fin.getVariables()),
+                                     ("A", fin.ANAME or [], fin.getAuxVariables())):
+        for (long_name, variable) in zip(names, variables):
+            variable_rows.append((path, kind, variable[0], variable[1], long_name))
+
+    return (file_row, variable_rows)
+
+
+def scan(paths, catalog_file=None, workers=None, pattern="*.na"):
+    """
+    Scans the NASA Ames files in ``paths`` (a list of files and/or directories,
+    searched recursively for files matching ``pattern``) and records their header
+    metadata in the SQLite catalogue ``catalog_file`` (default is
+    "catalog.sqlite" in the nappy cache directory). Headers are read in parallel
+    over ``workers`` processes (default is the number of CPUs; if 1 they are read
+    in the current process).
+
+    Only files that are new or whose size or modification time has changed are
+    read. Entries for files that no longer exist are removed. Returns the list of
+    files that were (re-)read.
+    """
+    catalog_file = catalog_file or getDefaultCatalogFile()
+    conn = _connect(catalog_file)
+
+    try:
+        known = dict([(row[0], (row[1], row[2])) for row in
+                      conn.execute("SELECT path, size, mtime_ns FROM files")])
+
+        to_read = []
+        for path in _findFiles(paths, pattern):
+            stat = os.stat(path)
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                to_read.append(path)
+
+        if workers == 1 or len(to_read) < 2:
+            records = [_readHeaderRecord(path) for path in to_read]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                records = list(executor.map(_readHeaderRecord, to_read, chunksize=64))
+
+        removed = [path for path in known if not os.path.isfile(path)]
+
+        with conn:
+            for path in removed + to_read:
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                conn.execute("DELETE FROM variables WHERE path = ?", (path,))
+
+            conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [record[0] for record in records])
+            conn.executemany("INSERT INTO variables VALUES (?, ?, ?, ?, ?)",
+                             [row for record in records for row in record[1]])
+    finally:
+        conn.close()
+
+    for (file_row, variable_rows) in records:
+        if file_row[-1]:
+            log.warning("Could not read header of %s: %s" % (file_row[0], file_row[-1]))
+
+    return to_read
+
+
+def query(catalog_file=None, variable=None, start_date=None, end_date=None,
+          ffi=None, **like):
+    """
+    Returns a sorted list of the paths of the files in the catalogue that match
+    all of the given criteria:
+
+    variable - a case-insensitive substring to match against the name (or full
+               name, including units) of any variable in the file.
+    start_date, end_date - "YYYY-MM-DD" strings; the first date of the data
+               (DATE) must lie between them (inclusive).
+    ffi - the File Format Index.
+    like - any of oname, org, sname or mname set to a case-insensitive substring
+               to match against that header item.
+    """
+    clauses = ["error IS NULL"]
+    args = []
+
+    if variable is not None:
+        clauses.append("path IN (SELECT path FROM variables WHERE name LIKE ? OR long_name LIKE ?)")
+        args.extend(["%" + variable + "%"] * 2)
+
+    if start_date is not None:
+        clauses.append("date >= ?")
+        args.append(start_date)
+
+    if end_date is not None:
+        clauses.append("date <= ?")
+        args.append(end_date)
+
+    if ffi is not None:
+        clauses.append("ffi = ?")
+        args.append(int(ffi))
+
+    for (key, value) in like.items():
+        if key not in ("oname", "org", "sname", "mname"):
+            raise Exception("Cannot query catalogue on unknown item: '%s'." % key)
+
+        clauses.append("%s LIKE ?" % key)
+        args.append("%" + value + "%")
+
+    conn = _connect(catalog_file or getDefaultCatalogFile())
+    try:
+        rows = conn.execute("SELECT path FROM files WHERE %s ORDER BY path" % " AND ".join(clauses), args)
+        return [row[0] for row in rows]
+    finally:
+        conn.close()
+
+
+def getFileVariables(path, catalog_file=None):
+    """
+    Returns a list of (kind, name, units, long_name) tuples for the file ``path``
+    from the catalogue, where kind is "X", "V" or "A" for independent, main and
+    auxiliary variables.
+    """
+    conn = _connect(catalog_file or getDefaultCatalogFile())
+    try:
+        rows = conn.execute("SELECT kind, name, units, long_name FROM variables WHERE path = ? ORDER BY rowid",
+                            (os.path.abspath(path),))
+        return [tuple(row) for row in rows]
+    finally:
+        conn.close()
@@ -17,12 +17,18 @@ for individual FFIs. Each FFI class is held in an individual file.
 import sys
 import time
 import re
+import mmap
+import itertools
 from io import StringIO
 
+# Third-party imports
+import numpy as np
+
 # Imports from nappy package
 import nappy.na_file.na_core
 import nappy.utils.text_parser
 import nappy.utils.common_utils
+import nappy.utils.na_cache
 
 default_delimiter = nappy.utils.getDefault("default_delimiter")
 default_float_format = nappy.utils.getDefault("default_float_format")
@@ -52,15 +58,52 @@ class NAFile(nappy.na_file.na_core.NACore):
     the user forgets to close it.
     """
 
+    # Number of lines in each record when the data section is laid out
+    # regularly enough to be read by _readDataBlock (None if not supported)
+    block_record_lines = None
+
+    # Number of data lines formatted in memory before each write to the file
+    write_buffer_lines = 10000
+
     def __init__(self, filename, ignore_header_lines=0, mode="r", na_dict=None,
-                 var_and_units_callback=None):
+                 var_and_units_callback=None, mmap=False, cache=False, header_only=False,
+                 file_handle=None):
         """
         Initialization of class, decides if user wishes to read or write
         NASA Ames file.
+
+        If mmap is True (read mode only) the file is memory-mapped and an index of
+        the byte offsets of the data records is built so that ranges of records
+        can be read without parsing the rest of the file.
+
+        If cache is True (read mode only) the header and data are loaded from the
+        on-disk cache if the file is unchanged since it was cached, otherwise
+        the data is cached when it is read (see nappy.utils.na_cache).
+
+        If header_only is True (read mode only) the file is closed as soon as the
+        header has been read so the data section is never touched; readData()
+        cannot then be called.
+
+        If file_handle is given (read mode only) it is used instead of opening
+        the file again. It is rewound to the start before the header is read.
         """
         nappy.na_file.na_core.NACore.__init__(self)
         self.filename = filename
-        self._open(mode)
+        self.record_offsets = None
+        self._mmap = None
+        self.use_cache = cache
+        self._cached_data = None
+        self.header_only = header_only
+
+        # Numbers (indices into VNAME) of the variables held in V, or None if all are held
+        self.var_numbers = None
+
+        if file_handle is not None and mode == "r":
+            file_handle.seek(0)
+            self.file = file_handle
+            self.is_open = True
+        else:
+            self._open(mode)
 
         self.mode = mode
         self.ignore_header_lines = ignore_header_lines
@@ -70,7 +113,22 @@ class NAFile(nappy.na_file.na_core.NACore):
 
         if self.mode == "r":
             self._normalized_X = True
-            self.readHeader()
+            cached = None
+
+            if cache:
+                cached = nappy.utils.na_cache.loadCachedNADict(filename, ignore_header_lines)
+
+            if cached:
+                (header, self._cached_data) = cached
+                for (key, value) in header.items():
+                    setattr(self, key, value)
+            else:
+                self.readHeader()
+
+            if header_only:
+                self.close()
+            elif mmap:
+                self._buildRecordIndex()
         elif self.mode == "w":
             # Self flag to check if data written
             self.data_written = False
@@ -92,12 +150,13 @@ class NAFile(nappy.na_file.na_core.NACore):
         self.is_open = True
 
     def write(self, delimiter=default_delimiter, float_format=default_float_format,
-              annotation=False, no_header=False):
+              annotation=False, no_header=False, no_data=False):
         """
         Writes an na_dict to the file and then flushes it to ensure data not 
         being buffered.
         If annotation is True then add annotation column to left of file.
         If no_header is True then suppress writing the header and only write the data section. 
+        If no_data is True then only write the header (the na_dict does not need any data).
         """ 
         self.delimiter = delimiter
         self.float_format = float_format
@@ -121,17 +180,46 @@ class NAFile(nappy.na_file.na_core.NACore):
         if not no_header:
             self.writeHeader()
 
-        self.writeData()
+        if not no_data:
+            self.writeData()
         self.file.flush()
         
         # Set flag to make sure cannot try and write more data
         self.data_written = True
          
+    def _formatDataRows(self, rows, nvalues):
+        """
+        Returns a generator of data lines: one for each tuple of ``nvalues`` values
+        in ``rows``. Each line is formatted with a single format string rather
+        than by concatenating the formatted values.
+        """
+        row_format = self.format * nvalues
+        return ("%s\n" % (row_format % row).rstrip(" ,") for row in rows)
+
+    def _writeDataLines(self, lines):
+        """
+        Writes the data ``lines`` (each ending with a newline) to the file in
+        large buffered blocks, adding the annotation column if required.
+        """
+        prefix = getAnnotation("Data", self.annotation, delimiter=self.delimiter)
+        lines = iter(lines)
+
+        while True:
+            block = list(itertools.islice(lines, self.write_buffer_lines))
+            if not block: break
+
+            # Each line ends with a newline so joining on the prefix annotates every line
+            self.file.write(prefix + prefix.join(block) if prefix else "".join(block))
+
     def close(self):
         "Wrapper to builtin close file function."
         self.file.close()
         self.is_open = False
 
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+
     def _parseDictionary(self):
         """
         Parser for the optional na_dict argument containing a dictionary
@@ -325,14 +413,89 @@ class NAFile(nappy.na_file.na_core.NACore):
         self.NCOM = self._readLines(self.NNCOML)
         return self.NCOM
 
-    def readData(self):
+    def _readDataBlock(self, datalines):
+        """
+        Reads the whole data section from ``datalines`` into NumPy arrays in one
+        step. Returns True if the data was read or False if the section must be
+        read record by record. Overridden by FFIs that have a vectorised reader.
+        """
+        return False
+
+    def readData(self, x_range=None, variables=None):
         """
         Reads the data section of the file. This method actually calls a number
         of FFI specific methods to setup the data arrays (lists of lists) and
-        read the various data sections.
+        read the various data sections. Where the FFI supports it, regularly
+        laid out data sections are read straight into NumPy arrays instead.
+
+        If x_range is set to (start, stop) then only the records with an
+        independent variable value in that range (inclusive) are read. This is
+        only supported for FFIs with one independent variable. If the file was
+        opened with mmap=True only the lines holding those records are parsed.
+
+        If variables is set to a list of variable names (items of VNAME or the
+        names returned by getVariable) and/or numbers then V only holds those
+        variables, in that order, and ``self.var_numbers`` maps each item in V
+        back to its number in VNAME. For FFIs 1001, 1010 and 1020 the values of
+        other variables are skipped without being converted.
 
         This method can be called directly by the user.
         """
+        if self.header_only:
+            raise Exception("Cannot read data from NASA Ames file opened with header_only=True.")
+
+        self.var_numbers = self._getVarNumbers(variables)
+
+        if x_range is not None:
+            return self._readDataInRange(x_range)
+
+        if self._cached_data:
+            for (key, value) in self._cached_data.items():
+                setattr(self, key, value)
+            self.V = self._selectVariables(self.V)
+            return
+
+        self._readAllData()
+
+        if self.use_cache and self.var_numbers is None:
+            nappy.utils.na_cache.saveCachedNADict(self.filename, self, self.ignore_header_lines)
+
+    def _getVarNumbers(self, variables):
+        """
+        Returns a list of the numbers (indices into VNAME) of ``variables``, a list
+        of variable names and/or numbers, or None if ``variables`` is None.
+        """
+        if variables is None:
+            return None
+
+        var_names = [self.getVariable(n)[0] for n in range(self.NV)]
+        var_numbers = []
+
+        for var in variables:
+            if isinstance(var, (int, np.integer)) and 0 <= var < self.NV:
+                var_numbers.append(int(var))
+            elif var in self.VNAME:
+                var_numbers.append(self.VNAME.index(var))
+            elif var in var_names:
+                var_numbers.append(var_names.index(var))
+            else:
+                raise Exception(f"Variable name not known: {var}")
+
+        return var_numbers
+
+    def _selectVariables(self, v):
+        """
+        Returns the items of ``v`` (holding all variables) for the variables
+        selected in ``self.var_numbers``.
+        """
+        if self.var_numbers is None:
+            return v
+        return [v[n] for n in self.var_numbers]
+
+    def _readAllData(self):
+        """
+        Parses the whole data section into the data arrays.
+        """
         self._setupArrays()
 
         with open(self.filename) as fh:
@@ -340,6 +503,12 @@ class NAFile(nappy.na_file.na_core.NACore):
 
         datalines = self._checkForBlankLines(datalines)
 
+        if self._readDataBlock(datalines):
+            return
+
+        # Wrap the lines in a cursor so each FFI reader consumes them in place
+        datalines = nappy.utils.text_parser.LineCursor(datalines)
+
         # Set up loop over unbounded indpendent variable
         m = 0   # Unbounded independent variable mark        
         while len(datalines) > 0:
@@ -347,3 +516,242 @@ class NAFile(nappy.na_file.na_core.NACore):
             datalines = self._readData2(datalines, m)
             m = m + 1
 
+        self.V = self._selectVariables(self.V)
+
+    def _buildRecordIndex(self):
+        """
+        Memory-maps the file and builds ``self.record_offsets``: an array of the
+        byte offsets at which each data record starts, followed by the offset of
+        the end of the data section. This assumes every record spans
+        ``block_record_lines`` lines, so the number of items on every line is
+        checked against the record layout first; if it does not match (or the
+        layout is not known for the FFI) no index is built and reads of ranges
+        parse the whole file.
+        """
+        if self.NIV != 1 or not self.block_record_lines:
+            return
+
+        with open(self.filename, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Ignore empty lines at the end of the file
+        end = len(self._mmap)
+        while end > 0 and self._mmap[end - 1:end].isspace():
+            end -= 1
+
+        buffer = np.frombuffer(self._mmap, dtype=np.uint8, count=end)
+        line_offsets = np.concatenate(([0], np.flatnonzero(buffer == ord("\n")) + 1))
+        data_offsets = line_offsets[self.NLHEAD:]
+
+        if len(data_offsets) == 0 or len(data_offsets) % self.block_record_lines != 0:
+            return
+
+        # Records wrapped irregularly over lines (or blank lines) must not be indexed
+        nrecords = len(data_offsets) // self.block_record_lines
+        items_per_line = nappy.utils.text_parser.countItemsPerLine(buffer[data_offsets[0]:],
+                                                                   data_offsets - data_offsets[0])
+        del buffer
+
+        if not np.array_equal(items_per_line, np.tile(self._getRecordLineSizes(), nrecords)):
+            return
+
+        self.record_offsets = np.append(data_offsets[::self.block_record_lines], end)
+
+    def _getRecordLineSizes(self):
+        """
+        Returns a list of the number of items on each of the ``block_record_lines``
+        lines of a record in the regular layout read by _readDataBlock.
+        """
+        raise NotImplementedError
+
+    def _getRecordX(self, record):
+        """
+        Returns the unbounded independent variable value of record number
+        ``record`` using the record index.
+        """
+        start = self.record_offsets[record]
+        line = self._mmap[start:self.record_offsets[record + 1]].decode()
+        return float(line.split(None, 1)[0])
+
+    def _findRecord(self, value, side):
+        """
+        Returns the index of the first record whose independent variable value is
+        beyond ``value`` (by bisection of the record index). If side is "left"
+        records equal to ``value`` are included, if "right" they are excluded.
+        Copes with monotonic increasing and decreasing independent variables.
+        """
+        nrecords = len(self.record_offsets) - 1
+        sign = 1
+        if nrecords > 1 and self._getRecordX(nrecords - 1) < self._getRecordX(0):
+            sign = -1
+
+        (low, high) = (0, nrecords)
+        while low < high:
+            middle = (low + high) // 2
+            x = sign * self._getRecordX(middle)
+
+            if x < sign * value or (side == "right" and x == sign * value):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _readDataInRange(self, x_range):
+        """
+        Reads only the records with an independent variable in the inclusive
+        range ``x_range``. Uses the record index where available, otherwise
+        reads all the data and then selects the records in range.
+        """
+        if self.NIV != 1:
+            raise Exception("Reading a range of data is only supported for FFIs with one independent variable.")
+
+        (start, stop) = sorted(x_range)
+
+        if self.record_offsets is not None and len(self.record_offsets) > 1:
+            sign = 1 if self._getRecordX(0) <= self._getRecordX(len(self.record_offsets) - 2) else -1
+            (first, last) = sorted((start, stop), key=lambda x: sign * x)
+
+            first_record = self._findRecord(first, "left")
+            end_record = max(first_record, self._findRecord(last, "right"))
+
+            if end_record > first_record and self._readRecordRange(first_record, end_record):
+                return
+
+        # Index not available, no records found or records not regular so read everything and select
+        self.readData(variables=self.var_numbers)
+        self._selectRecordsInRange(start, stop)
+
+    def getNumRecords(self):
+        """
+        Returns the number of records (values of the unbounded independent
+        variable) in the data section from the record index, or None if the
+        file was not opened with mmap=True or could not be indexed.
+        """
+        if self.record_offsets is None:
+            return None
+        return len(self.record_offsets) - 1
+
+    def _readRecordRange(self, first_record, end_record):
+        """
+        Parses records ``first_record`` to ``end_record`` (exclusive) into the data
+        arrays using the record index. Returns False if they could not be read
+        as a block (in which case the data arrays are not usable).
+        """
+        block = self._mmap[self.record_offsets[first_record]:self.record_offsets[end_record]]
+        datalines = self._checkForBlankLines(block.decode().splitlines(True))
+
+        self._setupArrays()
+        return self._readDataBlock(datalines)
+
+    def _readIndependentValues(self):
+        """
+        Returns an array of the unbounded independent variable values of all
+        records using the record index. Only the first item of each record is
+        converted so this is much quicker than reading the data section.
+        """
+        block = self._mmap[self.record_offsets[0]:self.record_offsets[-1]].decode()
+        lines = [line for line in block.splitlines() if line.strip()][::self.block_record_lines]
+        return np.array([line.split(None, 1)[0] for line in lines], dtype=np.float64)
+
+    def _selectRecordsInRange(self, start, stop):
+        """
+        Reduces X, V and A to the records with an independent variable value between
+        ``start`` and ``stop`` (inclusive).
+        """
+        x = np.asarray(self.X, dtype=np.float64)
+        keep = (x >= start) & (x <= stop)
+        nvpm = self.NVPM or 1
+
+        self.X = x[keep]
+        self.V = [np.asarray(v, dtype=np.float64).reshape(len(x), nvpm)[keep].ravel() for v in self.V]
+
+        if self.NAUXV:
+            self.A = [np.asarray(a, dtype=np.float64)[keep] for a in self.A]
+
+    def iterData(self, chunk_rows=10000, variables=None):
+        """
+        Generator that reads the data section in chunks of up to ``chunk_rows``
+        records (values of the unbounded independent variable) so that memory
+        use does not grow with the length of the file. The header is not re-read.
+
+        Each chunk is yielded as a tuple of NumPy arrays (X, V, A) where:
+          * X holds the unbounded independent variable values for the chunk.
+          * V has shape (NV, n_records) for 1001 and 1010, (NV, n_records * NVPM)
+            for 1020 and (NV, n_records, *NX) for 2010, 3010 and 4010.
+          * A has shape (NAUXV, n_records), or is None if there are no
+            auxiliary variables.
+
+        If variables is set, V only holds those variables (see readData).
+
+        FFIs with variable length records (2110, 2160, 2310) are not supported.
+        The X, V and A attributes of the instance are restored when the
+        generator finishes.
+        """
+        if self.header_only:
+            raise Exception("Cannot read data from NASA Ames file opened with header_only=True.")
+
+        if self.FFI in (2110, 2160, 2310):
+            raise Exception("Reading data in chunks is not supported for FFI %s." % self.FFI)
+
+        saved_arrays = (self.X, self.V, self.A, self.var_numbers)
+        self.var_numbers = self._getVarNumbers(variables)
+
+        try:
+            with open(self.filename) as fh:
+                for i in range(self.NLHEAD):
+                    fh.readline()
+
+                datalines = nappy.utils.text_parser.StreamCursor(fh)
+
+                while datalines:
+                    self._setupArrays()
+                    if self.NIV > 1:
+                        self.X = [[]] + saved_arrays[0][1:]
+
+                    if not self._readChunkAsBlock(datalines, chunk_rows):
+                        m = 0
+                        while datalines and m < chunk_rows:
+                            datalines = self._readData1(datalines, m)
+                            datalines = self._readData2(datalines, m)
+                            m = m + 1
+
+                        self.V = self._selectVariables(self.V)
+
+                    yield self._getChunkArrays()
+        finally:
+            (self.X, self.V, self.A, self.var_numbers) = saved_arrays
+
+    def _readChunkAsBlock(self, datalines, chunk_rows):
+        """
+        Attempts to read the next ``chunk_rows`` records from the ``datalines``
+        cursor with _readDataBlock. If that is not possible the lines are pushed
+        back onto the cursor and False is returned.
+        """
+        if not self.block_record_lines:
+            return False
+
+        lines = datalines.readlines(chunk_rows * self.block_record_lines)
+        if self._readDataBlock(lines):
+            return True
+
+        datalines.unreadlines(lines)
+        return False
+
+    def _getChunkArrays(self):
+        """
+        Returns the records currently held in X, V and A as a tuple of NumPy arrays.
+        """
+        if self.NIV == 1:
+            x = np.asarray(self.X, dtype=np.float64)
+        else:
+            x = np.asarray(self.X[0], dtype=np.float64)
+
+        v = np.array(self.V, dtype=np.float64)
+
+        if self.NAUXV:
+            a = np.array(self.A, dtype=np.float64)
+        else:
+            a = None
+
+        return (x, v, a)
+
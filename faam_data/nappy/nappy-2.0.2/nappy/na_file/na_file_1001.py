@@ -12,6 +12,9 @@ Container module for NAFile1001 class.
 
 # Imports from python standard library
 
+# Third-party imports
+import numpy as np
+
 # Imports from local package
 import nappy.utils.text_parser
 import nappy.na_file.na_file
@@ -27,6 +30,8 @@ class NAFile1001(nappy.na_file.na_file.NAFile):
     File Format Index (FFI) 1001.
     """
 
+    block_record_lines = 1
+
     def readHeader(self):
         """
         Reads FFI-specific header section.
@@ -61,11 +66,36 @@ class NAFile1001(nappy.na_file.na_file.NAFile):
         for n in range(self.NV):
             self.V.append([])
 
+    def _getRecordLineSizes(self):
+        """
+        Returns a list of the number of items on the line of each record.
+        """
+        return [1 + self.NV]
+
+    def _readDataBlock(self, datalines):
+        """
+        Reads the data section into a single array when every line holds one
+        record. X and each item in V are then views of that array. Only the
+        columns of the variables in ``self.var_numbers`` (if set) are converted.
+        """
+        usecols = None
+        if self.var_numbers is not None:
+            usecols = [0] + [1 + n for n in self.var_numbers]
+
+        block = nappy.utils.text_parser.readArrayFromLines(datalines, 1 + self.NV, usecols)
+        if block is None:
+            return False
+
+        columns = np.ascontiguousarray(block.T)
+        self.X = columns[0]
+        self.V = list(columns[1:])
+        return True
+
     def _readData1(self, datalines, ivar_count):
         """
         Reads first line/section of current block of data.
         """
-        (x_and_v, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1 + self.NV, float)
+        x_and_v = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1 + self.NV, float)
         (x, v) = (x_and_v[0], x_and_v[1:])
         self.X.append(x)
         count = 0
@@ -73,7 +103,7 @@ class NAFile1001(nappy.na_file.na_file.NAFile):
         for n in range(self.NV):
             self.V[n].append(v[count])
             count = count + 1
-        return rtlines    
+        return datalines    
 
     def _readData2(self, datalines, ivar_count):
         """
@@ -86,11 +116,4 @@ class NAFile1001(nappy.na_file.na_file.NAFile):
         Writes the data section of the file.
         This method can be called directly by the user.
         """
-        for m in range(len(self.X)):
-
-            var_string = self.format % self.X[m]
-
-            for n in range(self.NV):
-                var_string = var_string + (self.format % self.V[n][m])
-
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+        self._writeDataLines(self._formatDataRows(zip(self.X, *self.V), 1 + self.NV))
@@ -13,6 +13,10 @@ Container module for NAFile1010 class.
 # 08/05/04 updated by selatham for bug fixes and new write methods
 
 # Imports from python standard library
+import itertools
+
+# Third-party imports
+import numpy as np
 
 # Imports from local package
 import nappy.utils.text_parser
@@ -27,6 +31,8 @@ class NAFile1010(nappy.na_file.na_file.NAFile):
     File Format Index (FFI) 1010.
     """
 
+    block_record_lines = 2
+
     def readHeader(self):
         """
         Reads FFI-specifc header section.
@@ -64,12 +70,53 @@ class NAFile1010(nappy.na_file.na_file.NAFile):
         for a in range(self.NAUXV):
             self.A.append([])
 
+    def _getRecordLineSizes(self):
+        """
+        Returns a list of the number of items on each of the two lines of a record.
+        """
+        return [1 + self.NAUXV, self.NV * (self.NVPM or 1)]
+
+    def _readDataBlock(self, datalines):
+        """
+        Reads the data section into arrays when every record is exactly two lines:
+        the independent and auxiliary variables, then all dependent variable values.
+        X and each item in A and V are then views of those arrays. Only the
+        values of the variables in ``self.var_numbers`` (if set) are converted.
+        """
+        nvpm = self.NVPM or 1
+        if len(datalines) % 2 != 0:
+            return False
+
+        var_numbers = self.var_numbers
+        usecols = None
+        if var_numbers is None:
+            var_numbers = range(self.NV)
+        else:
+            usecols = [n * nvpm + i for n in var_numbers for i in range(nvpm)]
+
+        x_and_a = nappy.utils.text_parser.readArrayFromLines(datalines[0::2], 1 + self.NAUXV)
+        if x_and_a is None:
+            return False
+
+        v = nappy.utils.text_parser.readArrayFromLines(datalines[1::2], self.NV * nvpm, usecols)
+        if v is None:
+            return False
+
+        columns = np.ascontiguousarray(x_and_a.T)
+        self.X = columns[0]
+        self.A = list(columns[1:])
+
+        # Each record holds NVPM consecutive values of each variable in turn
+        v = np.ascontiguousarray(v.reshape(len(v), len(var_numbers), nvpm).transpose(1, 0, 2))
+        self.V = list(v.reshape(len(var_numbers), len(x_and_a) * nvpm))
+        return True
+
     def _readData1(self, datalines, ivar_count): 
         """
         Reads first line/section of current block of data.
         """
         # Start with independent and Auxilliary vars
-        (x2_and_a, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1 + self.NAUXV, float)
+        x2_and_a = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1 + self.NAUXV, float)
         (x, aux) = (x2_and_a[0], x2_and_a[1:])
         self.X.append(x)
 
@@ -77,39 +124,27 @@ class NAFile1010(nappy.na_file.na_file.NAFile):
         for a in range(self.NAUXV):
             self.A[a].append(aux[count])
             count = count + 1
-        return rtlines
+        return datalines
    
     def _readData2(self, datalines, ivar_count):
         """
         Reads second line/section (if used) of current block of data.
         """        
         # Now get the dependent variables
-        (v, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV, float)              
-					
+        v = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV, float)
         count = 0
         for n in range(self.NV):				
             self.V[n].append(v[count])							
             count = count + 1
 
-        return rtlines
-
-    def writeData(self):									
-         """   											
-         Writes the data section of the file.   					
-         This method can be called directly by the user.   			
-         """   											
-         for m in range(len(self.X)):   						
-             # Write Independent variable mark and auxiliary variables   	
-             var_string = self.format % self.X[m]   
-					
-             for a in range(self.NAUXV):   						
-                 var_string = var_string + (self.format % self.A[a][m])
-	
-             self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))	
-			
-             # Write dependant variables   						
-             var_string = ""   								
-             for n in range(self.NV):							
-                  var_string = var_string + (self.format % self.V[n][m])   	
-	
-             self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(' ,'))) 					
+        return datalines
+
+    def writeData(self):
+        """
+        Writes the data section of the file.
+        This method can be called directly by the user.
+        """
+        # Independent variable mark and auxiliary variables then dependent variables
+        aux_lines = self._formatDataRows(zip(self.X, *[self.A[a] for a in range(self.NAUXV)]), 1 + self.NAUXV)
+        var_lines = self._formatDataRows(zip(*self.V[:self.NV]), self.NV)
+        self._writeDataLines(itertools.chain.from_iterable(zip(aux_lines, var_lines)))
@@ -11,7 +11,7 @@ Container module for NAFile1020 class.
 """
 
 # Imports from python standard library
-
+import itertools
 
 # Imports from local package
 import nappy.utils.text_parser
@@ -26,6 +26,9 @@ class NAFile1020(nappy.na_file.na_file_1010.NAFile1010):
     File Format Index (FFI) 1020.
     """
 
+    # Each record spans 1 + NV lines so the two line layout of FFI 1010 does not apply
+    block_record_lines = None
+
     def readHeader(self):
         """
         Reads FFI-specifc header section.
@@ -61,13 +64,13 @@ class NAFile1020(nappy.na_file.na_file_1010.NAFile1010):
         Reads second line/section (if used) of current block of data.
         """
         # Now get the dependent variables
-        (v, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV * self.NVPM, float)              
+        v = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV * self.NVPM, float)
         count = 0
         for n in range(self.NV):
             for i in range(self.NVPM):   # Number of steps where independent variable is implied
                 self.V[n].append(v[count])
                 count = count + 1
-        return rtlines
+        return datalines
 
     def _normalizeIndVars(self):
         """
@@ -83,29 +86,14 @@ class NAFile1020(nappy.na_file.na_file_1010.NAFile1010):
         self.X[0] = newX
         self._normalized_X = True
 
-    def writeData(self):										
-         """   													
-         Writes the data section of the file.   							
-         This method can be called directly by the user.   					
-         """   													
-         for m in range(len(self.X)):   								
-            # Write Independent variable mark and auxiliary variables   			
-            var_string = self.format % self.X[m]   	
-						
-            for a in range(self.NAUXV):   								
-                var_string = var_string + (self.format % self.A[a][m])   
-			
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
-				
-            # Write dependant variables																		
-            count = 0											
-            for n in range(self.NV):									
-                var_string = ""	
-								        
-                for p in range(self.NVPM):								
-                    var_ind = (m * self.NVPM) + p 							
-                    var_string = var_string + (self.format % self.V[n][var_ind])   		
-                    count = count + 1	
-								
-                self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" %var_string.rstrip(' ,')))
-
+    def writeData(self):
+        """
+        Writes the data section of the file.
+        This method can be called directly by the user.
+        """
+        # Independent variable mark and auxiliary variables then a line of
+        # NVPM values for each dependent variable
+        aux_lines = self._formatDataRows(zip(self.X, *[self.A[a] for a in range(self.NAUXV)]), 1 + self.NAUXV)
+        var_lines = [self._formatDataRows(zip(*[self.V[n][p::self.NVPM] for p in range(self.NVPM)]), self.NVPM)
+                     for n in range(self.NV)]
+        self._writeDataLines(itertools.chain.from_iterable(zip(aux_lines, *var_lines)))
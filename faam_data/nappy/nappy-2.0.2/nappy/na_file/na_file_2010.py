@@ -12,6 +12,9 @@ Container module for NAFile2010 class.
 
 # Imports from python standard library
 
+# Third-party imports
+import numpy as np
+
 # Imports from local package
 import nappy.utils.text_parser
 import nappy.utils.list_manipulator
@@ -101,19 +104,44 @@ class NAFile2010(nappy.na_file.na_file.NAFile):
         for a in range(self.NAUXV):
             self.A.append([])
             
+    def _readDataBlock(self, datalines):
+        """
+        Reads the whole data section into NumPy arrays. Every record holds the
+        same number of items (the unbounded independent variable, the auxiliary
+        variables and NV blocks of prod(NX) values) so the data section is read
+        into a single (n_records, record_size) array. X[0], each item in A and
+        each (n_records, *NX) item in V are views of that array.
+        """
+        offset = 1 + self.NAUXV
+        records = nappy.utils.text_parser.readRecordsFromLines(datalines, offset + self.NV * self.arraySize)
+        if records is None:
+            return False
+
+        shape = (len(records),) + tuple(self.NX)
+        self.X[0] = records[:, 0]
+        self.A = [records[:, 1 + a] for a in range(self.NAUXV)]
+        self.V = []
+
+        for n in range(self.NV):
+            self.V.append(records[:, offset:offset + self.arraySize].reshape(shape))
+            offset = offset + self.arraySize
+
+        self.V = self._selectVariables(self.V)
+        return True
+
     def _readData1(self, datalines, ivar_count):
         """
         Reads first line/section of current block of data.
         """        
         # Start with independent and Auxilliary vars
-        (x2_and_a, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1 + self.NAUXV, float)
+        x2_and_a = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1 + self.NAUXV, float)
         (x, aux) = (x2_and_a[0], x2_and_a[1:])
         self.X[0].append(x)
         count = 0
         for a in range(self.NAUXV):
             self.A[a].append(aux[count])
             count = count + 1
-        return rtlines
+        return datalines
 
     def _readData2(self, datalines, ivar_count):
         """
@@ -121,11 +149,9 @@ class NAFile2010(nappy.na_file.na_file.NAFile):
         """
         # Now get the dependent variables
         for n in range(self.NV):
-            (v, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.arraySize, float)
-            self.V[n].append([])
-            nappy.utils.list_manipulator.recursiveListPopulator(self.V[n][ivar_count], v, self.NX)
-            datalines = rtlines
-        return rtlines
+            v = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.arraySize, float)
+            self.V[n].append(np.array(v).reshape(self.NX))
+        return datalines
 
     def writeData(self):
         """
@@ -134,20 +160,22 @@ class NAFile2010(nappy.na_file.na_file.NAFile):
         """        
         # Set up unbounded IV loop
         self.NX.reverse()
-        for m in range(len(self.X[0])):
+        aux_lines = self._formatDataRows(zip(self.X[0], *[self.A[a] for a in range(self.NAUXV)]), 1 + self.NAUXV)
+        self._writeDataLines(self._iterDataLines(aux_lines))
 
+    def _iterDataLines(self, aux_lines):
+        """
+        Generator of the data lines for each unbounded independent variable mark:
+        the auxiliary variables line followed by the lines for each variable.
+        """
+        for (m, aux_line) in enumerate(aux_lines):
             # Write unbounded independent variable mark and auxiliary variables
-            var_string = self.format % self.X[0][m]
+            yield aux_line
 
-            for a in range(self.NAUXV):
-                var_string = var_string + (self.format % self.A[a][m])
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
-            
             # Write Variables
             for n in range(self.NV):
-                outlines = nappy.utils.list_manipulator.recursiveListWriter(self.V[n][m], self.NX, delimiter = self.delimiter, float_format = self.float_format)
-                for line in outlines:
-                    self.file.write(wrapLine("Data", self.annotation, self.delimiter, line))
+                for line in nappy.utils.list_manipulator.recursiveListWriter(self.V[n][m], self.NX, delimiter = self.delimiter, float_format = self.float_format):
+                    yield line
 
     def _normalizeIndVars(self):
         """
@@ -12,6 +12,9 @@ Container module for NAFile2110 class.
 
 # Imports from python standard library
 
+# Third-party imports
+import numpy as np
+
 # Imports from local package
 import nappy.utils.text_parser
 import nappy.na_file.na_file_2010
@@ -70,12 +73,18 @@ class NAFile2110(nappy.na_file.na_file_2010.NAFile2010):
         for i in range(self.NAUXV):
            self.A.append([])
 
+    def _readDataBlock(self, datalines):
+        """
+        Records vary in length so are always read one at a time.
+        """
+        return False
+
     def _readData1(self, datalines, ivar_count): 
         """
         Reads first line/section of current block of data.
         """    
         # Start with independent and Auxilliary vars
-        (x_and_a, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NAUXV + 1, float)
+        x_and_a = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NAUXV + 1, float)
         (x, aux) = (x_and_a[0], x_and_a[1:])
         count = 0
         for a in range(self.NAUXV):
@@ -88,51 +97,43 @@ class NAFile2110(nappy.na_file.na_file_2010.NAFile2010):
         # Set up list to take second changing independent variable
         self.X[ivar_count].append([])  
         self.NX.append(int(aux[0]))
-        return rtlines
+        return datalines
 
     def _readData2(self, datalines, ivar_count):
         """
         Reads second line/section (if used) of current block of data.
         """
-        # Now get the dependent variables
-        for n in range(self.NV):
-            self.V[n].append([])
-
-        for c in range(self.NX[ivar_count]):
-            (x_and_v, datalines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV + 1, float)
-            (x, v) = (x_and_v[0], x_and_v[1:])
-            self.X[ivar_count][1].append(x)
+        # Now get the second independent variable and the dependent variables
+        # as an (NX, 1 + NV) array for this record
+        nx = self.NX[ivar_count]
+        x_and_v = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, nx * (self.NV + 1), float)
+        x_and_v = np.array(x_and_v).reshape(nx, self.NV + 1)
+        self.X[ivar_count][1].extend(x_and_v[:, 0].tolist())
 
-            count = 0
-            for n in range(self.NV):
-                self.V[n][ivar_count].append(v[count])
-                count = count + 1
+        for n in range(self.NV):
+            self.V[n].append(x_and_v[:, n + 1])
 
-        rtlines = datalines
-        return rtlines
+        return datalines
 
     def writeData(self):
         """
         Writes the data section of the file.
         This method can be called directly by the user.
         """
-        # Set up unbounded IV loop
+        self._writeDataLines(self._iterDataLines())
 
+    def _iterDataLines(self):
+        """
+        Generator of the data lines for each unbounded independent variable mark.
+        """
         for m in range(len(self.X)):
 
             # Write unbounded independent variable mark and auxiliary variables
-            var_string = self.format % self.X[m][0]
-
-            # Loop through aux vars which includes NX as first aux var
-            for a in range(self.NAUXV): 
-                var_string = var_string + (self.format % self.A[a][m])
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+            # (aux vars include NX as first aux var)
+            row = [self.X[m][0]] + [self.A[a][m] for a in range(self.NAUXV)]
+            yield next(self._formatDataRows([tuple(row)], 1 + self.NAUXV))
 
             # Write second independant variable and dependant variables
-            for p in range(self.NX[m]):
-                var_string = self.format % self.X[m][1][p]
-
-                for n in range(self.NV):
-                    var_string = var_string + (self.format %self.V[n][m][p])
-
-                self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" %var_string.rstrip(" ,")))
+            rows = zip(self.X[m][1][:self.NX[m]], *[self.V[n][m][:self.NX[m]] for n in range(self.NV)])
+            for line in self._formatDataRows(rows, 1 + self.NV):
+                yield line
@@ -101,14 +101,14 @@ class NAFile2160(nappy.na_file.na_file_2110.NAFile2110):
         """      
         # Start with independent and Auxilliary vars
         # Get character string independent variable
-        (x1, datalines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1, str)
+        x1 = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, 1, str)
         self.X.append([])
         self.X[ivar_count].append(x1[0])
         # Set up list to take second changing independent variable
         self.X[ivar_count].append([])  
         
         # Get NX and Non-character AUX vars
-        (aux, datalines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, (self.NAUXV - self.NAUXC), float)
+        aux = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, (self.NAUXV - self.NAUXC), float)
         self.NX.append(int(aux[0]))
 
         count = 0
@@ -117,42 +117,37 @@ class NAFile2160(nappy.na_file.na_file_2110.NAFile2110):
             count = count + 1
 
         # Get character AUX vars
-        (auxc) = nappy.utils.text_parser.readItemsFromLines(datalines[:self.NAUXC], self.NAUXC, str)
-        rtlines = datalines[self.NAUXC:]
+        (auxc) = nappy.utils.text_parser.readItemsFromLines(datalines.readlines(self.NAUXC), self.NAUXC, str)
         count = 0
         for a in range(self.NAUXC):
             self.A[(self.NAUXV - self.NAUXC) + a].append(auxc[count])
             count = count + 1
 
-        return rtlines
+        return datalines
     
     def writeData(self):
         """
         Writes the data section of the file.
         This method can be called directly by the user.
         """
-        # Set up unbounded IV loop
-        for m in range(len(self.X)):
+        self._writeDataLines(self._iterDataLines())
 
-            # Write Independent variable mark and auxiliary variables
-            var_string = "%s" % self.X[m][0]
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
-            var_string = ""
+    def _iterDataLines(self):
+        """
+        Generator of the data lines for each unbounded independent variable mark.
+        """
+        nauxv = self.NAUXV - self.NAUXC
 
-            for a in range(self.NAUXV - self.NAUXC):
-                var_string = var_string + (self.format % self.A[a][m])
+        for m in range(len(self.X)):
 
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+            # Write Independent variable mark and auxiliary variables
+            yield "%s\n" % ("%s" % self.X[m][0]).rstrip(" ,")
+            yield next(self._formatDataRows([tuple([self.A[a][m] for a in range(nauxv)])], nauxv))
 
             for a in range(self.NAUXC):
-                var_string = (("%s" + self.delimiter) % self.A[(self.NAUXV - self.NAUXC) + a][m])
-                self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+                yield "%s\n" % (("%s" + self.delimiter) % self.A[nauxv + a][m]).rstrip(" ,")
 
             # Write second independant variable and dependant variables
-            for p in range(self.NX[m]):
-                var_string = self.format % self.X[m][1][p]
-
-                for n in range(self.NV):
-                    var_string = var_string + (self.format % self.V[n][m][p])
-
-                self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+            rows = zip(self.X[m][1][:self.NX[m]], *[self.V[n][m][:self.NX[m]] for n in range(self.NV)])
+            for line in self._formatDataRows(rows, 1 + self.NV):
+                yield line
@@ -12,6 +12,9 @@ Container module for NAFile2310 class.
 
 # Imports from python standard library
 
+# Third-party imports
+import numpy as np
+
 # Imports from local package
 import nappy.utils.text_parser
 import nappy.na_file.na_file_2110
@@ -58,7 +61,7 @@ class NAFile2310(nappy.na_file.na_file_2110.NAFile2110):
         Reads first line/section of current block of data.
         """        
         # Start with independent and Auxilliary vars
-        (x_and_a, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NAUXV + 1, float)
+        x_and_a = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NAUXV + 1, float)
         (x, aux) = (x_and_a[0], x_and_a[1:])
 
         count = 0
@@ -73,43 +76,37 @@ class NAFile2310(nappy.na_file.na_file_2110.NAFile2110):
         self.X[ivar_count].append([aux[1]])
         self.NX.append(int(aux[0]))
         self.DX.append(int(aux[2]))
-        return rtlines
+        return datalines
    
     def _readData2(self, datalines, ivar_count):
         """
         Reads second line/section (if used) of current block of data.
         """
         # Now get the dependent variables
-        (v, rtlines) = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV * self.NX[ivar_count], float)
-        count = 0
+        v = nappy.utils.text_parser.readItemsFromUnknownLines(datalines, self.NV * self.NX[ivar_count], float)
+        v = np.array(v).reshape(self.NV, self.NX[ivar_count])
+
         for n in range(self.NV):
-            self.V[n].append([])
-            for i in range(self.NX[ivar_count]):
-                self.V[n][ivar_count].append(v[count])
-                count = count + 1
-        return rtlines
+            self.V[n].append(v[n])
+        return datalines
 
     def writeData(self):
         """
         Writes the data section of the file.
         This method can be called directly by the user.
         """
-        # Set up unbounded IV loop
-        # self.NX.reverse()
+        self._writeDataLines(self._iterDataLines())
 
+    def _iterDataLines(self):
+        """
+        Generator of the data lines for each unbounded independent variable mark.
+        """
         for m in range(len(self.X)):
             # Write Independent variable mark and auxiliary variables
-            var_string = self.format % self.X[m][0]
-
-            #  Loop through NAUXV which includes NX, X[0], DX as first 3 aux vars
-            for a in range(self.NAUXV):
-                var_string = var_string + (self.format % self.A[a][m])
-
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+            # (NAUXV includes NX, X[0], DX as first 3 aux vars)
+            row = [self.X[m][0]] + [self.A[a][m] for a in range(self.NAUXV)]
+            yield next(self._formatDataRows([tuple(row)], 1 + self.NAUXV))
 
             # Write second independant variable and dependant variables
-            var_string = ""
-            for p in range(self.NX[m]):
-                for n in range(self.NV):
-                    var_string = var_string + (self.format %self.V[n][m][p])
-            self.file.write(wrapLine("Data", self.annotation, self.delimiter, "%s\n" % var_string.rstrip(" ,")))
+            row = [self.V[n][m][p] for p in range(self.NX[m]) for n in range(self.NV)]
+            yield next(self._formatDataRows([tuple(row)], len(row)))
@@ -64,6 +64,14 @@ nappy.convertNAToNC(na_file, nc_file, global_attributes=glob_atts)
 # Let's convert a NASA Ames file to a CSV and add an annotation column to explain the header
 nappy.convertNAToCSV(na_file, annotation=True)
 
+# Let's convert a NASA Ames file to a Parquet file (with typed columns) and read it with pandas
+parquet_file = nappy.convertNAToParquet("data_files/1001.na")
+df = pandas.read_parquet(parquet_file)
+
+# Let's read a NASA Ames file straight into a pandas DataFrame of 32-bit floats
+# (values can also be blanked where a flag column is set, e.g. flag_mask={"CO2": "CO2_flag"})
+df = nappy.to_dataframe("data_files/1001.na", dtype="float32")
+
 # Let's read a NetCDF and write one (or more) output NASA Ames files,
 # but only including and variables "temp" and "ozone". Also let's write 
 # the output using tabs as the delimiters and a float format of "%6.3f".
@@ -102,6 +110,11 @@ nappy.writeNADictToNC(na_dict_2, nc_file, mode="a")
 # Actually, I only want to get a single variable from that file, so I'll try
 temp_var = getXarrayVariableFromNA(na_file, "temperature")
 
+# Open a large NASA Ames file as a lazily loaded Xarray Dataset (split into Dask
+# chunks) and only read the records and variables that are selected
+ds = nappy.open_dataset(na_file, chunks={"time": 10000})
+subset = ds["temperature"].sel(time=slice(1000, 2000)).load()
+
  3. Comparing NASA Ames files (and/or CSV files)
 
 # I'd like to compare a NASA Ames and CSV file to check they are the same.
@@ -110,6 +123,11 @@ temp_var = getXarrayVariableFromNA(na_file, "temperature")
 result = nappy.compareNA(na_file, csv_file, header=True, body=True, 
             number_clever=True, delimiter_1="    ", delimiter_2=",")
 
+# For large files, compare the bodies as arrays of numbers (within a tolerance)
+# and report the first 20 values that differ (by line and column)
+result = nappy.compareNA(na_file, csv_file, delimiter_2=",", numeric_diff=True,
+            rtol=1e-6, atol=0, max_diffs=20)
+
  4. General NASA Ames utilities 
 
 # Get the FFI from a NASA Ames file
@@ -122,7 +140,11 @@ ffi = nappy.chooseFFI(na_dict)
 """
 
 # Import standard library modules
+import os
+import glob
+import time
 import logging
+import concurrent.futures
 log = logging.getLogger(__name__)
 
 # Import local modules
@@ -143,17 +165,35 @@ default_float_format = nappy.utils.common_utils.getDefault("default_float_format
 
 
 def openNAFile(filename, mode="r", na_dict=None, ignore_header_lines=0,
-               var_and_units_callback=None):
+               var_and_units_callback=None, mmap=False, cache=False, header_only=False):
     """
     Function wrapper around the NASA Ames File classes. Any NASA Ames
     file can be opened through this function and the appropriate read or
     write NASA Ames File class instance is returned.
+
+    If mmap is True (read mode only) the file is memory-mapped and indexed by
+    record so that ``readData(x_range=(start, stop))`` only parses the records
+    within the range.
+
+    If cache is True (read mode only) the parsed header and data are kept in an
+    on-disk cache and re-used by later reads of the unchanged file.
+
+    If header_only is True (read mode only) only the header is read and the
+    file is closed straight away, which is the fastest way to scan metadata.
     """
     if mode == "r":
-        ffi = readFFI(filename, ignore_header_lines)
-        na_class = getNAFileClass(ffi)
-        return na_class(filename, ignore_header_lines, mode,
-                        var_and_units_callback=var_and_units_callback)
+        # Open the file once: the handle used to read the FFI is reused to read the header
+        fh = open(filename)
+
+        try:
+            ffi = readFFI(fh, ignore_header_lines)
+            na_class = getNAFileClass(ffi)
+            return na_class(filename, ignore_header_lines, mode,
+                            var_and_units_callback=var_and_units_callback, mmap=mmap,
+                            cache=cache, header_only=header_only, file_handle=fh)
+        except Exception:
+            fh.close()
+            raise
 
     elif mode == "w":
         if 'FFI' in na_dict and type(na_dict['FFI']) == type(3):
@@ -172,7 +212,7 @@ def openNAFile(filename, mode="r", na_dict=None, ignore_header_lines=0,
 def convertNAToNC(na_file, nc_file=None, mode="w", variables=None, aux_variables=None,
                  global_attributes=None,
                  time_units=None, time_warning=True,
-                 rename_variables=None):
+                 rename_variables=None, chunk_rows=None, encoding=None):
     """
     Takes a NASA Ames file and converts to a NetCDF file. Options are:
 
@@ -191,27 +231,107 @@ def convertNAToNC(na_file, nc_file=None, mode="w", variables=None, aux_variables
     time_units - is a valid time units string such as "hours since 2003-04-30 10:00:00" to 
               use for time units if there is a valid time axis.
     time_warning - suppresses the time units warning for invalid time units if set to False.
+    chunk_rows - if set, read and write the data in chunks of this many records so that
+              the whole file is never held in memory (not available for FFIs 2110, 2160
+              and 2310).
+    encoding - is a dictionary of {variable_name: encoding} NetCDF storage settings for
+              each output variable, e.g. {"co2": {"zlib": True, "complevel": 4,
+              "chunksizes": (10000,)}}. Settings for "*" apply to all data variables.
     """
     global_attributes = global_attributes or []
     rename_variables = rename_variables or {}
 
     arg_dict = vars()
 
-    for arg_out in ("nc_file", "mode"):
+    for arg_out in ("nc_file", "mode", "chunk_rows", "encoding"):
         del arg_dict[arg_out]
 
     import nappy.nc_interface.na_to_nc
     convertor = nappy.nc_interface.na_to_nc.NAToNC(*[], **arg_dict)
-    convertor.convert()
+
+    if not chunk_rows:
+        convertor.convert()
 
     if nc_file == None:
         nc_file = getFileNameWithNewExtension(na_file, "nc")
 
-    convertor.writeNCFile(nc_file, mode)
+    convertor.writeNCFile(nc_file, mode, chunk_rows=chunk_rows, encoding=encoding)
     return nc_file   
+
+
+def _convertNAToNCTimed(na_file, nc_file, arg_dict):
+    """
+    Runs convertNAToNC for a single file of a batch. Any error is caught and
+    returned so that it does not abort the batch. Returns a tuple of:
+    (na_file, nc_file, status, seconds, error_message).
+    """
+    start = time.time()
+
+    try:
+        convertNAToNC(na_file, nc_file, **arg_dict)
+    except Exception as err:
+        return (na_file, nc_file, "failed", time.time() - start, "%s: %s" % (type(err).__name__, err))
+
+    return (na_file, nc_file, "converted", time.time() - start, None)
+
+
+def convertNADirectoryToNC(src_dir, dst_dir=None, workers=None, pattern="*.na",
+                           overwrite=False, **arg_dict):
+    """
+    Converts all the NASA Ames files in a directory to NetCDF files, fanning
+    the files out over a pool of worker processes. Options are:
+
+    src_dir - the directory holding the input NASA Ames files.
+    dst_dir - the directory to write the NetCDF files to (default is src_dir).
+    workers - the number of worker processes (default is the number of CPUs).
+              If set to 1 the files are converted in the current process.
+    pattern - the glob pattern used to select input files in src_dir.
+    overwrite - if set to True, convert files even if the output is already up to date
+              (i.e. newer than the input file).
+    arg_dict - any other keyword arguments are passed to convertNAToNC for each file.
+
+    Failures are logged and reported without aborting the rest of the batch.
+    Returns a list of (na_file, nc_file, status, seconds, error_message) tuples
+    (in order of input file name) where status is one of "converted", "skipped"
+    or "failed".
+    """
+    dst_dir = dst_dir or src_dir
+    if not os.path.isdir(dst_dir):
+        os.makedirs(dst_dir)
+
+    results = []
+    jobs = []
+
+    for na_file in sorted(glob.glob(os.path.join(src_dir, pattern))):
+        nc_file = os.path.join(dst_dir, getFileNameWithNewExtension(os.path.basename(na_file), "nc"))
+
+        if not overwrite and os.path.isfile(nc_file) and \
+                os.path.getmtime(nc_file) >= os.path.getmtime(na_file):
+            results.append((na_file, nc_file, "skipped", 0.0, None))
+        else:
+            jobs.append((na_file, nc_file))
+
+    if workers == 1:
+        results.extend([_convertNAToNCTimed(na_file, nc_file, arg_dict) for (na_file, nc_file) in jobs])
+    elif jobs:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_convertNAToNCTimed, na_file, nc_file, arg_dict)
+                       for (na_file, nc_file) in jobs]
+            results.extend([future.result() for future in futures])
+
+    results.sort()
+
+    for (na_file, nc_file, status, seconds, error) in results:
+        if status == "failed":
+            log.warning("Failed to convert %s: %s" % (na_file, error))
+        else:
+            log.info("%s %s -> %s (%.2fs)" % (status.capitalize(), na_file, nc_file, seconds))
+
+    return results
   
 
-def convertNAToCSV(na_file, csv_file=None, annotation=False, no_header=False):
+def convertNAToCSV(na_file, csv_file=None, annotation=False, no_header=False,
+                   mode="convert", validate=False):
     """
     Reads in a NASA Ames file and writes it out a new CSV file which is identical to the
     input file except that commas are used as the delimiter. Arguments are:
@@ -221,26 +341,106 @@ def convertNAToCSV(na_file, csv_file=None, annotation=False, no_header=False):
     annotation - if set to True write the output file with an additional left-hand column 
                  describing the contents of each header line.
     no_header - if set to True then only the data blocks are written to file.
+    mode - "convert" (default) reads all the values and writes them out again using the
+                 default float format. "transcode" streams the data lines to the output,
+                 only swapping the whitespace between values for commas, so the values keep
+                 their formatting. This is much quicker, and uses constant memory, for large files.
+    validate - if set to True (in "transcode" mode) check that every value in the data section
+                 is a number.
     """
+    if csv_file == None:
+        csv_file = getFileNameWithNewExtension(na_file, "csv")
+
+    if mode == "transcode":
+        import nappy.utils.na_transcoder
+        nappy.utils.na_transcoder.transcodeNAToCSV(na_file, csv_file, annotation=annotation,
+                                                   no_header=no_header, validate=validate)
+        return True
+
+    elif mode != "convert":
+        raise Exception(f"Mode not recognised for converting NASA Ames to CSV: {mode}")
+
     fin = openNAFile(na_file)
     fin.readData()
     na_dict = fin.getNADict()
     fin.close()
 
-    if csv_file == None:
-        csv_file = getFileNameWithNewExtension(na_file, "csv")
-
     fout = openNAFile(csv_file, "w", na_dict=na_dict)
-    fout.write(delimiter=",", annotation=annotation)
+    fout.write(delimiter=",", annotation=annotation, no_header=no_header)
     fout.close()
     return True
 
 
+def readNAAsArrow(na_file, variables=None, decode_times=True, ignore_header_lines=0):
+    """
+    Reads a NASA Ames file (FFI 1001 or 1010) and returns a pyarrow Table with
+    one row per record. Arguments are:
+
+    na_file - NASA Ames file path
+    variables - a list of variable numbers or names to include (default is all of them).
+    decode_times - if True (default) the independent variable is decoded to timestamps
+                   when its units are time units (e.g. "seconds since 2019-07-29 00:00:00").
+    ignore_header_lines - the number of lines to skip at the start of the file.
+
+    Missing values are null and scale factors are applied. Requires "pyarrow".
+    """
+    import nappy.utils.na_arrow
+    return nappy.utils.na_arrow.readNAAsArrow(na_file, variables=variables, decode_times=decode_times,
+                                              ignore_header_lines=ignore_header_lines)
+
+
+def convertNAToParquet(na_file, parquet_file=None, variables=None, decode_times=True,
+                       ignore_header_lines=0, **write_kwargs):
+    """
+    Reads a NASA Ames file (FFI 1001 or 1010) and writes it to a Parquet file.
+    Arguments are as for readNAAsArrow, plus:
+
+    parquet_file - Parquet file path (default is to replace ".na" from NASA Ames file
+                   with ".parquet").
+    write_kwargs - any other keyword arguments (such as "compression") are passed to
+                   pyarrow.parquet.write_table.
+
+    Returns the Parquet file path.
+    """
+    if parquet_file == None:
+        parquet_file = getFileNameWithNewExtension(na_file, "parquet")
+
+    import nappy.utils.na_arrow
+    return nappy.utils.na_arrow.convertNAToParquet(na_file, parquet_file, variables=variables,
+                                                   decode_times=decode_times,
+                                                   ignore_header_lines=ignore_header_lines, **write_kwargs)
+
+
+def to_dataframe(na_file, variables=None, flag_mask=None, flag_threshold=0, dtype="float64",
+                 decode_times=True, ignore_header_lines=0):
+    """
+    Reads a NASA Ames file (FFI 1001 or 1010) and returns a pandas DataFrame with
+    one row per record. Arguments are:
+
+    na_file - NASA Ames file path
+    variables - a list of variable numbers or names to include (default is all of them).
+    flag_mask - a dictionary of {column: flag_column}: values of each column are set
+                to NaN where its flag column is more than ``flag_threshold``.
+    flag_threshold - the highest flag value for which values are kept (default is 0).
+    dtype - the type of the columns ("float32" or "float64" (default)).
+    decode_times - if True (default) the index is a DatetimeIndex when the independent
+                   variable has time units (e.g. "seconds since 2019-07-29 00:00:00").
+    ignore_header_lines - the number of lines to skip at the start of the file.
+
+    Missing values are NaN and scale factors are applied. Requires "pandas".
+    """
+    import nappy.utils.na_dataframe
+    return nappy.utils.na_dataframe.to_dataframe(na_file, variables=variables, flag_mask=flag_mask,
+                                                 flag_threshold=flag_threshold, dtype=dtype,
+                                                 decode_times=decode_times,
+                                                 ignore_header_lines=ignore_header_lines)
+
+
 def convertNCToNA(nc_file, na_file=None, var_ids=None, na_items_to_override=None,
             only_return_file_names=False, exclude_vars=None,
             requested_ffi=None, delimiter=default_delimiter, float_format=default_float_format, 
             size_limit=None, annotation=False, no_header=False,
-            ):
+            workers=1):
     """
     Takes a NetCDF file and converts the contents to one or more NASA Ames files. 
     Arguments are:
@@ -267,13 +467,15 @@ def convertNCToNA(nc_file, na_file=None, var_ids=None, na_items_to_override=None
     annotation - if set to True write the output file with an additional left-hand column 
               describing the contents of each header line.
     no_header - if set to True then only the data blocks are written to file.
+    workers - the number of worker processes used to write the output files (default is 1,
+              None means the number of CPUs). Useful if the output is split on size_limit.
     """
     na_items_to_override = na_items_to_override or {}
     exclude_vars = exclude_vars or []
 
     arg_dict = vars()
     for arg_out in ("na_file", "only_return_file_names", "delimiter", "float_format", 
-                    "size_limit", "annotation", "no_header"):
+                    "size_limit", "annotation", "no_header", "workers"):
         del arg_dict[arg_out]
 
     if na_file == None:
@@ -288,7 +490,8 @@ def convertNCToNA(nc_file, na_file=None, var_ids=None, na_items_to_override=None
         return convertor.constructNAFileNames(na_file)
     else:
         convertor.writeNAFiles(na_file, delimiter=delimiter, float_format=float_format, 
-                               size_limit=size_limit, annotation=annotation, no_header=no_header)
+                               size_limit=size_limit, annotation=annotation, no_header=no_header,
+                               workers=workers)
         log.info(convertor.output_message)
         output_files_written = convertor.output_files_written
         log.info(output_files_written)
@@ -311,7 +514,7 @@ def convertNCToCSV(nc_file, csv_file=None, **arg_dict):
 def convertXarrayObjectsToNA(xr_vars, global_attributes, na_file, 
               na_items_to_override=None, requested_ffi=None, delimiter=default_delimiter, 
               float_format=default_float_format, size_limit=None, annotation=False, no_header=False,
-              ):
+              workers=1):
     """
     Takes a list of Xarray variables and a list of global attributes and
     writes them to one or more NASA Ames files. Arguments are:
@@ -334,6 +537,8 @@ def convertXarrayObjectsToNA(xr_vars, global_attributes, na_file,
     annotation - if set to True write the output file with an additional left-hand 
                 column describing the contents of each header line.
     no_header - if set to True then only the data blocks are written to file.
+    workers - the number of worker processes used to write the output files (default is 1,
+                None means the number of CPUs).
     """
     na_items_to_override = na_items_to_override or {}
 
@@ -344,7 +549,8 @@ def convertXarrayObjectsToNA(xr_vars, global_attributes, na_file,
     convertor.convert()
 
     na_files = convertor.writeNAFiles(na_file, delimiter=delimiter, float_format=float_format, 
-                                      annotation=annotation, no_header=no_header)
+                                      size_limit=size_limit, annotation=annotation, no_header=no_header,
+                                      workers=workers)
 
     return convertor.output_files_written 
 
@@ -370,7 +576,7 @@ def writeNADictToNC(na_dict, nc_file, mode="w"):
     na_file_obj.setNADict(na_dict)
 
     # Fake up some required methods
-    def fakeCaller():pass
+    def fakeCaller(*args, **kwargs):pass
     na_file_obj.readData = fakeCaller
 
     import nappy.nc_interface.na_to_xarray
@@ -428,3 +634,22 @@ def getXarrayVariableFromNA(na_file, var):
 
     # Must now be a primary var
     return xr_primary_vars[0]
+
+
+def open_dataset(na_file, chunks=None, **kwargs):
+    """
+    Opens NASA Ames file ``na_file`` as an Xarray Dataset whose variables are
+    only read when (and where) they are accessed. Options are:
+
+    chunks - passed on to ``xarray.open_dataset``: if set (e.g. {"time": 10000})
+              the variables are Dask arrays split into chunks of that many records.
+    kwargs - any other arguments to ``xarray.open_dataset`` or the nappy backend
+              (``ignore_header_lines``, ``time_units``, ``rename_variables``).
+
+    Only the header and the unbounded independent variable are read when the file
+    is opened. This is also available as ``xr.open_dataset(na_file, engine="nappy")``.
+    """
+    import xarray as xr
+    import nappy.nc_interface.na_backend
+    return xr.open_dataset(na_file, engine=nappy.nc_interface.na_backend.NappyBackendEntrypoint,
+                           chunks=chunks, **kwargs)
@@ -0,0 +1,250 @@
+#   Copyright (C) 2004 CCLRC & NERC( Natural Environment Research Council ).
+#   This software may be distributed under the terms of the
+#   Q Public License, version 1.0 or later. http://ndg.nerc.ac.uk/public_docs/QPublic_license.txt
+
+"""
+na_backend.py
+=============
+
+Holds an Xarray backend that opens a NASA Ames file as a lazily loaded
+``xarray.Dataset``. Only the header and the unbounded independent variable
+are read when the file is opened; the values of each variable are read when
+(and only for the records) they are needed. Usage:
+
+>>>    import nappy
+>>>    ds = nappy.open_dataset("file.na", chunks={"time": 10000})
+>>>    ds[["CH4", "CO2"]].sel(time=slice(1000, 2000)).load()
+
+or, with nappy installed, ``xr.open_dataset("file.na", engine="nappy")``.
+
+Records are read through the record index of ``openNAFile(..., mmap=True)``
+for FFIs 1001 and 1010 when every record fits the regular layout. For other
+FFIs (or records wrapped irregularly over lines) the data section is read in
+full the first time any values are requested.
+
+"""
+
+# Imports from python standard library
+import os
+import threading
+
+# Third-party imports
+import numpy as np
+from xarray.backends import BackendArray, BackendEntrypoint
+from xarray.core import indexing
+
+# Import from nappy package
+import nappy
+import nappy.nc_interface.na_to_nc
+
+
+class NAFileDataStore:
+    """
+    Reads ranges of records from a NASA Ames file on behalf of the lazy arrays.
+    A lock is held while reading because the NASA Ames file object stores
+    what it reads on itself.
+    """
+
+    def __init__(self, filename, ignore_header_lines=0):
+        self.na_file_obj = nappy.openNAFile(filename, ignore_header_lines=ignore_header_lines, mmap=True)
+        self.lock = threading.Lock()
+        self._arrays = None
+
+    def _canReadRecords(self):
+        # The record index is only built once every line has been checked against the record layout
+        return self.na_file_obj.getNumRecords() is not None
+
+    def getIndependentValues(self):
+        "Returns the unbounded independent variable values of all records."
+        if self._canReadRecords():
+            with self.lock:
+                return self.na_file_obj._readIndependentValues()
+
+        (x, v, a) = self._readAll()
+        return x
+
+    def _readAll(self):
+        "Reads (once) and returns all of the (X, V, A) arrays."
+        with self.lock:
+            if self._arrays is None:
+                fin = self.na_file_obj
+                fin.readData()
+                x = fin.X if fin.NIV == 1 else fin.X[0]
+                self._arrays = (np.asarray(x, dtype=np.float64),
+                                [np.asarray(v, dtype=np.float64) for v in fin.V],
+                                [np.asarray(a, dtype=np.float64) for a in (fin.A or [])])
+            return self._arrays
+
+    def readRecords(self, item, number, first_record, end_record):
+        """
+        Returns a new array holding the values of variable ``number`` of ``item``
+        ("V" or "A") for records ``first_record`` to ``end_record`` (exclusive).
+        """
+        if self._canReadRecords():
+            with self.lock:
+                fin = self.na_file_obj
+
+                # Only convert the values of the variable that is wanted
+                if item == "V":
+                    (fin.var_numbers, index) = ([number], 0)
+                else:
+                    (fin.var_numbers, index) = ([], number)
+
+                if fin._readRecordRange(first_record, end_record):
+                    return np.array(getattr(fin, item)[index], dtype=np.float64)
+
+                fin.var_numbers = None
+
+                # The record layout is not regular so fall back to reading everything
+                fin.record_offsets = None
+
+        (x, v, a) = self._readAll()
+        arrays = v if item == "V" else a
+        return arrays[number][first_record:end_record].copy()
+
+    def close(self):
+        self.na_file_obj.close()
+
+
+class NAVariableBackendArray(BackendArray):
+    """
+    Lazy array for a NASA Ames variable (or auxiliary variable). Indexing reads
+    only the records that are selected. Missing values are set to NaN and the
+    scale factor is applied to the values as they are read.
+    """
+
+    def __init__(self, data_store, item, number, shape, missing_value, scale_factor):
+        self.data_store = data_store
+        self.item = item
+        self.number = number
+        self.shape = shape
+        self.dtype = np.dtype(np.float64)
+        self.missing_value = missing_value
+        self.scale_factor = scale_factor
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(key, self.shape, indexing.IndexingSupport.BASIC,
+                                                  self._rawIndexingMethod)
+
+    def _rawIndexingMethod(self, key):
+        # Work out the range of records to read from the first (record) dimension
+        records = np.arange(self.shape[0])[key[0]]
+
+        if records.size == 0:
+            return np.empty((0,) + self.shape[1:], dtype=self.dtype)[(slice(None),) + tuple(key[1:])]
+
+        first_record = int(records.min())
+        end_record = int(records.max()) + 1
+
+        array = self.data_store.readRecords(self.item, self.number, first_record, end_record)
+        array = array.reshape((end_record - first_record,) + self.shape[1:])
+
+        if self.missing_value is not None:
+            array[array == self.missing_value] = np.nan
+
+        if self.scale_factor != 1:
+            array *= self.scale_factor
+
+        return array[(records - first_record,) + tuple(key[1:])]
+
+
+class LazyNAToXarray(nappy.nc_interface.na_to_nc.NAToNC):
+    """
+    Converts a NASA Ames file to Xarray objects whose data are lazy arrays.
+    """
+
+    def __init__(self, data_store, **kwargs):
+        self.data_store = data_store
+        nappy.nc_interface.na_to_nc.NAToNC.__init__(self, data_store.na_file_obj, **kwargs)
+
+    def convert(self):
+        """
+        Converts the header to Xarray objects with lazily loaded data.
+        Only the unbounded independent variable is read from the data section.
+        """
+        fin = self.na_file_obj
+        x = self.data_store.getIndependentValues()
+
+        if fin.NIV == 1:
+            fin.X = x
+        else:
+            fin.X[0] = x
+
+        return self._convertLoadedData()
+
+    def _getDataArrays(self, item):
+        """
+        Returns lazy arrays for the data ``item`` ("V" or "A"). They are only made
+        once, however many variables are converted.
+        """
+        if not hasattr(self, "_data_arrays"):
+            self._data_arrays = {}
+
+        if item not in self._data_arrays:
+            self._data_arrays[item] = self._makeDataArrays(item)
+
+        return self._data_arrays[item]
+
+    def _makeDataArrays(self, item):
+        """
+        Makes the lazy arrays for the data ``item`` ("V" or "A").
+        """
+        fin = self.na_file_obj
+        n_records = len(fin.X if fin.NIV == 1 else fin.X[0])
+        arrays = []
+
+        if item == "V":
+            shape = (n_records,) + tuple(fin.NX or [])
+            if fin.NVPM:
+                shape = (n_records, fin.NVPM)
+
+            for number in range(fin.NV):
+                (var_name, units, miss, scal) = fin.getVariable(number)
+                arrays.append(NAVariableBackendArray(self.data_store, item, number, shape, miss, scal))
+        else:
+            for number in range(fin.NAUXV):
+                (var_name, units, miss, scal) = fin.getAuxVariable(number)
+                arrays.append(NAVariableBackendArray(self.data_store, item, number, (n_records,), miss, scal))
+
+        return [indexing.LazilyIndexedArray(array) for array in arrays]
+
+
+def openLazyDataset(filename, drop_variables=None, ignore_header_lines=0, **kwargs):
+    """
+    Returns an Xarray Dataset for NASA Ames file ``filename`` with lazily loaded
+    variables. Other keyword arguments are passed to NAToNC.
+    """
+    kwargs.setdefault("time_warning", False)
+    data_store = NAFileDataStore(filename, ignore_header_lines=ignore_header_lines)
+
+    convertor = LazyNAToXarray(data_store, **kwargs)
+    convertor.convert()
+
+    ds = convertor._buildDataset()
+    if drop_variables:
+        ds = ds.drop_vars(drop_variables, errors="ignore")
+
+    ds.set_close(data_store.close)
+    return ds
+
+
+class NappyBackendEntrypoint(BackendEntrypoint):
+    """
+    Xarray backend entrypoint for NASA Ames files (``engine="nappy"``).
+    """
+    description = "Open NASA Ames files in Xarray using nappy"
+    url = "https://github.com/cedadev/nappy"
+    open_dataset_parameters = ("filename_or_obj", "drop_variables", "ignore_header_lines",
+                               "time_units", "rename_variables")
+
+    def open_dataset(self, filename_or_obj, *, drop_variables=None, ignore_header_lines=0,
+                     time_units=None, rename_variables=None):
+        return openLazyDataset(os.fspath(filename_or_obj), drop_variables=drop_variables,
+                               ignore_header_lines=ignore_header_lines,
+                               time_units=time_units, rename_variables=rename_variables)
+
+    def guess_can_open(self, filename_or_obj):
+        try:
+            return os.path.splitext(os.fspath(filename_or_obj))[1].lower() == ".na"
+        except TypeError:
+            return False
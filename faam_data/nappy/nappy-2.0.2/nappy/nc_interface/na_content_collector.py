@@ -46,7 +46,7 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
     Xarray DataArrays and global attributes (optional).
     """
     
-    def __init__(self, variables, global_attributes=None, requested_ffi=None):
+    def __init__(self, variables, global_attributes=None, requested_ffi=None, axis_cache=None):
         """
         Sets up instance variables and calls appropriate methods to
         generate sections of NASA Ames file object.
@@ -54,6 +54,8 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
         Input arguments are:
           * variables - list/tuple of actual Xarray variables
           * global_attributes - list of user-defined global (key,value) attributes to include.
+          * axis_cache - an xarray_utils.AxisCache to share axis information between
+                         collectors (a new one is used if not set).
 
         Typical usage:
         >>> x = NAContentCollector(["temp", "precip"])
@@ -72,6 +74,7 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
         self.var_ids = None
         self.globals = dict(global_attributes)
         self.requested_ffi = requested_ffi
+        self.axis_cache = axis_cache or xarray_utils.AxisCache()
 
         self.rank_zero_vars = []
         self.rank_zero_var_ids = []
@@ -190,11 +193,11 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
 
                 first_axis = xarray_utils.get_coord_by_index(var, 0)
                 # Check if axis is identical to first axis of main best variable, if so, can be auxiliary var
-                if not xarray_utils.areAxesIdentical(best_var_axes[0], first_axis):
+                if not self.axis_cache.areAxesIdentical(best_var_axes[0], first_axis):
 
                     # If not identical, then it might still qualify as an auxiliary every n time points - valid for 1020
                     if len(var.shape) == 1:
-                        nvpm = xarray_utils.isAxisRegularlySpacedSubsetOf(first_axis, best_var_axes[0])
+                        nvpm = self.axis_cache.isAxisRegularlySpacedSubsetOf(first_axis, best_var_axes[0])
 
                         # NVPM is the number of implied values which is equal to (len(ax2)/len(ax1))
                         if nvpm:
@@ -221,7 +224,7 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
                 # Loop through dimensions
                 for i in range(number_of_dims):            
 
-                    if not xarray_utils.areAxesIdentical(best_var_axes[i], this_var_axes[i]):
+                    if not self.axis_cache.areAxesIdentical(best_var_axes[i], this_var_axes[i]):
                         self.unused_vars.append(var)
                         break
                 else:
@@ -351,9 +354,9 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
             self.na_dict["VMISS"].append(miss)
             self.na_dict["VSCAL"].append(1)
 
-            # Populate the variable list with the array
+            # Populate the variable list with the array (values are loaded in chunks as they are written)
             # Make sure missing values are converted to real values using the required missing value
-            self.na_dict["V"].append(xarray_utils.getArrayAsList(var, missing_value=miss, handle_datetimes=True))
+            self.na_dict["V"].append(xarray_utils.LazyValueList(var, missing_value=miss, handle_datetimes=True))
 
             # Create independent variable info
             if not "X" in self.na_dict:
@@ -364,22 +367,16 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
 
                 self.ax0 = xarray_utils.get_coord_by_index(var, 0)
 
-                self.na_dict["X"] = [xarray_utils.getArrayAsList(self.ax0)]
+                self.na_dict["X"] = [self.axis_cache.getValues(self.ax0).tolist()]
                 self.na_dict["XNAME"] = [xarray_utils.getBestName(self.ax0)]
 
-                if len(self.ax0) == 1:
+                # Increment is the gap between values, or zero if non-uniform interval in axis
+                incr = self.axis_cache.getIncrement(self.ax0)
+
+                if incr is None:
                     self.na_dict["DX"] = [0]
                 else:
-                    # Set default increment as gap between first two
-                    incr = xarray_utils.get_interval(self.ax0, 0, 1)
-
                     self.na_dict["DX"] = [incr]
-                    # Now overwrite it as zero if non-uniform interval in axis
-
-                    for i in range(1, len(self.ax0)):
-                        if xarray_utils.get_interval(self.ax0, i-1, i) != incr:
-                            self.na_dict["DX"] = [0]
-                            break
 
                 # If 1D only then "X" should only be a list and not list of lists
                 if self.na_dict["FFI"] in (1001, 1010, 1020):
@@ -470,8 +467,8 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
 
             self.na_dict["AMISS"].append(miss)
             self.na_dict["ASCAL"].append(1)
-            # Populate the variable list with the array
-            self.na_dict["A"].append(xarray_utils.getArrayAsList(var, missing_value=miss))
+            # Populate the variable list with the array (values are loaded in chunks as they are written)
+            self.na_dict["A"].append(xarray_utils.LazyValueList(var, missing_value=miss))
 
         self.na_dict["NAUXV"] = len(self.na_dict["A"])
 
@@ -493,16 +490,14 @@ class NAContentCollector(nappy.na_file.na_core.NACore):
             self.na_dict["X"].append(axis.data.tolist())        
             return
 
-        incr = xarray_utils.get_interval(axis, 0, 1)
+        incr = self.axis_cache.getIncrement(axis)
 
-        for i in range(1, length):
-            if (axis[i] - axis[i - 1]) != incr:
-                self.na_dict["DX"].append(0)
-                self.na_dict["NXDEF"].append(length)
-                self.na_dict["X"].append(axis.data.tolist())
-                break
+        if incr is None:
+            self.na_dict["DX"].append(0)
+            self.na_dict["NXDEF"].append(length)
+            self.na_dict["X"].append(axis.data.tolist())
 
-        else: # If did not break out of the loop
+        else:
             max_length = length
             if length > 3: 
                 max_length = 3
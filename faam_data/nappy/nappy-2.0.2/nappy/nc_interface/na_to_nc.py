@@ -17,6 +17,7 @@ from collections.abc import Sequence
 # Third-party imports
 import xarray as xr
 import numpy as np
+import netCDF4
 
 # Import from nappy package
 import nappy.nc_interface.na_to_xarray
@@ -85,16 +86,42 @@ class NAToNC(nappy.nc_interface.na_to_xarray.NADictToXarrayObjects):
         for key in obj.attrs:
             self.fix_ints(obj.attrs, key)
 
-    def writeNCFile(self, file_name, mode="w"):
+    def writeNCFile(self, file_name, mode="w", chunk_rows=None, encoding=None):
         """
         Writes the NASA Ames content that has been converted into Xarray objects to a
         NetCDF file of name 'file_name'. Note that mode can be set to append so you 
         can add the data to an existing file.
+
+        If 'chunk_rows' is set then the NASA Ames data section is read and written
+        in chunks of that many records, along an unlimited dimension, so that the
+        whole file is never held in memory (see ``NAFile.iterData``).
+
+        If 'encoding' is set it is a dictionary of {variable_name: encoding} where
+        each encoding is a dictionary of NetCDF storage settings for that variable,
+        such as {"zlib": True, "complevel": 4, "chunksizes": (1000,)}. These are
+        added to the encoding of the Xarray variable (see ``xarray.Dataset.to_netcdf``).
+        Settings under the name "*" apply to all data (non-coordinate) variables.
         """
+        if chunk_rows:
+            return self._writeNCFileInChunks(file_name, chunk_rows, encoding=encoding)
+
         if not self.converted:
             self.convert()
 
         # Build an Xarray Dataset and then write it to NetCDF
+        ds = self._buildDataset()
+        self._applyEncoding(ds, encoding)
+
+        # Write to NetCDF
+        ds.to_netcdf(file_name)
+
+        log.info(f"NetCDF file '{file_name}' written successfully.")
+        return True
+
+    def _buildDataset(self):
+        """
+        Returns an Xarray Dataset built from the converted variables and global attributes.
+        """
         combined_var_list = self.xr_variables + self.xr_aux_variables
 
         # Fix integers in attributes
@@ -104,9 +131,84 @@ class NAToNC(nappy.nc_interface.na_to_xarray.NADictToXarrayObjects):
         variables = {da.name: da for da in combined_var_list}
         ds = xr.Dataset(variables, attrs=dict(self.global_attributes))
         self.fix_attrs(ds)
+        return ds
 
-        # Write to NetCDF
-        ds.to_netcdf(file_name)
+    def _applyEncoding(self, ds, encoding):
+        """
+        Adds the settings in ``encoding`` (a dictionary of {variable_name: encoding})
+        to the encoding of each named variable in Dataset ``ds``. Settings for "*"
+        are added to all data variables first.
+        """
+        encoding = dict(encoding or {})
+        default_encoding = encoding.pop("*", None)
+
+        if default_encoding:
+            for da in ds.data_vars.values():
+                ds.variables[da.name].encoding.update(default_encoding)
+
+        for (var_name, var_encoding) in encoding.items():
+            if var_name not in ds.variables:
+                raise Exception(f"Cannot set encoding for unknown variable: {var_name}")
+
+            ds.variables[var_name].encoding.update(var_encoding)
+
+    def _loadChunk(self, chunk):
+        """
+        Puts a chunk of (X, V, A) arrays from ``NAFile.iterData`` into the NASA Ames
+        file object and converts it to Xarray objects.
+        """
+        (x, v, a) = chunk
+        na_file_obj = self.na_file_obj
+
+        if na_file_obj.NIV == 1:
+            na_file_obj.X = x
+        else:
+            na_file_obj.X[0] = x
+
+        na_file_obj.V = list(v)
+        if a is not None:
+            na_file_obj.A = list(a)
+
+        # Throw away objects converted from the previous chunk
+        for attr in ("xr_axes", "xr_variables", "xr_aux_variables"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+        self._convertLoadedData()
+
+    def _writeNCFileInChunks(self, file_name, chunk_rows, encoding=None):
+        """
+        Writes the first chunk of records to a new NetCDF file with the unbounded
+        independent variable as an unlimited dimension, then appends each
+        subsequent chunk along that dimension. Any ``encoding`` (see writeNCFile)
+        is set when the file is created so later chunks are stored the same way.
+        """
+        chunks = self.na_file_obj.iterData(chunk_rows=chunk_rows)
+        first_chunk = next(chunks, None)
+
+        if first_chunk is None:
+            raise Exception(f"No data found in NASA Ames file to write to: {file_name}")
+
+        self._loadChunk(first_chunk)
+        unlimited_dim = self.xr_axes[0].name
+
+        ds = self._buildDataset()
+        self._applyEncoding(ds, encoding)
+        ds.to_netcdf(file_name, unlimited_dims=[unlimited_dim])
+        count = ds.sizes[unlimited_dim]
+
+        with netCDF4.Dataset(file_name, "a") as nc:
+
+            for chunk in chunks:
+                self._loadChunk(chunk)
+                length = len(self.xr_axes[0])
+
+                for da in [self.xr_axes[0]] + self.xr_variables + self.xr_aux_variables:
+                    if unlimited_dim in da.dims:
+                        # Masked (NaN) values are written as the variable's _FillValue
+                        nc.variables[da.name][count:count + length] = np.ma.masked_invalid(da.values)
+
+                count += length
 
         log.info(f"NetCDF file '{file_name}' written successfully.")
         return True
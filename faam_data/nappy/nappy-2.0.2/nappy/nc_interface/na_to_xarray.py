@@ -36,7 +36,7 @@ hp = header_partitions
 
 # Define global variables
 safe_nc_id = re.compile(r"[\/\s\[\(\)\]\=\+\-\?\#\~\@\&\$\%\!\*\{\}\^]+")
-time_units_pattn = re.compile(r"\w+\s+since\s+\d{1,4}-\d{1,2}-\d{1,2}(\s+\d+:\d+:\d+)?")
+time_units_pattn = nappy.utils.common_utils.time_units_pattn
 max_id_length = 64
 special_comment_known_strings = (hp["sc_start"], hp["sc_end"], hp["addl_vatts"],
                                   hp["addl_globals"], "\n")
@@ -105,8 +105,34 @@ class NADictToXarrayObjects:
             log.info("Already converted to Xarray objects so not re-doing.")
             return (self.xr_variables, self.xr_aux_variables, self.global_attributes)
 
-        self.na_file_obj.readData()
+        self.na_file_obj.readData(variables=self._getRequestedVarNumbers())
+        return self._convertLoadedData()
 
+    def _getRequestedVarNumbers(self):
+        """
+        Returns a list of the numbers of the variables requested for conversion,
+        or None if all variables are requested, so that only those are read.
+        """
+        if self.variables in (None, "all"):
+            return None
+
+        var_numbers = []
+        for var in self.variables:
+            if isinstance(var, int) or re.match(r"\d+", str(var)):
+                var_numbers.append(int(var))
+            elif var in self.na_file_obj.VNAME:
+                var_numbers.append(self.na_file_obj.VNAME.index(var))
+            else:
+                raise Exception(f"Variable name not known: {var}")
+
+        return var_numbers
+
+    def _convertLoadedData(self):
+        """
+        Converts the data currently held by the NASA Ames file object (without
+        reading it) to Xarray objects.
+        Returns (variable_list, aux_variable_list, global_attributes_list).
+        """
         # Convert global attribute
         self._mapNACommentsToGlobalAttributes()
 
@@ -243,6 +269,52 @@ class NADictToXarrayObjects:
                     else:
                         raise Exception(f"Variable name not known: {var_name}")
 
+    def _getDataArrays(self, item):
+        """
+        Returns the data ``item`` ("V" or "A") of the NASA Ames file object as a
+        list of float64 arrays with missing values set to NaN and scale factors
+        applied. The first time an item is needed all its values are copied once
+        into a single new array (whose views are returned and kept until the item
+        is replaced) so that the NASA Ames file object is not changed.
+        """
+        if not hasattr(self, "_data_arrays"):
+            self._data_arrays = {}
+
+        fin = self.na_file_obj
+        source = getattr(fin, item)
+
+        # Copy again if the item has been replaced (e.g. by the next chunk)
+        if self._data_arrays.get(item, (None,))[0] is not source:
+            arrays = list(np.array(source, dtype=np.float64))
+
+            if item == "V":
+                # V may only hold the variables that were requested
+                var_numbers = getattr(fin, "var_numbers", None)
+                numbers = range(fin.NV) if var_numbers is None else var_numbers
+                get_variable = fin.getVariable
+            else:
+                numbers = range(fin.NAUXV)
+                get_variable = fin.getAuxVariable
+
+            for (array, number) in zip(arrays, numbers):
+                (var_name, units, miss, scal) = get_variable(number)
+                self._maskAndScale(array, miss, scal)
+
+            self._data_arrays[item] = (source, arrays)
+
+        return self._data_arrays[item][1]
+
+    def _maskAndScale(self, array, miss, scal):
+        """
+        Sets missing values in ``array`` to NaN and applies the scale factor (only if
+        it is not 1) without copying the array.
+        """
+        if miss is not None:
+            array[array == miss] = np.nan
+
+        if scal != 1:
+            array *= scal
+
     def _convertNAToXarrayVariable(self, var_number, attributes=None):
         """
         Creates a single Xarray variable from the variable number provided in the list.
@@ -256,12 +328,12 @@ class NADictToXarrayObjects:
         log.debug(msg)
         self.output_message.append(msg)
 
-        array = np.array(self.na_file_obj.V[var_number])
-
-        if miss:
-            array = np.ma.masked_array(array, fill_value=miss)
-
-        array = array * scal
+        # V may only hold the variables that were requested
+        var_numbers = getattr(self.na_file_obj, "var_numbers", None)
+        if var_numbers is None:
+            array = self._getDataArrays("V")[var_number]
+        else:
+            array = self._getDataArrays("V")[var_numbers.index(var_number)]
 
         # Set up axes
         if not hasattr(self, 'xr_axes'):
@@ -326,11 +398,7 @@ class NADictToXarrayObjects:
              
         (var_name, units, miss, scal) = self.na_file_obj.getAuxVariable(avar_number)
 
-        array = np.array(self.na_file_obj.A[avar_number])
-        if miss:
-            array = np.ma.masked_array(array, fill_value=miss)
-
-        array = array * scal
+        array = self._getDataArrays("A")[avar_number]
 
         msg="\nAdding auxiliary variable: %s" % self.na_file_obj.ANAME[avar_number]
         log.debug(msg)
@@ -13,6 +13,7 @@ Holds the class XarrayToNA that converts a set of Xarray variables (DataArrays)
 # Imports from python standard library
 import sys
 import logging
+import concurrent.futures
 
 import xarray as xr
 import numpy as np
@@ -20,7 +21,7 @@ import numpy as np
 # Import from nappy package
 import nappy
 import nappy.utils
-from nappy.utils.common_utils import modifyNADictCopy, get_rank_zero_array_value
+from nappy.utils.common_utils import modifyNADictCopy, getListWindow, get_rank_zero_array_value
 
 import nappy.na_file.na_core
 
@@ -49,6 +50,17 @@ DEBUG = nappy.utils.getDebug()
 log = logging.getLogger(__name__)
 
 
+def _writeNAFile(file_name, na_dict, write_kwargs):
+    """
+    Writes the contents of ``na_dict`` to NASA Ames file ``file_name``.
+    Returns the file name.
+    """
+    x = nappy.openNAFile(file_name, 'w', na_dict)
+    x.write(**write_kwargs)
+    x.close()
+    return file_name
+
+
 class XarrayToNA:
     """
     Converts Xarray objects to NASA Ames file dictionaries.
@@ -93,42 +105,115 @@ class XarrayToNA:
         # from a NASA Ames file originally
         variables = self._reorderVars(variables)
 
-        # Make first call to collector class that creates NA dict from Xarray variables and global atts list 
-        collector = nappy.nc_interface.na_content_collector.NAContentCollector(variables, 
-                                        self.global_attributes, requested_ffi=self.requested_ffi)
-        collector.collectNAContent()
+        # Share information about axes between all calls to the collector
+        axis_cache = xarray_utils.AxisCache()
 
-        # Return if no files returned
-        if not collector.found_na:
-            msg = "\nNo files created after variables parsed."
-            if DEBUG: log.debug(msg)
-            self.output_message.append(msg)
-            return None
+        # Sort the variables into groups that share all their axes (in one pass)
+        (rank_zero_vars, groups) = self._groupVariablesByAxes(variables, axis_cache)
+
+        na_dict_list = []
 
-        # NOTE: collector has attributes: na_dict, var_ids, unused_vars
+        # The first call to the collector (that creates NA dict from Xarray variables
+        # and global atts list) also gets the singleton variables
+        while not na_dict_list or groups:
+            vars_for_collector = rank_zero_vars if not na_dict_list else []
+            keys = []
 
-        # Set up a list to collect multiple calls to content collector
-        na_dict_list = [(collector.na_dict, collector.var_ids)]
+            if groups:
+                keys = self._getNextGroupKeys(groups, axis_cache)
+                vars_for_collector = vars_for_collector + [item for key in keys for item in groups[key]]
 
-        # If there are variables that were not captured (i.e. unused) by NAContentCollector then loop through these
-        # in attempt to convert all to a set of na_dicts
-        log.debug(f"\nUnused_vars: {collector.unused_vars}")
-        while len(collector.unused_vars) > 0:
-            collector = nappy.nc_interface.na_content_collector.NAContentCollector(collector.unused_vars, 
+            vars_for_collector = [var for (index, var) in sorted(vars_for_collector, key=lambda item: item[0])]
+
+            collector = nappy.nc_interface.na_content_collector.NAContentCollector(vars_for_collector, 
                                         self.global_attributes, requested_ffi=self.requested_ffi,
-                                        )
+                                        axis_cache=axis_cache)
             collector.collectNAContent()           
-            self.output_message += collector.output_message
 
-            # Append to list if more variables were captured
-            if collector.found_na:
-                na_dict_list.append((collector.na_dict, collector.var_ids))
+            if not na_dict_list:
+                # Return if no files returned
+                if not collector.found_na:
+                    msg = "\nNo files created after variables parsed."
+                    if DEBUG: log.debug(msg)
+                    self.output_message.append(msg)
+                    return None
+            else:
+                self.output_message += collector.output_message
+
+            # NOTE: collector has attributes: na_dict, var_ids, unused_vars
+            na_dict_list.append((collector.na_dict, collector.var_ids))
+
+            # Variables that were not captured (i.e. unused) by NAContentCollector stay
+            # in their groups to be converted by a later call
+            self._removeUsedVariables(groups, keys, collector.unused_vars)
+            log.debug(f"\nUnused_vars: {collector.unused_vars}")
 
         self.na_dict_list = na_dict_list
         self.converted = True
 
         return self.na_dict_list
 
+    def _groupVariablesByAxes(self, variables, axis_cache):
+        """
+        Sorts ``variables`` into groups of variables defined on the same axes,
+        by looking up the fingerprint of each axis (see AxisCache.getFingerprint).
+        Returns a tuple of (rank_zero_vars, groups) where rank_zero_vars is a list of
+        (index, variable) and groups is a dictionary of {fingerprints: [(index, variable), ...]}
+        in order of first appearance, so the whole partition takes one pass.
+        """
+        rank_zero_vars = []
+        groups = {}
+
+        for (index, var) in enumerate(variables):
+            if len(var.shape) == 0:
+                rank_zero_vars.append((index, var))
+                continue
+
+            key = tuple(axis_cache.getFingerprint(axis) for axis in xarray_utils.getAxisList(var))
+            groups.setdefault(key, []).append((index, var))
+
+        return (rank_zero_vars, groups)
+
+    def _getNextGroupKeys(self, groups, axis_cache):
+        """
+        Returns the keys of the group that the collector would pick next (the
+        highest rank, then the biggest size, then the first to appear) followed by
+        those of any groups of 1D variables that may be its auxiliary variables,
+        i.e. those on its first axis or on a regularly spaced subset of it.
+        """
+        key = min(groups, key=lambda key: (-len(key), -int(np.prod([fp[3][0] for fp in key])),
+                                           groups[key][0][0]))
+        best_var = groups[key][0][1]
+        first_axis = xarray_utils.get_coord_by_index(best_var, 0)
+
+        keys = [key]
+
+        for (other_key, other_group) in groups.items():
+            # Variables with the same shape can only be used if they are in the group
+            if len(other_key) != 1 or other_key == key or other_group[0][1].shape == best_var.shape:
+                continue
+
+            other_axis = xarray_utils.get_coord_by_index(other_group[0][1], 0)
+
+            if other_key[0] == key[0] or axis_cache.isAxisRegularlySpacedSubsetOf(other_axis, first_axis):
+                keys.append(other_key)
+
+        return keys
+
+    def _removeUsedVariables(self, groups, keys, unused_vars):
+        """
+        Removes the variables that were given to the collector (those in the groups
+        with ``keys``) but are not in ``unused_vars`` from ``groups``, removing any
+        groups that are then empty.
+        """
+        unused_ids = set(id(var) for var in unused_vars)
+
+        for key in keys:
+            groups[key] = [(index, var) for (index, var) in groups[key] if id(var) in unused_ids]
+
+            if not groups[key]:
+                del groups[key]
+
     def _convertSingletonVars(self, variables):
         """
         Loops through variables to convert singleton variables (i.e. Masked Arrays/Numeric Arrays) 
@@ -227,16 +312,57 @@ class XarrayToNA:
         return file_names
 
     def writeNAFiles(self, na_file=None, delimiter=default_delimiter, annotation=False,
-                     float_format=default_float_format, size_limit=None, no_header=False):
+                     float_format=default_float_format, size_limit=None, no_header=False,
+                     workers=1):
         """
         Writes the self.na_dict_list content to one or more NASA Ames files.
         Output file names are based on the self.nc_file name unless specified
         in the na_file_name argument in which case that provides the main name
         that is appended to if multiple output file names are required.
+
+        If ``workers`` is more than 1 (or None, meaning the number of CPUs) the
+        files (including each volume of a file split on ``size_limit``) are
+        written concurrently in a pool of worker processes. The file names and
+        volume numbers are the same as when they are written one at a time.
         """
         if not self.converted: 
             self.convert()
 
+        if workers == 1:
+            self._executor = None
+        else:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+        self._write_futures = []
+
+        try:
+            self._writeNAFiles(na_file, delimiter=delimiter, annotation=annotation,
+                               float_format=float_format, size_limit=size_limit, no_header=no_header)
+
+            # Wait for all the files to be written (raising any errors)
+            for future in self._write_futures:
+                future.result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+        return self.output_message
+
+    def _submitNAFileWrite(self, file_name, na_dict, **write_kwargs):
+        """
+        Writes ``na_dict`` to ``file_name`` now, or submits it to be written by
+        the pool of workers if there is one.
+        """
+        if self._executor is None:
+            _writeNAFile(file_name, na_dict, write_kwargs)
+        else:
+            self._write_futures.append(self._executor.submit(_writeNAFile, file_name, na_dict, write_kwargs))
+
+    def _writeNAFiles(self, na_file, delimiter, annotation, float_format, size_limit, no_header):
+        """
+        Works out the content of each output file and writes it (see writeNAFiles).
+        """
         # Gets a list of NA file_names that will be produced.
         file_names = self.constructNAFileNames(na_file)
 
@@ -319,11 +445,8 @@ class XarrayToNA:
             # If not having to split file into multiple outputs (normal condition)
             else:		
                 log.info("Output NA file name: %s" % file_name)
-                x = nappy.openNAFile(file_name, 'w', this_na_dict)
-                x.write(delimiter=delimiter, float_format=float_format,
-                        no_header=no_header, annotation=annotation)
-
-                x.close()
+                self._submitNAFileWrite(file_name, this_na_dict, delimiter=delimiter, float_format=float_format,
+                                        no_header=no_header, annotation=annotation)
                 file_list.append(file_name)
 
             # Report on what has been written
@@ -362,8 +485,6 @@ class XarrayToNA:
         self.output_message.append(msg)
         self.output_files_written = file_list
 
-        return self.output_message
-
     def _writeNAFileSubsetsWithinSizeLimit(self, this_na_dict, file_name, delimiter, 
                       float_format, size_limit, annotation):
         """
@@ -392,10 +513,8 @@ class XarrayToNA:
             if end > array_length:
                 end = array_length
 
-            current_block = []
-            # Write new V array
-            for v in var_list:
-                current_block.append(v[start:end])
+            # Write new V array: as views of the values so that nothing is copied
+            current_block = [getListWindow(v, start, end) for v in var_list]
 
             # Adjust X accordingly in the na dictionary, because independent variable has been reduced in size
             na_dict_copy = modifyNADictCopy(this_na_dict, current_block, 
@@ -405,9 +524,8 @@ class XarrayToNA:
             file_names.append(file_name_plus_letter)
 
             # Write data to output file
-            x = nappy.openNAFile(file_name_plus_letter, 'w', na_dict_copy)
-            x.write(delimiter=delimiter, float_format=float_format, annotation=annotation)
-            x.close()
+            self._submitNAFileWrite(file_name_plus_letter, na_dict_copy, delimiter=delimiter,
+                                    float_format=float_format, annotation=annotation)
 
             msg = "\nOutput files split on size limit: %s\nFilename used: %s" % (size_limit, file_name_plus_letter)
             if DEBUG: log.debug(msg)
@@ -6,6 +6,7 @@ A set of useful functions involving xarray objects.
 """
 
 import re
+import hashlib
 
 import numpy as np
 import xarray as xr
@@ -103,7 +104,7 @@ def isUniformlySpaced(arr):
     end = arr[-1]
     length = len(arr)
 
-    return all(np.linspace(start, end, length) == arr)
+    return bool(np.all(np.linspace(start, end, length) == arr))
 
 
 def isAxisRegularlySpacedSubsetOf(ax1, ax2):
@@ -141,7 +142,7 @@ def areAxesIdentical(ax1, ax2, is_subset=False, check_id=True):
     # Do different comparisons depending on 'is_subset' argument
     if is_subset == False:
         # Check lengths and values only
-        if (len(ax1) != len(ax2)) or all(ax1.data != ax2.data):
+        if (len(ax1) != len(ax2)) or np.all(ax1.values != ax2.values):
             return False
 
     else:
@@ -153,15 +154,11 @@ def areAxesIdentical(ax1, ax2, is_subset=False, check_id=True):
         if len2 % len1 != 0:
             return False
 
-        # Now test if it is subset
+        # Now test if it is subset: every n'th value of ax2 must be in ax1
         n = int(len2 / len1)
 
-        for i in range(len(ax1)):
-            ax2_value = ax2[n*i]
-            test_value = ax1[i]
-
-            if ax2_value != test_value:
-                return False
+        if np.any(ax2.values[::n] != ax1.values):
+            return False
 
         # If we got here then return len2 / len1
         return n
@@ -238,7 +235,7 @@ def is_time(coord, test_by_values=False):
     if np.issubdtype(coord.dtype, np.datetime64):
         return True
 
-    if isinstance(np.atleast_1d(coord.values)[0], cftime.datetime):
+    if coord.size > 0 and isinstance(_getFirstValue(coord), cftime.datetime):
         return True
 
     if hasattr(coord, "axis"):
@@ -250,14 +247,19 @@ def is_time(coord, test_by_values=False):
 
     if test_by_values and len(coord) > 0:
         # Test the first value to see if it is a datetime object
-        values = resolve_array(coord.data)
-
-        if isinstance(values.flat[0], cftime.datetime):
+        if isinstance(_getFirstValue(coord), cftime.datetime):
             return True
 
     return False
 
 
+def _getFirstValue(da):
+    """
+    Returns the first value of DataArray ``da`` (only loading that value).
+    """
+    return np.atleast_1d(resolve_array(da[(0,) * da.ndim].values))[0]
+
+
 def get_coord_by_index(da, indx):
     """
     Take an Xarray DataArray, return a coordinate by its index in the
@@ -286,8 +288,10 @@ def create_data_array(arr, name, coords, attrs, fill_value):
 
 
 def datetimes_to_nums(da):
-    units = da.time.encoding['units']
-    calendar = da.time.encoding.get('calendar', 'standard')
+    # Time axes (of any name) hold their own encoding, variables use that of their time axis
+    encoding = da.encoding if "units" in da.encoding else da.time.encoding
+    units = encoding['units']
+    calendar = encoding.get('calendar', 'standard')
     arr = cftime.date2num(da.data, units, calendar=calendar)
     return arr
 
@@ -303,6 +307,115 @@ def get_interval(da, indx1, indx2, handle_datetimes=True):
     return arr[indx2] - arr[indx1]
 
 
+def getAxisValues(axis):
+    """
+    Returns the values of ``axis`` as a NumPy array, converting datetimes to
+    numbers (using the time units and calendar).
+    """
+    if is_time(axis):
+        return np.asarray(datetimes_to_nums(axis))
+
+    return np.asarray(resolve_array(axis.values))
+
+
+def getRegularIncrement(values):
+    """
+    Returns the increment between ``values`` (a 1D array with at least two values)
+    if every increment is exactly the same, otherwise returns None.
+    """
+    incr = values[1] - values[0]
+
+    if np.all(np.diff(values) == incr):
+        return incr
+    return None
+
+
+class AxisCache:
+    """
+    Holds the values, regularity and fingerprint of each axis (coordinate), and
+    the results of comparing pairs of axes, so that they are only worked out once
+    however many variables share the axes. Axes are matched by their underlying
+    xarray Variable, which is shared by all the DataArrays taken from the same
+    Dataset. A cache should only be used while the axes are not being modified.
+    """
+
+    def __init__(self):
+        # Dictionaries of {id(variable): variable}, {id(variable): (values, increment)},
+        # {id(variable): fingerprint} and {(axis key, axis key, is_subset, check_id): result}
+        self._variables = {}
+        self._axes = {}
+        self._fingerprints = {}
+        self._comparisons = {}
+
+    def _getAxisId(self, axis):
+        # Keep a reference to the variable so that its id is not re-used
+        variable = axis.variable
+        self._variables[id(variable)] = variable
+        return id(variable)
+
+    def _getAxisInfo(self, axis):
+        axis_id = self._getAxisId(axis)
+
+        if axis_id not in self._axes:
+            values = getAxisValues(axis)
+            incr = getRegularIncrement(values) if len(values) > 1 else None
+            self._axes[axis_id] = (values, incr)
+
+        return self._axes[axis_id]
+
+    def getValues(self, axis):
+        """
+        Returns the values of ``axis`` as a NumPy array (see getAxisValues).
+        """
+        return self._getAxisInfo(axis)[0]
+
+    def getIncrement(self, axis):
+        """
+        Returns the increment between the values of ``axis`` if they are regularly
+        spaced, otherwise None (see getRegularIncrement).
+        """
+        return self._getAxisInfo(axis)[1]
+
+    def getFingerprint(self, axis):
+        """
+        Returns a hashable fingerprint of ``axis``: its name, units, type, shape
+        and a digest of its values. Axes with the same fingerprint are identical
+        (see areAxesIdentical) even if they are held by different Variables.
+        """
+        axis_id = self._getAxisId(axis)
+
+        if axis_id not in self._fingerprints:
+            values = self.getValues(axis)
+
+            if values.dtype.kind == "O":
+                data = repr(values.tolist()).encode("utf-8")
+            else:
+                data = np.ascontiguousarray(values).tobytes()
+
+            self._fingerprints[axis_id] = (axis.name, str(getattr(axis, "units", None)), values.dtype.str,
+                                           values.shape, hashlib.sha1(data).hexdigest())
+
+        return self._fingerprints[axis_id]
+
+    def areAxesIdentical(self, ax1, ax2, is_subset=False, check_id=True):
+        """
+        Returns the (remembered) result of areAxesIdentical for the two axes.
+        """
+        key = ((self._getAxisId(ax1), ax1.name), (self._getAxisId(ax2), ax2.name),
+               is_subset, check_id)
+
+        if key not in self._comparisons:
+            self._comparisons[key] = areAxesIdentical(ax1, ax2, is_subset=is_subset, check_id=check_id)
+
+        return self._comparisons[key]
+
+    def isAxisRegularlySpacedSubsetOf(self, ax1, ax2):
+        """
+        Returns the (remembered) result of isAxisRegularlySpacedSubsetOf for the two axes.
+        """
+        return self.areAxesIdentical(ax1, ax2, is_subset=True, check_id=False)
+
+
 def getArrayAsList(da, missing_value=None, handle_datetimes=True):
     """
     Takes a DataArray ``da``.
@@ -331,6 +444,87 @@ def getArrayAsList(da, missing_value=None, handle_datetimes=True):
     return arr.tolist()
 
 
+class LazyValueList:
+    """
+    Gives list-like access to the values of DataArray ``da`` (along its first
+    dimension) for writing to NASA Ames, in the same form as ``getArrayAsList``.
+    Values are only loaded from ``da`` ``chunk_size`` records at a time, so
+    iterating over it, or indexing it record by record, never holds the whole
+    array in memory. Slicing returns a list.
+    """
+
+    chunk_size = 10000
+
+    def __init__(self, da, missing_value=None, handle_datetimes=True):
+        self.da = da
+        self.missing_value = missing_value
+        self.handle_datetimes = handle_datetimes and is_time(da, test_by_values=True)
+
+        # The most recently loaded chunk: (start, end, values)
+        self._chunk = (0, 0, [])
+
+    def __len__(self):
+        return self.da.shape[0]
+
+    def _getValues(self, key):
+        """
+        Returns the values of ``self.da[key]`` as a (nested) list.
+        """
+        da = self.da[key]
+
+        if self.handle_datetimes:
+            arr = datetimes_to_nums(da)
+        else:
+            arr = resolve_array(da.values)
+
+            if self.missing_value is not None and arr.dtype.kind == "f":
+                nans = np.isnan(arr)
+
+                if nans.any():
+                    arr = arr.copy()
+                    arr[nans] = self.missing_value
+
+        return np.asarray(arr).tolist()
+
+    def __iter__(self):
+        for start in range(0, len(self), self.chunk_size):
+            for value in self._getValues(slice(start, start + self.chunk_size)):
+                yield value
+
+    def __getitem__(self, key):
+        if not isinstance(key, (int, np.integer)):
+            return self._getValues(key)
+
+        if key < 0:
+            key += len(self)
+
+        (start, end, values) = self._chunk
+
+        if not start <= key < end:
+            if not 0 <= key < len(self):
+                raise IndexError("LazyValueList index out of range")
+
+            (start, end) = (key, min(key + self.chunk_size, len(self)))
+            values = self._getValues(slice(start, end))
+            self._chunk = (start, end, values)
+
+        return values[key - start]
+
+    def tolist(self):
+        return self._getValues(slice(None))
+
+    def getWindow(self, start, end):
+        """
+        Returns a LazyValueList of the values from ``start`` to ``end`` (without
+        loading them).
+        """
+        window = LazyValueList.__new__(LazyValueList)
+        window.da = self.da[start:end]
+        (window.missing_value, window.handle_datetimes) = (self.missing_value, self.handle_datetimes)
+        window._chunk = (0, 0, [])
+        return window
+
+
 def resolve_array(arr):
     """
     Takes an array that may be a numpy/masked or Dask array.
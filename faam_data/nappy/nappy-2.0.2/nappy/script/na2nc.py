@@ -14,8 +14,14 @@ Usage
 
    na2nc.py [-m <mode>] [-g <global_atts_list>]
             [-r <rename_vars_list>] [-t <time_units>] [-n]
+            [--chunk-rows <rows>] [--zlib <level>]
             -i <na_file> [-o <nc_file>]
 
+   na2nc.py --batch [--jobs <n>] [-g <global_atts_list>]
+            [-r <rename_vars_list>] [-t <time_units>] [-n]
+            [--chunk-rows <rows>] [--zlib <level>]
+            -i <na_dir> [-o <nc_dir>]
+
 Where
 -----
 
@@ -27,6 +33,14 @@ Where
     <na_file>			is the input NASA Ames file path
     <nc_file>			is the output NetCDF file path (default is to replace ".na" from NASA Ames
            			 file with ".nc").
+    --batch			converts all ".na" files in directory <na_dir> to NetCDF files in
+           			 directory <nc_dir> (default is <na_dir>). Outputs that are newer than
+           			 their input are skipped.
+    <n>				is the number of worker processes for batch mode (default is the
+           			 number of CPUs)
+    <rows>			is the number of records to read and write at a time, so that the
+           			 whole file is never held in memory
+    <level>			is the zlib compression level (1-9) to use for all variables
 
 """
 
@@ -63,9 +77,13 @@ def parseArgs(args):
     a["time_units"] = None
     a["time_warning"] = True
     a["nc_file"] = None
+    a["batch"] = False
+    a["jobs"] = None
+    a["chunk_rows"] = None
+    a["encoding"] = None
 
     try:
-        (arg_list, dummy) = getopt.getopt(args, "i:o:m:v:a:g:t:nr:")
+        (arg_list, dummy) = getopt.getopt(args, "i:o:m:v:a:g:t:nr:", ["batch", "jobs=", "chunk-rows=", "zlib="])
     except getopt.GetoptError as e:
         exitNicely(str(e))
 
@@ -90,13 +108,24 @@ def parseArgs(args):
             a["time_warning"] = False
         elif arg == "-r":
             a["rename_variables"] = makeDictFromCommaSepString(value)
+        elif arg == "--batch":
+            a["batch"] = True
+        elif arg == "--jobs":
+            a["jobs"] = int(value)
+        elif arg == "--chunk-rows":
+            a["chunk_rows"] = int(value)
+        elif arg == "--zlib":
+            a["encoding"] = {"*": {"zlib": True, "complevel": int(value)}}
         else:
             exitNicely("Argument '" + arg + "' not recognised!")
 
     if not a["na_file"]:
         exitNicely("Please provide argument '-i <na_file>'")
 
-    if not a["nc_file"]:
+    if a["jobs"] is not None and not a["batch"]:
+        exitNicely("Argument '--jobs' can only be used with '--batch'.")
+
+    if not a["nc_file"] and not a["batch"]:
         fn = a["na_file"]
         if fn[-3:] == ".na": fn = fn[:-3]
         nc_file = fn + ".nc"
@@ -115,10 +144,41 @@ def na2nc(args=None):
         args = sys.argv[1:]
 
     arg_dict = parseArgs(args)
+
+    if arg_dict.pop("batch"):
+        return na2ncBatch(arg_dict)
+
+    del arg_dict["jobs"]
     nc_file = nappy.convertNAToNC(**arg_dict)
     return nc_file
 
 
+def na2ncBatch(arg_dict):
+    """
+    Converts a directory of NASA Ames files to NetCDF and reports on each file.
+    """
+    if arg_dict.pop("mode") != "w":
+        exitNicely("Only mode 'w' is supported with '--batch'.")
+
+    results = nappy.convertNADirectoryToNC(arg_dict.pop("na_file"), arg_dict.pop("nc_file"),
+                                           workers=arg_dict.pop("jobs"), **arg_dict)
+
+    for (na_file, nc_file, status, seconds, error) in results:
+        if status == "failed":
+            print("FAILED:    %s (%.2fs): %s" % (na_file, seconds, error))
+        elif status == "skipped":
+            print("Skipped:   %s (up to date)" % na_file)
+        else:
+            print("Converted: %s -> %s (%.2fs)" % (na_file, nc_file, seconds))
+
+    failures = len([result for result in results if result[2] == "failed"])
+    print("\n%d files converted, %d skipped, %d failed." % (
+          len([result for result in results if result[2] == "converted"]),
+          len([result for result in results if result[2] == "skipped"]), failures))
+
+    return results
+
+
 if __name__ == "__main__":
 
     args=sys.argv[1:]
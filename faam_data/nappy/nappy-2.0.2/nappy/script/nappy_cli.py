@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+#   Copyright (C) 2004 CCLRC & NERC( Natural Environment Research Council ).
+#   This software may be distributed under the terms of the
+#   Q Public License, version 1.0 or later. http://ndg.nerc.ac.uk/public_docs/QPublic_license.txt
+
+"""
+nappy_cli.py
+============
+
+General nappy commands (installed as the "nappy" command).
+
+Usage
+=====
+
+   nappy cache clear
+   nappy cache info
+
+Where
+-----
+
+    cache clear			removes all entries from the cache of parsed NASA Ames files
+    cache info			prints the cache directory, number of entries and total size
+
+"""
+
+# Imports from python standard library
+import sys
+
+# Import from nappy package
+import nappy.utils.na_cache
+
+
+def exitNicely(msg=""):
+    "Exits nicely!"
+    print(__doc__)
+    if msg != "": print("ERROR:", msg)
+    sys.exit()
+
+
+def nappy_cli(args=None):
+    """
+    Controller for the nappy command.
+    """
+    if args is None:
+        args = sys.argv[1:]
+
+    if len(args) != 2 or args[0] != "cache":
+        exitNicely("Please provide a command such as 'cache clear'.")
+
+    cache_dir = nappy.utils.na_cache.getCacheDir()
+
+    if args[1] == "clear":
+        count = nappy.utils.na_cache.clearCache()
+        print("Removed %d entries from cache: %s" % (count, cache_dir))
+    elif args[1] == "info":
+        (count, size) = nappy.utils.na_cache.getCacheInfo()
+        print("Cache directory: %s" % cache_dir)
+        print("Entries: %d" % count)
+        print("Total size (bytes): %d" % size)
+    else:
+        exitNicely("Cache command '" + args[1] + "' not recognised!")
+
+
+if __name__ == "__main__":
+
+    nappy_cli()
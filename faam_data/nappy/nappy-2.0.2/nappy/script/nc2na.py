@@ -16,7 +16,7 @@ Usage
     nc2na.py [-v <var_list>] [--ffi=<ffi>] [-f <float_format>]
              [-d <delimiter>] [-l <limit_ffi_1001_rows>]
              [-e <exclude_vars>] [--overwrite-metadata=<key1>,<value1>[,<key2>,<value2>[...]]]
-             [--names-only] [--no-header] [--annotated]
+             [--names-only] [--no-header] [--annotated] [--jobs=<n>]
              -i <nc_file> [-o <na_file>]
 Where
 -----
@@ -35,6 +35,7 @@ Where
     --names-only		- only display a list of file names that would be written (i.e. don't convert actual files).
     --no-header			- Do not write NASA Ames header
     --annotated			- add annotation column in first column
+    --jobs=<n>			- write the output files using <n> worker processes (e.g. when split with -l)
 
 """
 
@@ -74,11 +75,12 @@ def parseArgs(args):
     a["na_file"] = None
     a["no_header"] = False
     a["annotation"] = False
+    a["workers"] = 1
 
     try:
         (arg_list, dummy) = getopt.getopt(args, "i:o:v:f:d:l:e:",
                               ["ffi=", "overwrite-metadata=", "names-only",
-                               "no-header", "annotated"])
+                               "no-header", "annotated", "jobs="])
     except getopt.GetoptError as e:
         exitNicely(str(e))
 
@@ -95,7 +97,7 @@ def parseArgs(args):
             a["float_format"] = value
         elif arg == "-d":
             a["delimiter"] = value
-        elif arg == "--limit_ffi_1001_rows":
+        elif arg == "-l":
             a["size_limit"] = int(value)
         elif arg == "-e":
             a["exclude_vars"] = value.split(",")
@@ -107,6 +109,8 @@ def parseArgs(args):
             a["no_header"] = True
         elif arg == "--annotated":
             a["annotation"] = True
+        elif arg == "--jobs":
+            a["workers"] = int(value)
         else:
             exitNicely("Argument '" + arg + "' not recognised!")
 
@@ -12,6 +12,9 @@ Functions and classes commonly used in nappy.
 
 # Standard library imports
 from io import StringIO
+import importlib
+import itertools
+import re
 import logging
 
 import numpy as np
@@ -23,27 +26,67 @@ from nappy.utils import text_parser
 
 log = logging.getLogger(__name__)
 
+# Pattern for CF time units, e.g. "seconds since 2019-07-29 00:00:00"
+time_units_pattn = re.compile(r"\w+\s+since\s+\d{1,4}-\d{1,2}-\d{1,2}(\s+\d+:\d+:\d+)?")
+
+# Words sometimes used in time units that are not part of CF time units
+_extra_time_words = re.compile(r"\b(fractional|elapsed)\s+", re.IGNORECASE)
+
+# FFIs where every variable has one value per record (of the independent variable)
+record_column_ffis = (1001, 1010)
+
+
+# Registry of the module that holds the class for each FFI (imported on first use)
+_na_file_modules = {
+    1001: "nappy.na_file.na_file_1001",
+    1010: "nappy.na_file.na_file_1010",
+    1020: "nappy.na_file.na_file_1020",
+    2010: "nappy.na_file.na_file_2010",
+    2110: "nappy.na_file.na_file_2110",
+    2160: "nappy.na_file.na_file_2160",
+    2310: "nappy.na_file.na_file_2310",
+    3010: "nappy.na_file.na_file_3010",
+    4010: "nappy.na_file.na_file_4010"
+}
+
+_na_file_classes = {}
+
 
 def getNAFileClass(ffi):
     """
     Returns class for an FFI.
     """
-    mod = "nappy.na_file.na_file_" + str(ffi)
-    cls = "NAFile" + str(ffi)
-    exec("import %s" % mod)
-    return eval("%s.%s" % (mod, cls))
+    ffi = int(ffi)
+
+    if ffi not in _na_file_classes:
+        if ffi not in _na_file_modules:
+            raise Exception("FFI '%s' is not supported by nappy." % ffi)
+
+        module = importlib.import_module(_na_file_modules[ffi])
+        _na_file_classes[ffi] = getattr(module, "NAFile%d" % ffi)
+
+    return _na_file_classes[ffi]
    
 
 def readFFI(filename, ignore_header_lines):
     """
     Function to read the top line of a NASA Ames file to extract
     the File Format Index (FFI) and return it as an integer.
+    The filename argument can also be an open file handle, in which case
+    the lines are read from the current position.
     """
-    with open(filename) as fin:
+    if hasattr(filename, "readline"):
+        fin = filename
+    else:
+        fin = open(filename)
+
+    try:
         for i in range(ignore_header_lines):
             fin.readline()
         topline = fin.readline()
-        nextline = fin.readline()
+    finally:
+        if fin is not filename:
+            fin.close()
 
     ffi = text_parser.readItemsFromLine(topline, 2, int)[-1]
 
@@ -109,15 +152,62 @@ def getFileNameWithNewExtension(input_file, format):
     return base_name + "." + format
 
 
+class ListWindow:
+    """
+    Read-only view of ``values[start:end]`` for a list ``values`` that does
+    not copy the values. Slicing returns a list. When pickled (e.g. to send to
+    another process) only the values in the window are included.
+    """
+
+    def __init__(self, values, start, end):
+        self.values = values
+        (self.start, self.end, step) = slice(start, end).indices(len(values))
+        self.end = max(self.start, self.end)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __iter__(self):
+        return itertools.islice(self.values, self.start, self.end)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.values[i] for i in range(self.start, self.end)[key]]
+
+        return self.values[range(self.start, self.end)[key]]
+
+    def tolist(self):
+        return self.values[self.start:self.end]
+
+    def __reduce__(self):
+        return (list, (self.tolist(),))
+
+
+def getListWindow(values, start, end):
+    """
+    Returns a view of ``values[start:end]`` that does not copy the values:
+    NumPy arrays are sliced and objects with a ``getWindow`` method (such as
+    xarray_utils.LazyValueList) are asked for one. Other values are wrapped
+    in a ListWindow.
+    """
+    if isinstance(values, np.ndarray):
+        return values[start:end]
+    if hasattr(values, "getWindow"):
+        return values.getWindow(start, end)
+
+    return ListWindow(values, start, end)
+
+
 def modifyNADictCopy(indict, v_new, start, end, ivol, nvol):
     """
-    Returns a copy of a dictionary with some modifications.
+    Returns a copy of a dictionary with some modifications: X is replaced
+    by a view of its values from start to end, V is replaced with v_new and
+    the volume numbers are set. Other items are shared with indict.
     """
     newDict = {}
     for key,value in indict.items(): 
         if key == "X":
-            newlist = indict["X"][start:end]
-            newDict["X"] = newlist
+            newDict["X"] = getListWindow(indict["X"], start, end)
         elif key == "V":
             newDict["V"] = v_new
         elif key == "IVOL":
@@ -129,6 +219,53 @@ def modifyNADictCopy(indict, v_new, start, end, ivol, nvol):
     return newDict
 
 
+def getTimeUnits(units):
+    """
+    Returns the CF time units (e.g. "seconds since 2019-07-29 00:00:00") found
+    in ``units`` (e.g. "fractional seconds elapsed since 2019-07-29 00:00:00"),
+    or None if there are none.
+    """
+    if not units:
+        return None
+
+    match = time_units_pattn.search(_extra_time_words.sub("", units))
+    return match.group(0) if match else None
+
+
+def getUniqueName(name, names):
+    """
+    Returns ``name``, with a number added if it is already in ``names``.
+    """
+    unique_name = name
+    count = 1
+
+    while unique_name in names:
+        count += 1
+        unique_name = f"{name}_{count}"
+
+    return unique_name
+
+
+def getRecordColumns(na_file_obj):
+    """
+    Returns a list of (name, units, long_name, missing_value, scale_factor, values)
+    for each auxiliary variable and (read) variable of NASA Ames file object
+    ``na_file_obj``, which must have one value per record (see record_column_ffis).
+    """
+    if na_file_obj.FFI not in record_column_ffis:
+        raise Exception(f"Cannot read NASA Ames files with FFI {na_file_obj.FFI} as columns, "
+                        f"only FFIs: {record_column_ffis}")
+
+    fin = na_file_obj
+    var_numbers = getattr(fin, "var_numbers", None) or range(fin.NV)
+
+    items = [(fin.getAuxVariable(n), fin.ANAME[n], fin.A[n]) for n in range(fin.NAUXV or 0)] + \
+            [(fin.getVariable(n), fin.VNAME[n], values) for (n, values) in zip(var_numbers, fin.V)]
+
+    return [(name, units, long_name, miss, scal, values)
+            for ((name, units, miss, scal), long_name, values) in items]
+
+
 def getVersion():
     """
     Gets config dict for version.
@@ -186,23 +323,34 @@ def makeListFromCommaSepString(s):
     return l
 
 
+# Annotation strings that have already been worked out: {(item, delimiter, count): annotation}
+_annotations = {}
+
+
 def getAnnotation(item, annotation, delimiter=None, count=None):
     """
     Returns the annotation string for a given NASA Ames item.
+    Each annotation string is only worked out (from the config) once.
     """
+    if not annotation:
+        return ""
+
     if delimiter == None:
         delimiter = getDefault("default_delimiter") 
-    dict = parse_config.getAnnotationsConfigDict()
 
-    if count == None:
-        count_string = ""
-    else:
-        count_string = " %s" % count
-    
-    if annotation:
-        return "%s%s%s" % (dict[item], count_string, delimiter)
-    else:
-        return ""
+    key = (item, delimiter, count)
+
+    if key not in _annotations:
+        dict = parse_config.getAnnotationsConfigDict()
+
+        if count == None:
+            count_string = ""
+        else:
+            count_string = " %s" % count
+
+        _annotations[key] = "%s%s%s" % (dict[item], count_string, delimiter)
+
+    return _annotations[key]
 
 
 def annotateLines(item_name, annotate, delimiter, lines):
@@ -210,15 +358,12 @@ def annotateLines(item_name, annotate, delimiter, lines):
     Takes item_name to look up, delimiter and item to render and returns full line.
     """
 
-    split_lines = lines.splitlines(1)
-    output = ""
-
-    count = 1
-    for line in split_lines:
-        output = output + annotateLine(item_name, annotate, delimiter, line, count)
-        count += 1
+    if not annotate:
+        return lines
 
-    return output
+    split_lines = lines.splitlines(1)
+    return "".join([annotateLine(item_name, annotate, delimiter, line, count)
+                    for (count, line) in enumerate(split_lines, 1)])
 
     
 def annotateLine(item_name, annotate, delimiter, line, count=None):
@@ -12,6 +12,8 @@ Usage:
 
     compare_na.py [-h | --header-only]  [-b | --body-only]
                   [-n | --number-strict] [-a | --approx-equal] 
+                  [-d | --numeric-diff] [--rtol=<rtol>] [--atol=<atol>]
+                  [--max-diffs=<max_diffs>]
                   [-1 <delimiter_1> | --delimiter-1=<delimiter_1>]
                   [-2 <delimiter_2> | --delimiter-2=<delimiter_2>]
                   <item1> <item2>
@@ -27,6 +29,12 @@ Where:
                                 (default is to compare them by value).
     -a | --approx-equal         considers any two numbers being compared the same as long
                                 as the difference between them is less than 1%.
+    -d | --numeric-diff         compares the data blocks as arrays of numbers (much faster
+                                for large files), reporting the first differing cells.
+    <rtol>, <atol>              relative and absolute tolerances used by --numeric-diff
+                                (defaults are 1e-05 and 1e-08, as for numpy.isclose).
+    <max_diffs>                 number of differing cells reported by --numeric-diff
+                                (default is 10).
     <delimiter_1>		delimiter to use for file 1.
     <delimiter_2>		delimiter to use for file 2. 
 
@@ -38,6 +46,9 @@ import sys
 import re
 import getopt
 
+# Import third-party modules
+import numpy as np
+
 # Import local modules
 from nappy.utils.compare import *
 
@@ -63,7 +74,7 @@ def compareNA(i1, i2, **kwargs):
     **kwargs are forwarded as dictionary to compNAFiles().
     """
     if os.path.isfile(i1):
-        apply(compNAFiles, (i1, i2), kwargs)
+        return compNAFiles(i1, i2, **kwargs)
     elif os.path.isdir(i1):
         compDirs(i1, i2)
     else:
@@ -144,8 +155,106 @@ def compareSections(l1, l2, number_clever=True, approx_equal=False,
     return all_same
 
 
+def _parseNumericLines(lines, delimiter=None):
+    """
+    Parses ``lines`` of numbers split by ``delimiter`` in one go.
+    Returns a tuple of (counts, values) where counts is an array of the number
+    of items on each line and values is a flat float64 array of all items.
+    Raises ValueError if any item is not a number.
+    """
+    if not lines:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0))
+
+    text = "".join(lines)
+    if not text.endswith("\n"):
+        text += "\n"
+
+    chars = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    line_ends = np.flatnonzero(chars == ord("\n"))
+
+    if delimiter is None:
+        # Items start at characters that follow white space
+        spaces = (chars == ord(" ")) | ((chars >= ord("\t")) & (chars <= ord("\r")))
+        starts = ~spaces
+        starts[1:] &= spaces[:-1]
+        counts = np.diff(np.searchsorted(np.flatnonzero(starts), line_ends), prepend=0)
+        items = text.split()
+    else:
+        if len(delimiter) == 1:
+            delimiters = np.flatnonzero(chars == ord(delimiter))
+            counts = np.diff(np.searchsorted(delimiters, line_ends), prepend=0) + 1
+        else:
+            counts = np.array([line.count(delimiter) + 1 for line in lines])
+
+        # The text ends with a new line so drop the empty item after it
+        items = text.replace("\n", delimiter).split(delimiter)[:-1]
+
+    if len(counts) != len(lines) or counts.sum() != len(items):
+        raise ValueError("Cannot split lines into items consistently.")
+
+    return (counts, np.array(items, dtype=np.float64))
+
+
+def compareNumericSections(l1, l2, delimiter_1=None, delimiter_2=None, rtol=1e-05, atol=1e-08,
+                           max_diffs=10):
+    """
+    Compares sections of NASA Ames files (i.e. bodies) holding only numbers by
+    parsing each into an array and comparing them with ``numpy.isclose``
+    (using ``rtol`` and ``atol``, where NaNs are equal). Reports the first
+    ``max_diffs`` differing items (by line and column) and summary statistics.
+    """
+    leng = min(len(l1), len(l2))
+    (counts1, values1) = _parseNumericLines(l1[:leng], delimiter_1)
+    (counts2, values2) = _parseNumericLines(l2[:leng], delimiter_2)
+
+    all_same = True
+
+    # Lines with different numbers of items cannot be compared item by item
+    bad_lines = np.flatnonzero(counts1 != counts2)
+
+    if len(bad_lines):
+        all_same = False
+        print("Number of items differs on %s lines:" % len(bad_lines))
+
+        for i in bad_lines[:max_diffs]:
+            print("Line %s:" % (i + 1))
+            print(">>>", l1[i].strip())
+            print("<<<", l2[i].strip())
+
+    # Line and column of every item in the lines that can be compared
+    keep_lines = counts1 == counts2
+    keep1 = np.repeat(keep_lines, counts1)
+    starts = np.cumsum(counts1) - counts1
+    lines = np.repeat(np.arange(leng), counts1)[keep1]
+    columns = (np.arange(len(values1)) - np.repeat(starts, counts1))[keep1]
+
+    values1 = values1[keep1]
+    values2 = values2[np.repeat(keep_lines, counts2)]
+
+    close = np.isclose(values1, values2, rtol=rtol, atol=atol, equal_nan=True)
+    diffs = np.flatnonzero(~close)
+
+    if len(diffs):
+        all_same = False
+
+        for i in diffs[:max_diffs]:
+            print("Line %s, column %s: %s != %s" % (lines[i] + 1, columns[i] + 1, values1[i], values2[i]))
+
+        abs_diffs = np.abs(values1[diffs] - values2[diffs])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rel_diffs = abs_diffs / np.abs(values2[diffs])
+
+        print("Items that differ: %s of %s (on %s lines)" % (len(diffs), len(values1), len(np.unique(lines[diffs]))))
+        print("Maximum absolute difference: %s" % np.nanmax(abs_diffs, initial=0))
+        print("Maximum relative difference: %s" % np.nanmax(rel_diffs, initial=0))
+
+    return all_same
+
+
 def compNAFiles(f1, f2, header=True, body=True, number_clever=True, approx_equal=False,
-                delimiter_1=None, delimiter_2=None):
+                delimiter_1=None, delimiter_2=None, numeric_diff=False, rtol=1e-05, atol=1e-08,
+                max_diffs=10):
     """
     Compares contents of two NASA Ames files f1 and f2.
     header=False or body=False will not compare these sections of the files.
@@ -154,6 +263,9 @@ def compNAFiles(f1, f2, header=True, body=True, number_clever=True, approx_equal
     numbers as being equal (within equality_threshold set at top of this module).
     If f1_delimiter and f2_delimiter are provided then the comparer will consider
     two lines identical if they have the delimiters sent in as arguments.
+    If numeric_diff is True then the bodies are compared as arrays of numbers using
+    the tolerances rtol and atol, reporting up to max_diffs differing items (see
+    compareNumericSections). Bodies that are not all numbers are compared line by line.
     """	
     name = os.path.split(f1)[-1]
     # Ignore anything that is in exclusion list
@@ -198,7 +310,17 @@ def compNAFiles(f1, f2, header=True, body=True, number_clever=True, approx_equal
         print("Comparing bodies:")
         print(">>> %s body:" % f1)
         print("<<< %s body:" % f2)
-        same = compareSections(body1, body2, number_clever, approx_equal, delimiter_1, delimiter_2)
+        same = None
+
+        if numeric_diff:
+            try:
+                same = compareNumericSections(body1, body2, delimiter_1, delimiter_2,
+                                              rtol=rtol, atol=atol, max_diffs=max_diffs)
+            except ValueError:
+                print("Bodies are not all numbers: comparing them line by line.")
+
+        if same is None:
+            same = compareSections(body1, body2, number_clever, approx_equal, delimiter_1, delimiter_2)
         if same:
             print("BODIES ARE IDENTICAL.")
         if len(body1) != len(body2):
@@ -220,8 +342,9 @@ def parseArgs(args):
     a["delimiter_1"] = None
     a["delimiter_2"] = None
 
-    (arg_list, files) = getopt.getopt(args, "hbna1:2:", ["header-only", "body-only",
-                    "number-strict", "approx-equal", "delimiter-1=", "delimiter-2="])
+    (arg_list, files) = getopt.getopt(args, "hbnad1:2:", ["header-only", "body-only",
+                    "number-strict", "approx-equal", "delimiter-1=", "delimiter-2=",
+                    "numeric-diff", "rtol=", "atol=", "max-diffs="])
 
     for arg, value in arg_list:
         if arg in ("--header-only", "-h"):
@@ -236,6 +359,14 @@ def parseArgs(args):
             a["delimiter_1"] = value
         elif arg in ("--delimiter-2", "-2"):
             a["delimiter_2"] = value
+        elif arg in ("--numeric-diff", "-d"):
+            a["numeric_diff"] = True
+        elif arg == "--rtol":
+            a["rtol"] = float(value)
+        elif arg == "--atol":
+            a["atol"] = float(value)
+        elif arg == "--max-diffs":
+            a["max_diffs"] = int(value)
         else:
             exitNicely("Unrecognised argument provided: " + arg)
 
@@ -251,7 +382,7 @@ def parseArgs(args):
 def main(args):
     "Main controller."
     files, arg_dict = parseArgs(args)
-    apply(compareNA, files, arg_dict) 
+    compareNA(*files, **arg_dict)
    
  
 if __name__=="__main__":
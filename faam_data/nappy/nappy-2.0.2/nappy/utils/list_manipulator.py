@@ -96,9 +96,9 @@ class RecursiveListManipulator:
             for i in range(dimlist[0]):
                 self.writeLines(inlist[i], dimlist[1:], delimiter=delimiter, float_format=float_format)
         else:
-            var_string = ""
-            for i in range(dimlist[0]):
-                var_string = var_string + ((float_format+delimiter) % inlist[i])
+            # Format the whole row with a single format string
+            row_format = (float_format + delimiter) * dimlist[0]
+            var_string = row_format % tuple([inlist[i] for i in range(dimlist[0])])
             self.rtlines.append("%s\n" % var_string.rstrip(" ,"))
         return self.rtlines
             
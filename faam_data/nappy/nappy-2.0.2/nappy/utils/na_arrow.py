@@ -0,0 +1,110 @@
+"""
+na_arrow.py
+===========
+
+Reads NASA Ames files into Apache Arrow tables (one row per record) and
+writes them to Parquet files. The columns are built straight from the
+arrays read from the file: time is decoded from the units in XNAME and
+missing values become nulls. Usage:
+
+>>>    import nappy
+>>>    table = nappy.readNAAsArrow("file.na", variables=["CO2", "CH4"])
+>>>    nappy.convertNAToParquet("file.na", "file.parquet")
+>>>    df = pandas.read_parquet("file.parquet")
+
+Requires the "pyarrow" package.
+
+"""
+
+# Third-party imports
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from xarray.coding.times import decode_cf_datetime
+
+# Import from nappy package
+import nappy
+from nappy.utils.common_utils import getTimeUnits, getUniqueName, getRecordColumns, record_column_ffis
+
+
+def _makeField(name, units, long_name, array, mask=None):
+    """
+    Returns an Arrow (field, array) pair for NumPy ``array`` where values are
+    null if ``mask`` is True.
+    """
+    metadata = {"long_name": long_name}
+    if units:
+        metadata["units"] = units
+
+    array = pa.array(array, mask=mask if mask is not None and mask.any() else None)
+    return (pa.field(name, array.type, metadata=metadata), array)
+
+
+def readNAAsArrow(na_file, variables=None, decode_times=True, ignore_header_lines=0):
+    """
+    Returns a pyarrow Table holding the contents of NASA Ames file ``na_file``.
+    Only FFIs 1001 and 1010 are supported. Arguments are:
+
+    na_file - NASA Ames file path.
+    variables - a list of variable numbers or names to include (default is all of them).
+    decode_times - if True (default) the independent variable is decoded to timestamps
+                   when its units are time units.
+    ignore_header_lines - the number of lines to skip at the start of the file.
+
+    The first column is the independent variable, followed by any auxiliary
+    variables and then the variables. Missing values are null and scale
+    factors are applied. The units and (full) name of each column are stored
+    in its field metadata.
+    """
+    fin = nappy.openNAFile(na_file, ignore_header_lines=ignore_header_lines)
+
+    if fin.FFI not in record_column_ffis:
+        raise Exception(f"Cannot convert NASA Ames files with FFI {fin.FFI} to Arrow tables, "
+                        f"only FFIs: {record_column_ffis}")
+
+    fin.readData(variables=variables)
+    fin.close()
+
+    fields = []
+    arrays = []
+
+    def addColumn(name, units, long_name, array, mask=None):
+        name = getUniqueName(name, [field.name for field in fields])
+        (field, array) = _makeField(name, units, long_name, array, mask)
+        fields.append(field)
+        arrays.append(array)
+
+    # Independent variable
+    (name, units) = fin.getIndependentVariable(0)
+    x = np.asarray(fin.X, dtype=np.float64)
+    time_units = getTimeUnits(units) if decode_times else None
+
+    if time_units:
+        x = decode_cf_datetime(x, time_units)
+
+    addColumn(name, units, fin.XNAME[0], x)
+
+    # Auxiliary variables then variables
+    for (name, units, long_name, miss, scal, values) in getRecordColumns(fin):
+        values = np.asarray(values, dtype=np.float64)
+        mask = values == miss
+
+        if scal not in (None, 1):
+            values = values * scal
+
+        addColumn(name, units, long_name, values, mask)
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def convertNAToParquet(na_file, parquet_file, variables=None, decode_times=True,
+                       ignore_header_lines=0, **write_kwargs):
+    """
+    Writes NASA Ames file ``na_file`` to Parquet file ``parquet_file``.
+    See readNAAsArrow for the arguments. Other keyword arguments (such as
+    "compression") are passed to pyarrow.parquet.write_table.
+    """
+    table = readNAAsArrow(na_file, variables=variables, decode_times=decode_times,
+                          ignore_header_lines=ignore_header_lines)
+    pq.write_table(table, parquet_file, **write_kwargs)
+    return parquet_file
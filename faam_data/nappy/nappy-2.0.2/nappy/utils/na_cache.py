@@ -0,0 +1,236 @@
+"""
+na_cache.py
+===========
+
+Holds an opt-in on-disk cache of parsed NASA Ames files. The header and the
+data arrays of each file are stored in a binary ``.npz`` sidecar in the cache
+directory so that later reads of an unchanged file do not need to parse any
+text. Each entry is keyed by the file path, size and modification time and is
+ignored if the file has changed since it was cached.
+
+The cache directory is taken from the ``NAPPY_CACHE_DIR`` environment variable
+or the ``cache_dir`` setting in the nappy config file (default:
+``~/.cache/nappy``). The total size of the cache is limited by the
+``cache_max_size`` setting (in bytes): the least recently used entries are
+evicted when it is exceeded.
+
+"""
+
+# Imports from python standard library
+import os
+import json
+import hashlib
+import logging
+
+# Third-party imports
+import numpy as np
+
+# Imports from nappy package
+from nappy.utils.parse_config import getConfigDict
+
+log = logging.getLogger(__name__)
+
+_data_keys = ("X", "V", "A")
+_entry_suffix = ".npz"
+
+# Values stored as the item count to record that a data item is None or a single array
+_none_item = -1
+_single_array = -2
+
+# Values stored for each item of a data item to record the type it is restored to
+_array_kind = 0
+_list_kind = 1
+_scalar_kind = 2
+
+
+def getCacheDir():
+    "Returns the path to the cache directory."
+    cache_dir = os.environ.get("NAPPY_CACHE_DIR", None) or \
+                getConfigDict()["main"].get("cache_dir", "") or \
+                os.path.join("~", ".cache", "nappy")
+    return os.path.expanduser(cache_dir)
+
+
+def getCacheMaxSize():
+    "Returns the maximum total size of the cache (in bytes)."
+    return int(getConfigDict()["main"].get("cache_max_size", 1024 ** 3))
+
+
+def _getEntryPath(filename, ignore_header_lines=0):
+    "Returns the path to the cache entry for a NASA Ames file."
+    name = "%s:%d" % (os.path.abspath(filename), ignore_header_lines)
+    return os.path.join(getCacheDir(), hashlib.sha1(name.encode("utf-8")).hexdigest() + _entry_suffix)
+
+
+def _getKey(filename, ignore_header_lines=0):
+    "Returns the key that must match for a cache entry to be valid."
+    stat = os.stat(filename)
+    return [os.path.abspath(filename), ignore_header_lines, stat.st_size, stat.st_mtime_ns]
+
+
+def _listEntries(cache_dir=None):
+    "Returns a list of (path, size, mtime) for all entries in the cache directory."
+    cache_dir = cache_dir or getCacheDir()
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(_entry_suffix): continue
+        path = os.path.join(cache_dir, name)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((path, stat.st_size, stat.st_mtime))
+
+    return entries
+
+
+def loadCachedNADict(filename, ignore_header_lines=0):
+    """
+    Returns a tuple of (header, data) dictionaries for ``filename`` if a valid
+    cache entry exists, or None. The data dictionary holds the "X", "V" and "A"
+    arrays.
+    """
+    path = _getEntryPath(filename, ignore_header_lines)
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            if json.loads(str(entry["key"])) != _getKey(filename, ignore_header_lines):
+                return None
+
+            header = json.loads(str(entry["header"]))
+            data = {}
+
+            for key in _data_keys:
+                count = int(entry["n" + key])
+                if count == _none_item:
+                    data[key] = None
+                elif count == _single_array:
+                    data[key] = entry[key + "_0"]
+                else:
+                    kinds = entry["k" + key]
+                    data[key] = [_restoreItem(entry["%s_%d" % (key, i)], kinds[i]) for i in range(count)]
+    except Exception as err:
+        log.warning("Ignoring unreadable cache entry '%s': %s" % (path, err))
+        return None
+
+    # Mark entry as recently used
+    os.utime(path)
+    return (header, data)
+
+
+def _getItemKind(item):
+    "Returns the kind of ``item`` (a list, array or scalar) to store with it."
+    if isinstance(item, list):
+        return _list_kind
+    elif isinstance(item, np.ndarray):
+        return _array_kind
+    return _scalar_kind
+
+
+def _restoreItem(array, kind):
+    "Returns the stored ``array`` as the kind of item it was read as."
+    if kind == _list_kind:
+        return array.tolist()
+    elif kind == _scalar_kind:
+        return array.item()
+    return array
+
+
+def _asArrays(key, value):
+    """
+    Returns a dictionary of arrays to store for data item ``key``. Raises
+    ValueError if the item cannot be stored as regular arrays.
+    """
+    arrays = {}
+
+    if value is None:
+        arrays["n" + key] = np.array(_none_item)
+    elif not isinstance(value, list):
+        arrays["n" + key] = np.array(_single_array)
+        arrays[key + "_0"] = np.asarray(value, dtype=np.float64)
+    else:
+        arrays["n" + key] = np.array(len(value))
+        arrays["k" + key] = np.array([_getItemKind(item) for item in value], dtype=np.int8)
+        for i, item in enumerate(value):
+            arrays["%s_%d" % (key, i)] = np.asarray(item, dtype=np.float64)
+
+    return arrays
+
+
+def saveCachedNADict(filename, na_file_obj, ignore_header_lines=0):
+    """
+    Writes a cache entry for ``filename`` from the (read) NASA Ames file
+    object ``na_file_obj``. Returns True if written, or False if the data
+    could not be stored as regular arrays.
+    """
+    na_dict = na_file_obj.getNADict()
+    header = dict([(key, value) for (key, value) in na_dict.items() if key not in _data_keys])
+    header["_normalized_X"] = getattr(na_file_obj, "_normalized_X", True)
+
+    try:
+        arrays = {"key": np.array(json.dumps(_getKey(filename, ignore_header_lines))),
+                  "header": np.array(json.dumps(header))}
+
+        for key in _data_keys:
+            arrays.update(_asArrays(key, na_dict.get(key)))
+    except (TypeError, ValueError):
+        log.info("Contents of '%s' are not regular so cannot be cached." % filename)
+        return False
+
+    cache_dir = getCacheDir()
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    # Write to a temporary file and rename so that readers never see a partial entry
+    path = _getEntryPath(filename, ignore_header_lines)
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+
+    with open(tmp_path, "wb") as fh:
+        np.savez(fh, **arrays)
+
+    os.replace(tmp_path, path)
+    evictCache()
+    return True
+
+
+def evictCache(max_size=None, cache_dir=None):
+    """
+    Removes the least recently used entries from the cache until its total size
+    is no more than ``max_size`` bytes. Returns the number of entries removed.
+    """
+    if max_size is None:
+        max_size = getCacheMaxSize()
+
+    entries = sorted(_listEntries(cache_dir), key=lambda entry: entry[2])
+    total = sum([entry[1] for entry in entries])
+    removed = 0
+
+    for (path, size, mtime) in entries:
+        if total <= max_size: break
+
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def clearCache(cache_dir=None):
+    "Removes all entries from the cache. Returns the number of entries removed."
+    return evictCache(max_size=-1, cache_dir=cache_dir)
+
+
+def getCacheInfo(cache_dir=None):
+    "Returns a tuple of (number of entries, total size in bytes) for the cache."
+    entries = _listEntries(cache_dir)
+    return (len(entries), sum([entry[1] for entry in entries]))
@@ -0,0 +1,133 @@
+"""
+na_dataframe.py
+===============
+
+Reads NASA Ames files into pandas DataFrames with one row per record,
+indexed by the (decoded) independent variable. Usage:
+
+>>>    import nappy
+>>>    df = nappy.to_dataframe("faam-fgga_faam_20190729_r1_c191.na",
+...                            flag_mask={"CO2": "CO2_flag", "CH4": "CH4_flag"})
+
+Requires the "pandas" package.
+
+"""
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+from xarray.coding.times import decode_cf_datetime
+
+# Import from nappy package
+import nappy
+from nappy.utils.common_utils import getTimeUnits, getUniqueName, getRecordColumns, record_column_ffis
+
+
+def _getColumnKey(fin, name):
+    """
+    Returns ("V", number) or ("A", number) for the variable or auxiliary variable
+    of NASA Ames file object ``fin`` given by ``name`` (a number, short name or
+    full name, as for ``variables``).
+    """
+    try:
+        return ("V", fin._getVarNumbers([name])[0])
+    except Exception:
+        pass
+
+    aux_names = [fin.getAuxVariable(n)[0] for n in range(fin.NAUXV or 0)]
+
+    if name in (fin.ANAME or []):
+        return ("A", fin.ANAME.index(name))
+    elif name in aux_names:
+        return ("A", aux_names.index(name))
+
+    raise Exception(f"Cannot apply flag mask, column not known: {name}")
+
+
+def to_dataframe(na_file, variables=None, flag_mask=None, flag_threshold=0, dtype="float64",
+                 decode_times=True, ignore_header_lines=0):
+    """
+    Returns a pandas DataFrame holding the contents of NASA Ames file ``na_file``.
+    Only FFIs 1001 and 1010 are supported. Arguments are:
+
+    na_file - NASA Ames file path.
+    variables - a list of variable numbers or names to include (default is all of them).
+    flag_mask - a dictionary of {column: flag_column} where values of each column are
+                set to NaN where its flag column is more than ``flag_threshold``.
+                Columns are given as for ``variables`` (or by auxiliary variable name).
+                Flag columns are read even if they are not in ``variables``.
+    flag_threshold - the highest flag value for which values are kept (default is 0).
+    dtype - the type of the columns ("float32" or "float64" (default)).
+    decode_times - if True (default) the index is a DatetimeIndex when the independent
+                variable has time units.
+    ignore_header_lines - the number of lines to skip at the start of the file.
+
+    The index is the independent variable. The columns are any auxiliary
+    variables followed by the variables. Missing values are NaN and scale
+    factors are applied. The arrays read from the file are used for the
+    columns (rather than copies) where ``dtype`` allows.
+    """
+    flag_mask = flag_mask or {}
+    fin = nappy.openNAFile(na_file, ignore_header_lines=ignore_header_lines)
+
+    if fin.FFI not in record_column_ffis:
+        raise Exception(f"Cannot convert NASA Ames files with FFI {fin.FFI} to DataFrames, "
+                        f"only FFIs: {record_column_ffis}")
+
+    # Work out which variables (or auxiliary variables) the flag mask refers to
+    flag_keys = [(_getColumnKey(fin, name), _getColumnKey(fin, flag_name))
+                 for (name, flag_name) in flag_mask.items()]
+
+    # Read any flags that are needed but not requested after the requested variables
+    n_extra = 0
+
+    if variables is not None:
+        var_numbers = fin._getVarNumbers(variables)
+        flag_numbers = []
+
+        for (key, flag_key) in flag_keys:
+            if flag_key[0] == "V" and flag_key[1] not in var_numbers + flag_numbers:
+                flag_numbers.append(flag_key[1])
+
+        n_extra = len(flag_numbers)
+        variables = var_numbers + flag_numbers
+
+    fin.readData(variables=variables)
+    fin.close()
+
+    data = {}
+    columns = {}
+    keys = [("A", n) for n in range(fin.NAUXV or 0)] + \
+           [("V", n) for n in (fin.var_numbers if fin.var_numbers is not None else range(fin.NV))]
+
+    for (key, (name, units, long_name, miss, scal, values)) in zip(keys, getRecordColumns(fin)):
+        values = np.asarray(values, dtype=dtype)
+        values[values == miss] = np.nan
+
+        if scal not in (None, 1):
+            values *= scal
+
+        columns[key] = getUniqueName(name, data)
+        data[columns[key]] = values
+
+    for ((key, flag_key), name) in zip(flag_keys, flag_mask):
+        if key not in columns:
+            raise Exception(f"Cannot apply flag mask, column not known: {name}")
+
+        data[columns[key]][data[columns[flag_key]] > flag_threshold] = np.nan
+
+    # Drop the flags that were not requested
+    for name in list(data)[len(data) - n_extra:]:
+        del data[name]
+
+    # Index is the independent variable
+    (name, units) = fin.getIndependentVariable(0)
+    x = np.asarray(fin.X, dtype=np.float64)
+    time_units = getTimeUnits(units) if decode_times else None
+
+    if time_units:
+        index = pd.DatetimeIndex(decode_cf_datetime(x, time_units), name=name)
+    else:
+        index = pd.Index(x, name=name)
+
+    return pd.DataFrame(data, index=index, copy=False)
@@ -0,0 +1,115 @@
+"""
+na_transcoder.py
+================
+
+Converts NASA Ames files to CSV by re-writing the delimiters of the data
+section rather than reading and re-formatting every value. The data section
+is streamed in blocks of bytes so any size of file can be converted with
+constant memory. Usage:
+
+>>>    import nappy.utils.na_transcoder
+>>>    nappy.utils.na_transcoder.transcodeNAToCSV("file.na", "file.csv", validate=True)
+
+"""
+
+# Third-party imports
+import numpy as np
+
+# Import from nappy package
+import nappy
+import nappy.utils.common_utils
+
+# Number of bytes of the data section to transcode at a time
+block_size = 2 ** 24
+
+
+def transcodeDataBlock(block, delimiter=b",", prefix=b""):
+    """
+    Returns the data lines in ``block`` (bytes made up of whole lines) with the
+    values separated by ``delimiter`` and each line starting with ``prefix``.
+    Values may be separated by whitespace and/or commas in ``block``. Blank
+    lines are removed.
+    """
+    lines = [delimiter.join(values) for values in
+             (line.replace(b",", b" ").split() for line in block.split(b"\n")) if values]
+
+    if not lines:
+        return b""
+
+    # Every line starts with the prefix and ends with a newline
+    return prefix + (b"\n" + prefix).join(lines) + b"\n"
+
+
+def validateDataBlock(block, na_file=""):
+    """
+    Raises an Exception if any value in ``block`` (bytes of data lines) is not a number.
+    """
+    values = block.replace(b",", b" ").split()
+
+    try:
+        np.array(values, dtype=np.float64)
+    except ValueError as err:
+        raise Exception(f"Found non-numeric value in data section of NASA Ames file '{na_file}': {err}")
+
+
+def _iterDataBlocks(fh):
+    """
+    Yields blocks of whole lines read from the (binary) file handle ``fh``.
+    """
+    remainder = b""
+
+    while True:
+        block = fh.read(block_size)
+
+        if not block:
+            break
+
+        block = remainder + block
+        end = block.rfind(b"\n") + 1
+        (block, remainder) = (block[:end], block[end:])
+
+        if block:
+            yield block
+
+    if remainder:
+        yield remainder + b"\n"
+
+
+def transcodeNAToCSV(na_file, csv_file, annotation=False, no_header=False, validate=False,
+                     ignore_header_lines=0):
+    """
+    Writes NASA Ames file ``na_file`` to CSV file ``csv_file``. The header is
+    written as ``convertNAToCSV`` would write it. The data lines are copied with
+    the whitespace between values swapped for commas, so the values keep their
+    original formatting (and records split over several lines stay split).
+    FFI 2160 is not supported because its data lines can hold text.
+
+    If validate is True an Exception is raised if any value in the data section
+    is not a number.
+    """
+    fin = nappy.openNAFile(na_file, ignore_header_lines=ignore_header_lines, header_only=True)
+    na_dict = fin.getNADict()
+    nlhead = fin.NLHEAD
+
+    if fin.FFI == 2160:
+        raise Exception("Cannot transcode NASA Ames files with FFI 2160 to CSV (data lines can hold text).")
+
+    fout = nappy.openNAFile(csv_file, "w", na_dict=na_dict)
+    if not no_header:
+        fout.write(delimiter=",", annotation=annotation, no_data=True)
+    fout.close()
+
+    prefix = nappy.utils.common_utils.getAnnotation("Data", annotation, delimiter=",").encode()
+
+    with open(na_file, "rb") as fh, open(csv_file, "ab") as fout:
+        # Skip the header
+        for i in range(nlhead):
+            fh.readline()
+
+        for block in _iterDataBlocks(fh):
+            if validate:
+                validateDataBlock(block, na_file)
+
+            fout.write(transcodeDataBlock(block, prefix=prefix))
+
+    return csv_file
@@ -14,6 +14,10 @@ reals, integers etc.
 # Standard library imports
 import re
 import string
+from collections import deque
+
+# Third-party imports
+import numpy as np
 
 # Local imports
 from nappy.utils.right_strip import *
@@ -50,48 +54,226 @@ def readItemsFromLines(lines, nitems, rttype=str):
     """
     Reads ``nitems`` items of type ``rttype`` from ``lines``
     """
-    lines = [rightStripCurlyBraces(line) for line in lines]
-    rtitems = []
-    for line in lines:
-        rtitems = rtitems + [readItemFromLine(line, rttype)]
+    rtitems = [readItemFromLine(rightStripCurlyBraces(line), rttype) for line in lines]
     if rttype is not str:
         rtitems = [rttype(x) for x in rtitems]
     return rtitems
 
+def _countItems(lines):
+    """
+    Returns the number of white space separated items in ``lines`` (counting
+    the characters that start an item) without splitting them.
+    """
+    chars = np.frombuffer(" ".join(lines).encode("utf-8"), dtype=np.uint8)
+
+    # White space (and any other control characters) separates items
+    spaces = chars <= ord(" ")
+    return int(np.count_nonzero(~spaces[1:] & spaces[:-1])) + int(len(chars) > 0 and not spaces[0])
+
+
+def countItemsPerLine(chars, line_offsets):
+    """
+    Returns an array of the number of white space separated items on each line
+    of ``chars`` (a uint8 array of text) where line ``n`` starts at byte
+    ``line_offsets[n]``. The items are counted without splitting the lines.
+    """
+    spaces = chars <= ord(" ")
+    item_starts = np.flatnonzero(~spaces & np.concatenate(([True], spaces[:-1])))
+
+    lines = np.searchsorted(line_offsets, item_starts, side="right") - 1
+    return np.bincount(lines, minlength=len(line_offsets))
+
+
+def readArrayFromLines(lines, ncols, usecols=None):
+    """
+    Reads ``lines`` into a 2-D float64 NumPy array with one row per line and
+    ``ncols`` columns, tokenising all lines in one step with ``np.loadtxt``.
+    Returns None if any line does not hold exactly ``ncols`` numeric items (e.g.
+    when records wrap irregularly over lines) so that the caller can fall back
+    to reading items line by line.
+
+    If ``usecols`` is a list of column numbers then only those columns are
+    converted and returned (in that order). The last column is always parsed so
+    that short lines are detected, and the items in all lines are counted so that
+    long lines are too.
+    """
+    if usecols is not None:
+        parse_cols = sorted(set(usecols) | {ncols - 1})
+        if len(lines) == 0:
+            return np.empty((0, len(usecols)))
+
+        try:
+            array = np.loadtxt(lines, dtype=np.float64, comments=None, ndmin=2, usecols=parse_cols)
+        except ValueError:
+            return None
+
+        # No line is short, so the same total means no line is long
+        if _countItems(lines) != len(lines) * ncols:
+            return None
+
+        return array[:, [parse_cols.index(col) for col in usecols]]
+
+    if len(lines) == 0:
+        return np.empty((0, ncols))
+
+    try:
+        array = np.loadtxt(lines, dtype=np.float64, comments=None, ndmin=2)
+    except ValueError:
+        return None
+
+    if array.shape[1] != ncols:
+        return None
+    return array
+
+
+def readRecordsFromLines(lines, record_size):
+    """
+    Reads ``lines`` into a 2-D float64 NumPy array with one row per record of
+    ``record_size`` items, ignoring how the records are wrapped over lines. All
+    items are tokenised in one step into a single preallocated array.
+    Returns None if any item is not numeric or the items do not divide into
+    whole records so that the caller can fall back to reading record by record.
+    """
+    try:
+        array = np.array(" ".join(lines).split(), dtype=np.float64)
+    except ValueError:
+        return None
+
+    if record_size < 1 or len(array) % record_size != 0:
+        return None
+    return array.reshape(-1, record_size)
+
+
+class LineCursor:
+    """
+    Wraps a list of lines with a read position so that the lines can be consumed
+    one at a time (like a filehandle) without copying the remainder of the list.
+    The number of lines still to be read is given by ``len(cursor)``.
+    """
+
+    def __init__(self, lines, position=0):
+        self.lines = lines
+        self.position = position
+
+    def __len__(self):
+        return len(self.lines) - self.position
+
+    def readline(self):
+        """
+        Returns the next line and moves the cursor on by one line.
+        Raises an IndexError if all lines have been read.
+        """
+        line = self.lines[self.position]
+        self.position += 1
+        return line
+
+    def readlines(self, nlines):
+        """
+        Returns the next ``nlines`` lines and moves the cursor past them.
+        """
+        if nlines > len(self):
+            raise IndexError("Cannot read %s lines: only %s lines remaining." % (nlines, len(self)))
+
+        lines = self.lines[self.position:self.position + nlines]
+        self.position += nlines
+        return lines
+
+
+class StreamCursor:
+    """
+    Reads lines on demand from an open filehandle with the same interface as
+    LineCursor, so a data section can be read without holding the whole file
+    in memory. The cursor is true while there are non-empty lines left to read.
+    Empty lines are only allowed at the end of the data section.
+    """
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.pending = deque()
+        self.count = 0
+
+    def __bool__(self):
+        if not self.pending:
+            self._fill()
+        return len(self.pending) > 0
+
+    def _fill(self):
+        "Reads the next non-empty line (if any) into the pending queue."
+        line = self.fh.readline()
+
+        if line.strip() == "":
+            # Only allowed if every remaining line is empty too
+            for rest in self.fh:
+                if rest.strip() != "":
+                    raise Exception("Empty line found in data section at line: " + str(self.count))
+            return
+
+        self.pending.append(line)
+
+    def readline(self):
+        """
+        Returns the next line and moves the cursor on by one line.
+        Raises an IndexError if all lines have been read.
+        """
+        if not self:
+            raise IndexError("No more lines to read in data section.")
+
+        self.count += 1
+        return self.pending.popleft()
+
+    def readlines(self, nlines):
+        """
+        Returns up to the next ``nlines`` lines and moves the cursor past them.
+        """
+        lines = []
+        while len(lines) < nlines and self:
+            lines.append(self.readline())
+        return lines
+
+    def unreadlines(self, lines):
+        """
+        Pushes ``lines`` back so that they are returned by the next reads.
+        """
+        self.pending.extendleft(reversed(lines))
+        self.count -= len(lines)
+
+
 def readItemsFromUnknownLines(object, nitems, rttype=str):
     """
     Reads from an unknown number of lines until n items have been collected.
     The 'object' argument can be a filehandle (i.e. obj=open('name.ext', 'r'))
     or a string wrapped in a StringIO object (i.e. obj=StringIO.StringIO('abc')).
+    It can also be a LineCursor, which is advanced past the lines that are read.
     The 'object' argument can also be a list, in which case the partially used/read object is
     also returned.
     """
 
     rtitems = []
-    lines = []        
-
-    if type(object) == type([2,3]): 
+    lines = []
+    is_list = type(object) == type([2,3])
+    position = 0
 
-        while len(rtitems) < nitems:   
-            nextitem = object[0]
-            object = object[1:]
-            items = rightStripCurlyBraces(nextitem).strip().split()
-            lines.append(items)
-            (rtitems, extras) = (rtitems + items[:nitems], items[nitems:])
+    # Gather the tokens in place and check the count once at the end
+    while len(rtitems) < nitems:
+        if is_list:
+            line = object[position]
+            position += 1
+        else:
+            line = object.readline()
+            if not line:
+                raise Exception("Reached end of file before reading required number (" + str(nitems) + ") of items: \n" + str(lines))
 
-    else:
-        while len(rtitems) < nitems:
-            items = rightStripCurlyBraces(object.readline()).strip().split()
-            lines.append(items)
-            (rtitems, extras) = (rtitems + items[:nitems], items[nitems:])
+        items = rightStripCurlyBraces(line).split()
+        lines.append(items)
+        rtitems.extend(items)
 
-    if len(extras) > 0:
+    if len(rtitems) != nitems:
         raise Exception("Could not split " + str(len(lines)) + " lines exactly into required number (" + str(nitems) + ") of items: \n" + str(lines))
 
     if rttype is not str:
         rtitems = [rttype(x) for x in rtitems]
 
-    if type(object) == type([1,2]):
-        return rtitems, object
+    if is_list:
+        return rtitems, object[position:]
     else:
         return rtitems
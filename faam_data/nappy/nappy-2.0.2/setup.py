@@ -58,7 +58,10 @@ setup(
     zip_safe=False,
     install_requires=read('requirements.txt').splitlines(),
     extras_require={
-        'netcdf_conversion': ['xarray']
+        'netcdf_conversion': ['xarray'],
+        'arrow': ['pyarrow'],
+        'dataframe': ['pandas'],
+        'dask': ['dask']
     },
     tests_require=read('requirements_dev.txt').splitlines(),
     test_suite='nose.collector',
@@ -67,7 +70,11 @@ setup(
         'console_scripts': [
             'na2nc=nappy.script.na2nc:na2nc',
             'nc2na=nappy.script.nc2na:nc2na',
-            'nc2csv=nappy.script.nc2csv:nc2csv'
+            'nc2csv=nappy.script.nc2csv:nc2csv',
+            'nappy=nappy.script.nappy_cli:nappy_cli'
+        ],
+        'xarray.backends': [
+            'nappy=nappy.nc_interface.na_backend:NappyBackendEntrypoint'
         ]
     },
     classifiers=[
@@ -15,3 +15,41 @@ cached_outputs = TESTS_HOME / "cached_outputs"
 if not os.path.isdir(test_outputs):
     os.makedirs(test_outputs)
 
+
+
+synthetic_1001_header = """16    1001
+Synthetic Originator
+Synthetic Organisation
+Synthetic Source
+Synthetic Mission
+1    1
+2019    7    29    2019    7    29
+0.1
+Time (seconds since 2019-07-29 00:00:00)
+2
+1.0    1.0
+-9999    -9999
+CO2 (ppm)
+CH4 (ppb)
+0
+0
+"""
+
+
+def write_synthetic_1001(path, nrows, missing_rows=(), wrapped=False):
+    """
+    Writes a synthetic FFI 1001 file with ``nrows`` data records, where CH4 is
+    missing (-9999) in the rows in ``missing_rows``. If ``wrapped`` is True the
+    records are wrapped irregularly over lines (every third record has CH4 on a
+    line of its own), so they cannot be read as one line per record.
+    Returns the path.
+    """
+    missing_rows = set(missing_rows)
+
+    with open(path, "w") as fh:
+        fh.write(synthetic_1001_header)
+        fh.writelines("%.1f    %.3f%s%s\n" % (i / 10., 410 + (i % 7),
+                                             "\n" if wrapped and i % 3 == 2 else "    ",
+                                             "-9999" if i in missing_rows else "%.3f" % (1900 + (i % 11)))
+                      for i in range(nrows))
+    return path
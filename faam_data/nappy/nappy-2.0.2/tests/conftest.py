@@ -9,6 +9,25 @@ from .common import MINI_CEDA_CACHE_DIR, MINI_CEDA_CACHE_BRANCH
 CEDA_TEST_DATA_REPO_URL = "https://github.com/cedadev/mini-ceda-archive"
 
 
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", default=False,
+                     help="run the (slow) benchmarks marked with 'benchmark'")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: slow micro-benchmark, only run with --run-benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason="needs --run-benchmarks to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture
 def load_ceda_test_data():
     """
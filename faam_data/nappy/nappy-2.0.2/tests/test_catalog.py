@@ -0,0 +1,64 @@
+"""
+test_catalog.py
+===============
+
+Tests for the SQLite catalogue of NASA Ames file headers.
+
+"""
+
+# Import standard library modules
+import os
+import shutil
+
+import pytest
+
+from .common import data_files, test_outputs
+import nappy.catalog
+
+
+@pytest.fixture
+def scan_dir():
+    scan_dir = os.path.join(test_outputs, "catalog_files")
+    if os.path.isdir(scan_dir):
+        shutil.rmtree(scan_dir)
+    os.makedirs(scan_dir)
+
+    for ffi in ("1001", "1010", "2010", "3010"):
+        shutil.copy(os.path.join(data_files, f"{ffi}.na"), scan_dir)
+
+    catalog_file = os.path.join(scan_dir, "catalog.sqlite")
+    return (scan_dir, catalog_file)
+
+
+def test_scan_and_query(scan_dir):
+    (scan_dir, catalog_file) = scan_dir
+    scanned = nappy.catalog.scan([scan_dir], catalog_file=catalog_file, workers=2)
+    assert len(scanned) == 4
+
+    na_1001 = os.path.join(scan_dir, "1001.na")
+    assert nappy.catalog.query(catalog_file, variable="ascent rate") == [na_1001]
+    assert nappy.catalog.query(catalog_file, variable="ASCENT", start_date="2000-09-21") == []
+    assert len(nappy.catalog.query(catalog_file, variable="pressure")) == 3
+    assert nappy.catalog.query(catalog_file, start_date="2000-09-20", end_date="2000-09-20") == [na_1001]
+    assert nappy.catalog.query(catalog_file, ffi=2010) == [os.path.join(scan_dir, "2010.na")]
+    assert nappy.catalog.query(catalog_file, oname="lawrence") == [na_1001]
+
+    variables = nappy.catalog.getFileVariables(na_1001, catalog_file)
+    assert ("V", "Pressure", "hPa", "Pressure (hPa)") in variables
+    assert variables[0][0] == "X"
+
+
+def test_scan_refreshes_only_changed_files(scan_dir):
+    (scan_dir, catalog_file) = scan_dir
+    nappy.catalog.scan(scan_dir, catalog_file=catalog_file, workers=1)
+    assert nappy.catalog.scan(scan_dir, catalog_file=catalog_file, workers=1) == []
+
+    # Modify one file and remove another
+    na_1010 = os.path.join(scan_dir, "1010.na")
+    with open(na_1010, "a") as fh:
+        fh.write("\n")
+    os.remove(os.path.join(scan_dir, "2010.na"))
+
+    assert nappy.catalog.scan(scan_dir, catalog_file=catalog_file, workers=1) == [na_1010]
+    assert nappy.catalog.query(catalog_file, ffi=2010) == []
+    assert len(nappy.catalog.query(catalog_file)) == 3
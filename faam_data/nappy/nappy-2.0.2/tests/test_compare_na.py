@@ -0,0 +1,69 @@
+"""
+test_compare_na.py
+==================
+
+Tests for comparing NASA Ames (and CSV) files.
+
+"""
+
+# Import standard library modules
+import os
+
+import pytest
+
+import nappy
+import nappy.utils.compare_na
+
+from .common import data_files, test_outputs
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010, 1020, 2010, 2110, 2160, 2310, 3010, 4010))
+def test_compare_na_numeric_diff(ffi):
+    infile = os.path.join(data_files, f"{ffi}.na")
+    out_csv = os.path.join(test_outputs, f"test_{ffi}_numeric_diff.csv")
+    nappy.convertNAToCSV(infile, out_csv)
+
+    # Text bodies (FFI 2160) fall back to comparing line by line
+    res = nappy.utils.compare_na.compNAFiles(infile, out_csv, delimiter_2=",", numeric_diff=True)
+    assert res is True
+
+
+def test_compare_na_numeric_diff_reports_differences(capsys):
+    infile = os.path.join(data_files, "1001.na")
+    changed_file = os.path.join(test_outputs, "test_1001_changed.na")
+
+    with open(infile) as fh:
+        lines = fh.readlines()
+
+    nlhead = int(lines[0].split()[0])
+    lines[nlhead + 1] = lines[nlhead + 1].replace("74", "75")
+    lines[nlhead + 2] = lines[nlhead + 2].rstrip() + " 1\n"
+
+    with open(changed_file, "w") as fh:
+        fh.writelines(lines)
+
+    res = nappy.utils.compare_na.compNAFiles(infile, changed_file, header=False, numeric_diff=True)
+    assert res is False
+
+    output = capsys.readouterr().out
+    assert "Number of items differs on 1 lines:\nLine 3:" in output
+    assert "Line 2, column 3: 74.0 != 75.0" in output
+    assert "Items that differ: 1 of " in output
+    assert "Maximum absolute difference: 1.0" in output
+
+    # A large enough tolerance hides the changed value
+    res = nappy.utils.compare_na.compNAFiles(infile, changed_file, header=False, numeric_diff=True,
+                                             atol=1)
+    assert res is False
+    assert "Items that differ" not in capsys.readouterr().out
+
+
+def test_compare_na_numeric_diff_falls_back_for_text_bodies(capsys):
+    infile = os.path.join(data_files, "2160.na")
+
+    res = nappy.utils.compare_na.compNAFiles(infile, infile, header=False, numeric_diff=True)
+    assert res is True
+    assert "Bodies are not all numbers: comparing them line by line." in capsys.readouterr().out
+
+    with pytest.raises(ValueError):
+        nappy.utils.compare_na._parseNumericLines(["1 2\n", "3 x\n"])
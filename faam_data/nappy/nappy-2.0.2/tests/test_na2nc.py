@@ -1,5 +1,8 @@
 import os
+import shutil
 
+import numpy as np
+import pytest
 import xarray as xr
 
 from nappy.nc_interface.na_to_nc import NAToNC
@@ -124,6 +127,20 @@ def test_na2nc_1001_v0_only():
     assert {"ascent_rate"} == {*list(ds.variables.keys())} - {*list(ds.coords.keys())}
 
 
+def test_na_to_xarray_reads_only_selected_variables():
+    infile = os.path.join(data_files, "1010.na")
+    full = NAToNC(infile, time_warning=False)
+    full.convert()
+
+    vname = full.na_file_obj.VNAME[2]
+    c = NAToNC(infile, variables=[vname], time_warning=False)
+    c.convert()
+
+    assert c.na_file_obj.var_numbers == [2] and len(c.na_file_obj.V) == 1
+    assert [var.attrs["nasa_ames_var_number"] for var in c.xr_variables] == [2]
+    np.testing.assert_array_equal(c.xr_variables[0].values, full.xr_variables[2].values)
+
+
 def test_na2nc_4010_rename_var():
     # na2nc.py -i testdata/4010.na -o test_outputs/4010-renamed.nc -n -r Temperature,testvar1
     infile, outfile = _get_paths(4010, label="rename-var")
@@ -135,3 +152,123 @@ def test_na2nc_4010_rename_var():
     ds = xr.open_dataset(outfile)
     assert "testvar1" in ds
 
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010, 2010))
+def test_na2nc_in_chunks(ffi):
+    # Writing in chunks along an unlimited dimension gives the same content
+    infile, outfile = _get_paths(ffi)
+    _, chunked_outfile = _get_paths(ffi, label="chunked")
+
+    nappy.convertNAToNC(infile, outfile, time_warning=False)
+    nappy.convertNAToNC(infile, chunked_outfile, time_warning=False, chunk_rows=2)
+
+    ds = xr.open_dataset(outfile)
+    chunked_ds = xr.open_dataset(chunked_outfile)
+
+    assert chunked_ds.equals(ds)
+    assert list(chunked_ds.encoding["unlimited_dims"]) == [list(ds.sizes)[0]]
+
+
+@pytest.mark.parametrize("chunk_rows", (None, 2))
+def test_na2nc_with_encoding(chunk_rows):
+    # Compression and chunk sizes can be set for all variables and per variable
+    infile, outfile = _get_paths(1010)
+    _, encoded_outfile = _get_paths(1010, label=f"encoded-{chunk_rows}")
+
+    nappy.convertNAToNC(infile, outfile, time_warning=False)
+    ds = xr.open_dataset(outfile)
+    var_names = list(ds.data_vars)
+
+    encoding = {"*": {"zlib": True, "complevel": 5},
+                var_names[0]: {"complevel": 1, "chunksizes": (4,)}}
+    nappy.convertNAToNC(infile, encoded_outfile, time_warning=False, chunk_rows=chunk_rows,
+                        encoding=encoding)
+
+    encoded_ds = xr.open_dataset(encoded_outfile)
+    assert encoded_ds.equals(ds)
+
+    first = encoded_ds[var_names[0]].encoding
+    assert (first["zlib"], first["complevel"], first["chunksizes"]) == (True, 1, (4,))
+
+    for var_name in var_names[1:]:
+        assert (encoded_ds[var_name].encoding["zlib"], encoded_ds[var_name].encoding["complevel"]) == (True, 5)
+
+    with pytest.raises(Exception, match="unknown variable"):
+        nappy.convertNAToNC(infile, encoded_outfile, time_warning=False, chunk_rows=chunk_rows,
+                            encoding={"not_a_variable": {"zlib": True}})
+
+
+def _make_batch_dir(name):
+    src_dir = os.path.join(test_outputs, name)
+    if os.path.isdir(src_dir):
+        shutil.rmtree(src_dir)
+    os.makedirs(src_dir)
+
+    for ffi in (1001, 1010, 2010):
+        shutil.copy(os.path.join(data_files, f"{ffi}.na"), src_dir)
+
+    with open(os.path.join(src_dir, "broken.na"), "w") as fh:
+        fh.write("not a NASA Ames file\n")
+
+    return src_dir
+
+
+def test_convert_na_directory_to_nc():
+    src_dir = _make_batch_dir("batch_na")
+    dst_dir = os.path.join(src_dir, "nc")
+
+    results = nappy.convertNADirectoryToNC(src_dir, dst_dir, workers=2, time_warning=False)
+    statuses = dict([(os.path.basename(result[0]), result[2]) for result in results])
+
+    assert statuses == {"1001.na": "converted", "1010.na": "converted",
+                        "2010.na": "converted", "broken.na": "failed"}
+    assert os.path.isfile(os.path.join(dst_dir, "1010.na.nc"))
+
+    # Outputs are up to date so only the failed file is tried again
+    results = nappy.convertNADirectoryToNC(src_dir, dst_dir, workers=1, time_warning=False)
+    assert [result[2] for result in results] == ["skipped", "skipped", "skipped", "failed"]
+
+
+def test_na2nc_batch_cli(capsys):
+    from nappy.script.na2nc import na2nc
+
+    src_dir = _make_batch_dir("batch_na_cli")
+    results = na2nc(["--batch", "--jobs", "2", "-n", "-i", src_dir])
+
+    assert len(results) == 4
+    assert "3 files converted, 0 skipped, 1 failed." in capsys.readouterr().out
+
+
+def test_na_to_xarray_masks_and_scales_without_copying():
+    infile = os.path.join(data_files, "1010.na")
+    fin = nappy.openNAFile(infile)
+    fin.readData()
+    raw = np.array(fin.V[0])
+
+    c = NAToNC(infile, time_warning=False)
+    c.convert()
+    var = c.xr_variables[0]
+    (name, units, miss, scal) = c.na_file_obj.getVariable(0)
+
+    # Variables are views of a single copy of the values read from the file
+    assert var.values.base is c.xr_variables[1].values.base is not None
+    assert not np.shares_memory(var.values, c.na_file_obj.V[0])
+
+    expected = np.where(raw == miss, np.nan, raw * scal)
+    assert scal != 1 and np.isnan(expected).any()
+    np.testing.assert_array_equal(var.values, expected)
+
+
+def test_na_to_xarray_leaves_na_file_object_unchanged():
+    fin = nappy.openNAFile(os.path.join(data_files, "1010.na"))
+    fin.readData()
+    raw = [np.array(values) for values in fin.V]
+    aux = [np.array(values) for values in fin.A]
+
+    NAToNC(fin, time_warning=False).convert()
+
+    for (values, expected) in zip(fin.V, raw):
+        np.testing.assert_array_equal(values, expected)
+    for (values, expected) in zip(fin.A, aux):
+        np.testing.assert_array_equal(values, expected)
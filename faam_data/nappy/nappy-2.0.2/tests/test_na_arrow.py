@@ -0,0 +1,66 @@
+"""
+test_na_arrow.py
+================
+
+Tests for reading NASA Ames files as Arrow tables and writing Parquet files.
+
+"""
+
+# Import standard library modules
+import os
+
+import numpy as np
+import pytest
+
+import nappy
+
+from .common import data_files, test_outputs, write_synthetic_1001
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_read_na_as_arrow_decodes_time_and_masks_missing_values():
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_arrow.na"), 100, missing_rows=[4])
+
+    table = nappy.readNAAsArrow(path)
+    assert table.column_names == ["Time", "CO2", "CH4"]
+    assert table.schema.field("Time").type == pa.timestamp("ns")
+    assert table.schema.field("CO2").metadata[b"units"] == b"ppm"
+
+    times = table.column("Time").to_numpy()
+    assert times[0] == np.datetime64("2019-07-29T00:00:00")
+    assert times[15] == np.datetime64("2019-07-29T00:00:01.500")
+
+    ch4 = table.column("CH4")
+    assert ch4.null_count == 1 and ch4[4].as_py() is None
+    assert ch4[5].as_py() == 1905.
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010))
+def test_convert_na_to_parquet(ffi):
+    infile = os.path.join(data_files, f"{ffi}.na")
+    outfile = os.path.join(test_outputs, f"{ffi}.parquet")
+    assert nappy.convertNAToParquet(infile, outfile) == outfile
+
+    fin = nappy.openNAFile(infile)
+    fin.readData()
+    table = pq.read_table(outfile)
+
+    assert table.num_rows == len(fin.X) and table.num_columns == 1 + (fin.NAUXV or 0) + fin.NV
+
+    # Values are scaled and missing values are null
+    (name, units, miss, scal) = fin.getVariable(0)
+    values = np.array(fin.V[0])
+    expected = np.where(values == miss, np.nan, values * scal)
+    column = table.column((fin.NAUXV or 0) + 1).to_numpy(zero_copy_only=False)
+    np.testing.assert_array_equal(column, expected)
+
+
+def test_read_na_as_arrow_selected_variables():
+    table = nappy.readNAAsArrow(os.path.join(data_files, "1010.na"), variables=[2])
+    assert table.num_columns == 1 + 2 + 1
+    assert table.schema.field(3).metadata[b"long_name"] == b"O(3P) concentration (cm-3)"
+
+    with pytest.raises(Exception, match="FFI 2010"):
+        nappy.readNAAsArrow(os.path.join(data_files, "2010.na"))
@@ -0,0 +1,124 @@
+"""
+test_na_backend.py
+==================
+
+Tests for opening NASA Ames files as lazily loaded Xarray Datasets.
+
+"""
+
+# Import standard library modules
+import os
+
+import numpy as np
+import pytest
+
+import nappy
+import nappy.nc_interface.na_backend
+import nappy.nc_interface.na_to_nc
+
+from .common import data_files, test_outputs, write_synthetic_1001
+
+
+@pytest.mark.parametrize("ffi", ["1001", "1010", "2010", "3010", "4010"])
+def test_open_dataset_matches_na_to_nc(ffi):
+    na_file = os.path.join(data_files, f"{ffi}.na")
+
+    convertor = nappy.nc_interface.na_to_nc.NAToNC(na_file, time_warning=False)
+    convertor.convert()
+    expected = convertor._buildDataset()
+
+    ds = nappy.open_dataset(na_file)
+    assert list(ds.data_vars) == list(expected.data_vars)
+    assert dict(ds.sizes) == dict(expected.sizes)
+
+    for name in expected.variables:
+        assert np.array_equal(ds[name].values, expected[name].values, equal_nan=True)
+        assert ds[name].attrs == expected[name].attrs
+
+    ds.close()
+
+
+def test_open_dataset_reads_only_selected_records(monkeypatch):
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_lazy.na"), 20000)
+    reads = []
+
+    read_records = nappy.nc_interface.na_backend.NAFileDataStore.readRecords
+    def recording_read_records(self, item, number, first_record, end_record):
+        reads.append((item, number, first_record, end_record))
+        return read_records(self, item, number, first_record, end_record)
+
+    monkeypatch.setattr(nappy.nc_interface.na_backend.NAFileDataStore, "readRecords",
+                        recording_read_records)
+
+    ds = nappy.open_dataset(path)
+    assert reads == []
+
+    subset = ds["co2"].sel(time=slice(1000.0, 1099.95)).values
+    assert len(subset) == 1000
+    assert subset[0] == 410 + (10000 % 7)
+
+    # Only the selected records of the selected variable were read
+    assert reads == [("V", 0, 10000, 11000)]
+    ds.close()
+
+
+def test_open_dataset_with_wrapped_records():
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_lazy_wrapped.na"), 30, wrapped=True)
+    fin = nappy.openNAFile(path)
+    fin.readData()
+
+    # The records cannot be indexed so the data section is read in full
+    ds = nappy.open_dataset(path)
+    assert list(ds["time"].values) == list(fin.X)
+    assert list(ds["ch4"].sel(time=slice(0.45, 0.75)).values) == [1905., 1906., 1907.]
+    assert list(ds["co2"].load().values) == list(fin.V[0])
+    ds.close()
+
+
+def test_open_dataset_with_dask_chunks():
+    pytest.importorskip("dask")
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_lazy.na"), 20000)
+
+    ds = nappy.open_dataset(path, chunks={"time": 5000})
+    assert ds["ch4"].chunks == ((5000,) * 4,)
+
+    fin = nappy.openNAFile(path)
+    fin.readData()
+    assert np.array_equal(ds["ch4"].values, fin.V[1])
+    ds.close()
+
+
+@pytest.mark.parametrize("engine", ["nappy", nappy.nc_interface.na_backend.NappyBackendEntrypoint])
+def test_xarray_open_dataset_with_dask_chunks(engine):
+    pytest.importorskip("dask")
+    xr = pytest.importorskip("xarray")
+
+    if engine == "nappy" and "nappy" not in xr.backends.list_engines():
+        pytest.skip("nappy is not installed as an Xarray backend")
+
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_lazy.na"), 20000)
+
+    ds = xr.open_dataset(path, engine=engine, chunks={"time": 5000})
+    assert ds["co2"].chunks == ((5000,) * 4,)
+
+    fin = nappy.openNAFile(path)
+    fin.readData()
+    assert np.array_equal(ds["co2"][12000:13000].values, fin.V[0][12000:13000])
+    ds.close()
+
+
+def test_open_dataset_makes_each_lazy_array_once(monkeypatch):
+    na_file = os.path.join(data_files, "1010.na")
+    made = []
+
+    init = nappy.nc_interface.na_backend.NAVariableBackendArray.__init__
+    def recording_init(self, data_store, item, number, *args):
+        made.append((item, number))
+        init(self, data_store, item, number, *args)
+
+    monkeypatch.setattr(nappy.nc_interface.na_backend.NAVariableBackendArray, "__init__", recording_init)
+
+    ds = nappy.open_dataset(na_file)
+    fin = nappy.openNAFile(na_file)
+    assert sorted(made) == [("A", n) for n in range(fin.NAUXV)] + [("V", n) for n in range(fin.NV)]
+    ds.close()
@@ -0,0 +1,132 @@
+"""
+test_na_cache.py
+================
+
+Tests for the on-disk cache of parsed NASA Ames files.
+
+"""
+
+# Import standard library modules
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from .common import data_files, test_outputs
+import nappy
+import nappy.utils.na_cache
+from nappy.script.nappy_cli import nappy_cli
+
+
+_FFIS = ["1001", "1010", "1020", "2010", "2110", "2310", "3010", "4010"]
+
+
+@pytest.fixture
+def cache_dir(monkeypatch):
+    cache_dir = os.path.join(test_outputs, "nappy_cache")
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+
+    monkeypatch.setenv("NAPPY_CACHE_DIR", cache_dir)
+    return cache_dir
+
+
+def _assert_data_equal(a, b):
+    if a is None or b is None:
+        assert a is None and b is None
+    else:
+        assert np.array_equal(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+
+
+@pytest.mark.parametrize("ffi", _FFIS)
+def test_cached_read_matches_parsed_read(cache_dir, ffi):
+    fpath = os.path.join(data_files, f"{ffi}.na")
+    fin = nappy.openNAFile(fpath)
+    fin.readData()
+    expected = fin.getNADict()
+
+    # First read populates the cache, second read loads from it
+    nappy.openNAFile(fpath, cache=True).readData()
+    cached = nappy.openNAFile(fpath, cache=True)
+
+    if ffi in ("2110", "2310"):
+        # Records with varying numbers of values cannot be stored as arrays
+        assert cached._cached_data is None
+        return
+
+    assert cached._cached_data is not None
+    cached.readData()
+    na_dict = cached.getNADict()
+
+    for key in ("NLHEAD", "FFI", "VNAME", "XNAME", "ANAME", "VMISS", "SCOM", "NCOM", "DATE"):
+        assert na_dict.get(key) == expected.get(key)
+
+    for key in ("V", "A"):
+        for (a, b) in zip(na_dict.get(key) or [], expected.get(key) or []):
+            _assert_data_equal(a, b)
+
+    if fin.NIV == 1:
+        _assert_data_equal(na_dict["X"], expected["X"])
+    else:
+        for (a, b) in zip(na_dict["X"], expected["X"]):
+            _assert_data_equal(a, b)
+
+
+def _assert_items_identical(a, b):
+    assert type(a) is type(b)
+
+    if isinstance(a, (list, tuple)):
+        assert len(a) == len(b)
+        for (item_a, item_b) in zip(a, b):
+            _assert_items_identical(item_a, item_b)
+    elif isinstance(a, np.ndarray):
+        assert a.dtype == b.dtype and np.array_equal(a, b)
+    else:
+        assert a == b
+
+
+@pytest.mark.parametrize("ffi", _FFIS)
+def test_cached_na_dict_identical_to_parsed_na_dict(cache_dir, ffi):
+    fpath = os.path.join(data_files, f"{ffi}.na")
+    fin = nappy.openNAFile(fpath)
+    fin.readData()
+    expected = fin.getNADict()
+
+    nappy.openNAFile(fpath, cache=True).readData()
+    cached = nappy.openNAFile(fpath, cache=True)
+    cached.readData()
+    na_dict = cached.getNADict()
+
+    # The data items have the same structure and types as when parsed
+    assert sorted(na_dict) == sorted(expected)
+    for key in expected:
+        _assert_items_identical(na_dict[key], expected[key])
+
+
+def test_cache_entry_invalidated_when_file_changes(cache_dir):
+    fpath = os.path.join(test_outputs, "1001_cache_copy.na")
+    shutil.copy(os.path.join(data_files, "1001.na"), fpath)
+
+    nappy.openNAFile(fpath, cache=True).readData()
+    assert nappy.openNAFile(fpath, cache=True)._cached_data is not None
+
+    with open(fpath, "a") as fh:
+        fh.write("\n")
+
+    assert nappy.openNAFile(fpath, cache=True)._cached_data is None
+
+
+def test_cache_eviction_and_clear(cache_dir, capsys):
+    for ffi in ("1001", "1010", "2010"):
+        nappy.openNAFile(os.path.join(data_files, f"{ffi}.na"), cache=True).readData()
+
+    (count, size) = nappy.utils.na_cache.getCacheInfo()
+    assert count == 3
+
+    assert nappy.utils.na_cache.evictCache(max_size=size - 1) >= 1
+    assert nappy.utils.na_cache.getCacheInfo()[0] < 3
+
+    nappy_cli(["cache", "clear"])
+    assert "Removed" in capsys.readouterr().out
+    assert nappy.utils.na_cache.getCacheInfo() == (0, 0)
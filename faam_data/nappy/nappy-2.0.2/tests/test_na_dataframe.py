@@ -0,0 +1,83 @@
+"""
+test_na_dataframe.py
+====================
+
+Tests for reading NASA Ames files as pandas DataFrames.
+
+"""
+
+# Import standard library modules
+import os
+
+import numpy as np
+import pytest
+
+import nappy
+
+from .common import data_files, test_outputs, write_synthetic_1001
+
+pd = pytest.importorskip("pandas")
+
+
+def test_to_dataframe_decodes_time_index_and_masks_missing_values():
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_dataframe.na"), 100, missing_rows=[4])
+
+    df = nappy.to_dataframe(path)
+    assert list(df.columns) == ["CO2", "CH4"]
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert df.index.name == "Time"
+    assert df.index[0] == pd.Timestamp("2019-07-29T00:00:00")
+    assert df.index[-1] == pd.Timestamp("2019-07-29T00:00:09.9")
+
+    assert df["CO2"].dtype == np.float64
+    assert df["CO2"].iloc[1] == 411
+    assert np.isnan(df["CH4"].iloc[4])
+    assert df["CH4"].isna().sum() == 1
+
+
+def test_to_dataframe_applies_flag_mask_to_selected_variables():
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_dataframe.na"), 100)
+
+    # Use CH4 as the flag for CO2 without including it in the output
+    df = nappy.to_dataframe(path, variables=["CO2"], flag_mask={"CO2": "CH4"},
+                            flag_threshold=1905, dtype="float32")
+    assert list(df.columns) == ["CO2"]
+    assert df["CO2"].dtype == np.float32
+
+    ch4 = 1900 + np.arange(100) % 11
+    assert (df["CO2"].isna().values == (ch4 > 1905)).all()
+    assert df["CO2"].iloc[0] == 410
+
+
+def test_to_dataframe_applies_flag_mask_given_by_full_variable_names():
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_dataframe.na"), 100)
+
+    df = nappy.to_dataframe(path, variables=["CO2"], flag_mask={"CO2 (ppm)": "CH4 (ppb)"},
+                            flag_threshold=1905)
+    assert list(df.columns) == ["CO2"]
+
+    ch4 = 1900 + np.arange(100) % 11
+    assert (df["CO2"].isna().values == (ch4 > 1905)).all()
+
+    # Variable numbers can be used too
+    df_by_number = nappy.to_dataframe(path, flag_mask={0: 1}, flag_threshold=1905)
+    assert list(df_by_number.columns) == ["CO2", "CH4"]
+    assert (df_by_number["CO2"].isna().values == (ch4 > 1905)).all()
+
+
+def test_to_dataframe_without_decoded_times():
+    na_file = os.path.join(data_files, "1010.na")
+    fin = nappy.openNAFile(na_file)
+    fin.readData()
+
+    df = nappy.to_dataframe(na_file, decode_times=False)
+    assert not isinstance(df.index, pd.DatetimeIndex)
+    assert list(df.index) == list(fin.X)
+    assert len(df.columns) == fin.NAUXV + fin.NV
+
+
+def test_to_dataframe_rejects_unknown_flag_column():
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_dataframe.na"), 10)
+
+    with pytest.raises(Exception, match="column not known: NOx"):
+        nappy.to_dataframe(path, flag_mask={"NOx": "CO2"})
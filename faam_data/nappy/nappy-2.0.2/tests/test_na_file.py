@@ -12,9 +12,10 @@ Tests for the reading and writing all the NAFile classes:
 import os
 import sys
 
+import numpy as np
 import pytest
 
-from .common import data_files, test_outputs
+from .common import data_files, test_outputs, write_synthetic_1001
 import nappy
 import nappy.utils.compare_na
 
@@ -82,3 +83,309 @@ def test_na_file(ffi):
         fobj = nappy.openNAFile(foutname, mode="w", na_dict=na_dict)
         fobj.write()
         assert isinstance(fobj, nappy.na_file.na_file.NAFile)
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010))
+def test_block_reader_matches_record_reader(ffi):
+    "Tests the vectorised data section reader gives the same values as the record reader."
+    infile = os.path.join(data_files, f"{ffi}.na")
+
+    fin = nappy.openNAFile(infile)
+    fin.readData()
+    assert isinstance(fin.X, np.ndarray)
+
+    fin_records = nappy.openNAFile(infile)
+    fin_records._readDataBlock = lambda datalines: False
+    fin_records.readData()
+    assert isinstance(fin_records.X, list)
+
+    assert fin.X.tolist() == fin_records.X
+    assert [v.tolist() for v in fin.V] == fin_records.V
+    if ffi == 1010:
+        assert [a.tolist() for a in fin.A] == fin_records.A
+
+
+@pytest.mark.parametrize("ffi", ("2010", "2010a", "3010", "4010"))
+def test_multidimensional_block_reader_matches_record_reader(ffi):
+    "Tests the 2010/3010/4010 data section is read into (n_records, *NX) arrays."
+    infile = os.path.join(data_files, f"{ffi}.na")
+
+    fin = nappy.openNAFile(infile)
+    fin.readData()
+
+    fin_records = nappy.openNAFile(infile)
+    fin_records._readDataBlock = lambda datalines: False
+    fin_records.readData()
+
+    n_records = len(fin_records.X[0])
+    assert np.array_equal(fin.X[0], fin_records.X[0])
+
+    for (v, v_records) in zip(fin.V, fin_records.V):
+        assert isinstance(v, np.ndarray)
+        assert v.shape == (n_records,) + tuple(fin.NX)
+        assert np.array_equal(v, np.array(v_records))
+
+    for (a, a_records) in zip(fin.A, fin_records.A):
+        assert np.array_equal(a, a_records)
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010, 1020, 2010, 3010, 4010))
+def test_iter_data_matches_read_data(ffi):
+    "Tests that reading the data in chunks gives the same arrays as reading it all at once."
+    infile = os.path.join(data_files, f"{ffi}.na")
+
+    fin = nappy.openNAFile(infile)
+    fin.readData()
+    x = fin.X if fin.NIV == 1 else fin.X[0]
+
+    chunks = list(nappy.openNAFile(infile).iterData(chunk_rows=2))
+    assert all(len(chunk_x) <= 2 for (chunk_x, v, a) in chunks)
+
+    assert np.array_equal(np.concatenate([c[0] for c in chunks]), np.asarray(x, dtype=float))
+    assert np.array_equal(np.concatenate([c[1] for c in chunks], axis=1), np.array(fin.V, dtype=float))
+
+    if fin.NAUXV:
+        assert np.array_equal(np.concatenate([c[2] for c in chunks], axis=1), np.array(fin.A, dtype=float))
+    else:
+        assert all(a is None for (x, v, a) in chunks)
+
+
+def test_iter_data_not_supported_for_2110():
+    fin = nappy.openNAFile(os.path.join(data_files, "2110.na"))
+
+    with pytest.raises(Exception):
+        next(fin.iterData())
+
+
+@pytest.mark.parametrize("ffi", ["1001", "1010"])
+def test_read_data_x_range(ffi):
+    fpath = os.path.join(data_files, f"{ffi}.na")
+    fin = nappy.openNAFile(fpath)
+    fin.readData()
+    x = np.asarray(fin.X)
+    (start, stop) = (x[1], x[-2])
+    keep = (x >= start) & (x <= stop)
+    nvpm = fin.NVPM or 1
+
+    for use_mmap in (False, True):
+        fwin = nappy.openNAFile(fpath, mmap=use_mmap)
+        fwin.readData(x_range=(start, stop))
+        assert list(fwin.X) == list(x[keep])
+
+        for v_win, v in zip(fwin.V, fin.V):
+            expected = np.asarray(v).reshape(len(x), nvpm)[keep].ravel()
+            assert list(v_win) == list(expected)
+
+        for a_win, a in zip(fwin.A or [], fin.A or []):
+            assert list(a_win) == list(np.asarray(a)[keep])
+        fwin.close()
+
+
+@pytest.mark.parametrize("wrapped", [False, True])
+def test_read_data_x_range_with_mmap_index(tmp_path, wrapped):
+    fpath = write_synthetic_1001(str(tmp_path / "synthetic_1001.na"), 30, wrapped=wrapped)
+
+    # Records wrapped over lines cannot be indexed so are read in full
+    fwin = nappy.openNAFile(fpath, mmap=True)
+    assert fwin.getNumRecords() == (None if wrapped else 30)
+
+    fwin.readData(x_range=(0.45, 0.75))
+    assert list(fwin.X) == [0.5, 0.6, 0.7]
+    assert list(fwin.V[1]) == [1905., 1906., 1907.]
+
+    fwin.readData(x_range=(10., 20.))
+    assert len(fwin.X) == 0 and len(fwin.V[0]) == 0
+    fwin.close()
+
+
+def test_record_index_not_built_for_1020():
+    # Each 1020 record spans 1 + NV lines
+    fin = nappy.openNAFile(os.path.join(data_files, "1020.na"), mmap=True)
+    assert fin.getNumRecords() is None
+    fin.close()
+
+
+@pytest.mark.parametrize("ffi", _FFIS)
+def test_read_data_selected_variables(ffi):
+    fpath = os.path.join(data_files, f"{ffi}.na")
+    fin = nappy.openNAFile(fpath)
+    fin.readData()
+
+    # Select by name (as returned by getVariable) and by number, in reverse order
+    selection = [fin.getVariable(fin.NV - 1)[0], 0]
+    fsel = nappy.openNAFile(fpath)
+    fsel.readData(variables=selection)
+
+    assert fsel.var_numbers == [fin.NV - 1, 0]
+    assert len(fsel.V) == 2
+    for (v_sel, number) in zip(fsel.V, fsel.var_numbers):
+        assert str(v_sel) == str(fin.V[number])
+
+    assert str(fsel.X) == str(fin.X)
+    assert str(fsel.A) == str(fin.A)
+
+    with pytest.raises(Exception, match="Variable name not known"):
+        fsel.readData(variables=["not a variable"])
+
+
+@pytest.mark.parametrize("position", (-1, 1))
+def test_read_data_selected_variables_rejects_long_lines(position):
+    with open(os.path.join(data_files, "1001.na")) as fh:
+        lines = fh.readlines()
+
+    # Add an item to the second data line
+    nlhead = int(lines[0].split()[0])
+    items = lines[nlhead + 1].split()
+    items.insert(len(items) if position == -1 else position, "999")
+    lines[nlhead + 1] = " ".join(items) + "\n"
+
+    bad_file = os.path.join(test_outputs, "test_1001_long_line.na")
+    with open(bad_file, "w") as fh:
+        fh.writelines(lines)
+
+    for variables in (None, [0], [2]):
+        with pytest.raises(Exception, match="Could not split 1 lines exactly"):
+            nappy.openNAFile(bad_file).readData(variables=variables)
+
+
+def test_read_data_x_range_not_supported_for_2010():
+    fin = nappy.openNAFile(os.path.join(data_files, "2010.na"))
+    with pytest.raises(Exception):
+        fin.readData(x_range=(0, 1))
+
+
+def _legacy_data_lines(na_dict, fmt):
+    "Formats the 1001/1010 data section one value at a time (as the original writer did)."
+    lines = []
+    for m in range(len(na_dict["X"])):
+        aux = [na_dict["X"][m]] + [a[m] for a in na_dict.get("A") or []]
+        values = [v[m] for v in na_dict["V"]]
+
+        if na_dict["FFI"] == 1001:
+            rows = [aux + values]
+        else:
+            rows = [aux, values]
+
+        for row in rows:
+            lines.append("".join([fmt % value for value in row]).rstrip(" ,") + "\n")
+    return lines
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010))
+@pytest.mark.parametrize("delimiter", ("    ", ","))
+def test_write_data_matches_per_value_formatting(ffi, delimiter):
+    "Tests the buffered writer gives byte-identical data lines to per-value formatting."
+    fin = nappy.openNAFile(os.path.join(data_files, f"{ffi}.na"))
+    fin.readData()
+    na_dict = fin.getNADict()
+
+    outfile = os.path.join(test_outputs, f"test_{ffi}_buffered.na")
+    fobj = nappy.openNAFile(outfile, mode="w", na_dict=na_dict)
+    fobj.write_buffer_lines = 3
+    fobj.write(delimiter=delimiter)
+    fobj.close()
+
+    with open(outfile) as fh:
+        data_lines = fh.readlines()[fobj.NLHEAD:]
+
+    assert data_lines == _legacy_data_lines(na_dict, "%.10g" + delimiter)
+
+
+@pytest.mark.parametrize("ffi", _FFIS)
+def test_open_header_only(ffi):
+    infile = os.path.join(data_files, f"{ffi}.na")
+
+    fin = nappy.openNAFile(infile, header_only=True)
+    assert not fin.is_open
+    assert fin.getVariables() == nappy.openNAFile(infile).getVariables()
+
+    with pytest.raises(Exception):
+        fin.readData()
+
+
+def test_read_items_from_unknown_lines_validates_count():
+    from io import StringIO
+    from nappy.utils.text_parser import readItemsFromUnknownLines
+
+    fh = StringIO("1 2 3\n4 5\n6\n")
+    assert readItemsFromUnknownLines(fh, 5, int) == [1, 2, 3, 4, 5]
+
+    for text in ("1 2 3\n4 5 6\n", "1 2\n"):
+        with pytest.raises(Exception):
+            readItemsFromUnknownLines(StringIO(text), 5, int)
+
+
+def test_get_na_file_class():
+    from nappy.na_file.na_file_1020 import NAFile1020
+
+    assert nappy.getNAFileClass(1020) is NAFile1020
+    assert nappy.getNAFileClass("1020") is NAFile1020
+
+    with pytest.raises(Exception):
+        nappy.getNAFileClass(9999)
+
+
+@pytest.mark.parametrize("ffi", (1001, 1010, 1020, 2010, 2110, 2310, 3010, 4010))
+def test_convert_na_to_csv_transcode(ffi, monkeypatch):
+    import nappy.utils.na_transcoder
+    infile = os.path.join(data_files, f"{ffi}.na")
+    out_csv = os.path.join(test_outputs, f"test_{ffi}_transcoded.csv")
+
+    # Use small blocks to test lines that are split between blocks
+    monkeypatch.setattr(nappy.utils.na_transcoder, "block_size", 100)
+    nappy.convertNAToCSV(infile, out_csv, mode="transcode", validate=True)
+
+    # The header is the same as when converting to CSV
+    out_converted_csv = os.path.join(test_outputs, f"test_{ffi}_converted.csv")
+    nappy.convertNAToCSV(infile, out_converted_csv)
+
+    with open(infile) as fh:
+        lines = fh.readlines()
+    with open(out_csv) as fh:
+        csv_lines = fh.readlines()
+    with open(out_converted_csv) as fh:
+        converted_lines = fh.readlines()
+
+    nlhead = int(lines[0].split()[0])
+    assert csv_lines[:nlhead] == converted_lines[:nlhead]
+
+    # The data values keep their formatting but are separated by commas
+    assert [line.strip().split(",") for line in csv_lines[nlhead:]] == \
+           [line.split() for line in lines[nlhead:] if line.strip()]
+
+
+@pytest.mark.parametrize("mode", ("convert", "transcode"))
+def test_convert_na_to_csv_no_header(mode):
+    infile = os.path.join(data_files, "1001.na")
+    out_csv = os.path.join(test_outputs, f"test_1001_{mode}.csv")
+    out_no_header_csv = os.path.join(test_outputs, f"test_1001_{mode}_no_header.csv")
+
+    nappy.convertNAToCSV(infile, out_csv, mode=mode)
+    nappy.convertNAToCSV(infile, out_no_header_csv, mode=mode, no_header=True)
+
+    with open(out_csv) as fh:
+        csv_lines = fh.readlines()
+    with open(out_no_header_csv) as fh:
+        no_header_lines = fh.readlines()
+
+    # Only the data lines are written
+    nlhead = int(csv_lines[0].split(",")[0])
+    assert no_header_lines == csv_lines[nlhead:]
+
+
+def test_convert_na_to_csv_transcode_validation():
+    bad_file = os.path.join(test_outputs, "test_1001_bad_value.na")
+
+    with open(os.path.join(data_files, "1001.na")) as fh:
+        content = fh.read()
+    with open(bad_file, "w") as fh:
+        fh.write(content + "79230 44 not_a_number 10100\n")
+
+    out_csv = os.path.join(test_outputs, "test_1001_bad_value.csv")
+    nappy.convertNAToCSV(bad_file, out_csv, mode="transcode")
+
+    with pytest.raises(Exception, match="non-numeric value"):
+        nappy.convertNAToCSV(bad_file, out_csv, mode="transcode", validate=True)
+
+    with pytest.raises(Exception, match="FFI 2160"):
+        nappy.convertNAToCSV(os.path.join(data_files, "2160.na"), out_csv, mode="transcode")
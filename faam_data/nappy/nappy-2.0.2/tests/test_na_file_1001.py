@@ -72,6 +72,31 @@ def test_writeAnnotatedCSV1001(tmpdir):
     fobj.write(delimiter=",", annotation=True)
     assert(isinstance(fobj, nappy.na_file.na_file.NAFile))
 
+
+def test_writeAnnotatedCSV1001_looks_up_annotations_once(tmpdir, monkeypatch):
+    "Tests that annotations are only looked up in the config once and prefix every data line."
+    infile, na_dict = _get_inputs()
+    out_csv_annotated = os.path.join(tmpdir.strpath, "test_1001_annotated_once.csv")
+
+    lookups = []
+    get_annotations = nappy.utils.parse_config.getAnnotationsConfigDict
+    monkeypatch.setattr(nappy.utils.common_utils, "_annotations", {})
+    monkeypatch.setattr(nappy.utils.parse_config, "getAnnotationsConfigDict",
+                        lambda: lookups.append(1) or get_annotations())
+
+    for i in range(2):
+        fobj = nappy.openNAFile(out_csv_annotated, mode="w", na_dict=na_dict)
+        fobj.write(delimiter=",", annotation=True)
+        fobj.close()
+
+    with open(out_csv_annotated) as fh:
+        lines = fh.readlines()
+
+    # One lookup per distinct annotation (e.g. "Normal comments line 3"), none on the second write
+    assert len(lookups) == len(nappy.utils.common_utils._annotations) < len(lines)
+    data_lines = lines[na_dict["NLHEAD"]:]
+    assert len(data_lines) == len(na_dict["X"]) and all(line.startswith("Data section,") for line in data_lines)
+
  
 def test_na1001CurlyWithCurlyBraces(tmpdir):
     "Tests an input file with curly braces."
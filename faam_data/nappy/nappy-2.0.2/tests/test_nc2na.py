@@ -5,6 +5,7 @@ import numpy as np
 
 from nappy.nappy_api import openNAFile
 from nappy.nc_interface.nc_to_na import NCToNA
+from nappy.nc_interface import xarray_utils
 import nappy.utils
 
 from .common import data_files, test_outputs, cached_outputs, MINI_BADC_DIR
@@ -202,3 +203,146 @@ def test_convert_data_with_string_variable(load_ceda_test_data):
 
     assert "value = natural_grasses" in na.SCOM 
     assert "value = 0.0" in na.SCOM
+
+
+def _write_long_nc(path, nrecords):
+    time = np.arange(nrecords, dtype=np.float64)
+    temp = 280 + (time % 13) / 4.
+    temp[::100] = np.nan
+
+    ds = xr.Dataset({"temp": ("time", temp, {"units": "K", "long_name": "temperature"})},
+                    coords={"time": ("time", time, {"units": "seconds since 2020-01-01 00:00:00",
+                                                    "standard_name": "time"})})
+    ds["temp"].encoding["_FillValue"] = -999.
+    ds.to_netcdf(path)
+    return temp
+
+
+def test_nc_to_na_loads_variables_in_chunks(monkeypatch):
+    infile = os.path.join(test_outputs, "long_1001.nc")
+    outfile = os.path.join(test_outputs, "long_1001.nc.na")
+    temp = _write_long_nc(infile, 1000)
+    monkeypatch.setattr(xarray_utils.LazyValueList, "chunk_size", 64)
+
+    loaded = []
+    get_values = xarray_utils.LazyValueList._getValues
+
+    def recording_get_values(self, key):
+        values = get_values(self, key)
+        loaded.append(len(values))
+        return values
+
+    monkeypatch.setattr(xarray_utils.LazyValueList, "_getValues", recording_get_values)
+
+    na = NCToNA(infile)
+    na.writeNAFiles(outfile, float_format="%g")
+    assert isinstance(na.na_dict_list[0][0]["V"][0], xarray_utils.LazyValueList)
+
+    # Variables were never loaded in full
+    assert loaded and max(loaded) <= 64
+
+    fin = openNAFile(outfile)
+    fin.readData()
+    assert fin.VMISS == [-999.]
+    np.testing.assert_array_equal(fin.V[0], np.where(np.isnan(temp), -999., temp))
+
+
+def test_nc_to_na_writes_size_limited_volumes_in_parallel():
+    infile = os.path.join(test_outputs, "long_1001_volumes.nc")
+    _write_long_nc(infile, 1000)
+
+    files = {}
+    for workers in (1, 2):
+        outfile = os.path.join(test_outputs, f"long_1001_volumes_{workers}.na")
+        files[workers] = nappy.convertNCToNA(infile, outfile, size_limit=300, workers=workers)
+
+    assert files[2] == [name.replace("_1-", "_2-") for name in files[1]]
+    assert sorted(set(files[2])) == [os.path.join(test_outputs, f"long_1001_volumes_2-{ivol:03d}.na")
+                                     for ivol in range(1, 5)]
+
+    for (serial_file, parallel_file) in zip(files[1], files[2]):
+        with open(serial_file) as serial, open(parallel_file) as parallel:
+            assert parallel.read() == serial.read()
+
+    fin = openNAFile(files[2][-1])
+    assert (fin.IVOL, fin.NVOL) == (4, 4)
+
+
+def test_xarray_to_na_groups_many_variables_by_axis_fingerprints(monkeypatch):
+    from nappy.nc_interface.xarray_to_na import XarrayToNA
+    import nappy.nc_interface.na_content_collector as na_content_collector
+
+    # 500 variables on 5 time axes that all have the same length but different values
+    times = [np.arange(10.) + 100 * n for n in range(5)]
+    ds = xr.Dataset({f"var_{g}_{i}": (f"time_{g}", np.arange(10.) + i, {"units": "1"})
+                     for g in range(5) for i in range(100)},
+                    coords={f"time_{g}": (f"time_{g}", times[g], {"units": "seconds since 2000-01-01"})
+                            for g in range(5)})
+
+    comparisons = []
+    are_axes_identical = xarray_utils.areAxesIdentical
+    def recording_are_axes_identical(ax1, ax2, **kwargs):
+        comparisons.append((ax1.name, ax2.name))
+        return are_axes_identical(ax1, ax2, **kwargs)
+
+    analysed = []
+    collector_init = na_content_collector.NAContentCollector.__init__
+    def recording_init(self, variables, *args, **kwargs):
+        analysed.extend(variables)
+        collector_init(self, variables, *args, **kwargs)
+
+    monkeypatch.setattr(xarray_utils, "areAxesIdentical", recording_are_axes_identical)
+    monkeypatch.setattr(na_content_collector.NAContentCollector, "__init__", recording_init)
+
+    na_dict_list = XarrayToNA([ds[name] for name in ds.data_vars]).convert()
+
+    assert [var_ids[0] for na_dict, var_ids in na_dict_list] == \
+           [[f"var_{g}_{i}" for i in range(100)] for g in range(5)]
+
+    # Each variable is only given to one collector and each axis compared once
+    assert len(analysed) == 500
+    assert len(comparisons) == len(set(comparisons)) == 5
+
+
+def test_xarray_to_na_groups_equal_axes_from_different_datasets():
+    from nappy.nc_interface.xarray_to_na import XarrayToNA
+
+    time = ("time", np.arange(6.), {"units": "seconds since 2000-01-01"})
+    lat = ("lat", [10., 20.], {"units": "degrees_north"})
+
+    def make_dataset(name):
+        return xr.Dataset({f"{name}_2d": (("time", "lat"), np.ones((6, 2)), {"units": "1"}),
+                           f"{name}_1d": ("time", np.arange(6.), {"units": "1"}),
+                           f"{name}_other": ("level", np.arange(3.), {"units": "1"})},
+                          coords={"time": time, "lat": lat,
+                                  "level": ("level", [1., 2., 3.], {"units": "m"})})
+
+    # The axes of the second dataset are held by different Variables with the same values
+    (ds1, ds2) = (make_dataset("a"), make_dataset("b"))
+    variables = [ds1[name] for name in ds1.data_vars] + [ds2[name] for name in ds2.data_vars]
+
+    na_dict_list = XarrayToNA(variables).convert()
+
+    assert [var_ids[:2] for na_dict, var_ids in na_dict_list] == \
+           [[["a_2d", "b_2d"], ["a_1d", "b_1d"]], [["a_other", "b_other"], []]]
+
+
+def test_xarray_to_na_with_second_datetime_axis(tmp_path):
+    from nappy.nc_interface.xarray_to_na import XarrayToNA
+
+    ds = xr.Dataset({"a": ("time", np.arange(4.), {"units": "1"}),
+                     "b": ("t2", np.arange(3.), {"units": "1"})},
+                    coords={"time": ("time", np.arange(4.), {"units": "seconds since 2000-01-01",
+                                                             "standard_name": "time"}),
+                            "t2": ("t2", [0., 1., 3.], {"units": "hours since 2000-01-01"})})
+    nc_file = str(tmp_path / "two_datetime_axes.nc")
+    ds.to_netcdf(nc_file)
+
+    # Each datetime axis is converted to numbers using its own units
+    ds = xr.open_dataset(nc_file, use_cftime=True, decode_timedelta=False)
+    na_dict_list = XarrayToNA([ds["a"], ds["b"]]).convert()
+
+    assert [var_ids[0] for na_dict, var_ids in na_dict_list] == [["a"], ["b"]]
+    assert na_dict_list[0][0]["X"] == [0, 1, 2, 3]
+    assert na_dict_list[1][0]["X"] == [0, 1, 3]
+    assert na_dict_list[1][0]["XNAME"] == ["t2 (hours since 2000-01-01)"]
@@ -0,0 +1,154 @@
+"""
+test_read_performance.py
+========================
+
+Regression benchmarks for reading large NASA Ames files. These guard
+against the data section reader becoming non-linear in the number of lines.
+The tests that compare timings are marked as benchmarks, so they only run
+with ``--run-benchmarks``.
+
+"""
+
+# Import standard library modules
+import os
+import time
+import builtins
+
+import pytest
+
+import nappy
+import nappy.na_file.na_file_1001
+
+from .common import test_outputs, synthetic_1001_header, write_synthetic_1001
+
+
+def _time_read(path):
+    start = time.perf_counter()
+    fin = nappy.openNAFile(path)
+    fin.readData()
+    return fin, time.perf_counter() - start
+
+
+def _recordBlockReads(monkeypatch):
+    "Returns a list that the result of each call of NAFile1001._readDataBlock is appended to."
+    block_reads = []
+    read_data_block = nappy.na_file.na_file_1001.NAFile1001._readDataBlock
+    def recording_read_data_block(self, datalines):
+        block_reads.append(read_data_block(self, datalines))
+        return block_reads[-1]
+
+    monkeypatch.setattr(nappy.na_file.na_file_1001.NAFile1001, "_readDataBlock", recording_read_data_block)
+    return block_reads
+
+
+def test_read_wrapped_1001_records_one_by_one(tmp_path, monkeypatch):
+    "Tests that records wrapped over lines are read record by record through the line cursor."
+    block_reads = _recordBlockReads(monkeypatch)
+    fin, elapsed = _time_read(write_synthetic_1001(str(tmp_path / "wrapped.na"), 1000, wrapped=True))
+    assert block_reads == [False]
+
+    fexp, elapsed = _time_read(write_synthetic_1001(str(tmp_path / "regular.na"), 1000))
+    assert block_reads == [False, True]
+
+    assert list(fin.X) == list(fexp.X)
+    assert [list(v) for v in fin.V] == [list(v) for v in fexp.V]
+
+
+@pytest.mark.benchmark
+def test_read_1001_500k_rows_scales_linearly(monkeypatch):
+    "Tests that reading a 500k record 1001 file record by record costs about 10 times a 50k record file."
+    # Wrapped records cannot be read as a block, so they are read through the line cursor
+    small = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_50k_wrapped.na"), 50000, wrapped=True)
+    large = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_500k_wrapped.na"), 500000, wrapped=True)
+    block_reads = _recordBlockReads(monkeypatch)
+
+    fin, small_time = _time_read(small)
+    assert len(fin.X) == 50000
+    assert block_reads == [False]
+
+    fin, large_time = _time_read(large)
+    assert len(fin.X) == 500000
+    assert len(fin.V) == 2 and len(fin.V[1]) == 500000
+    assert fin.V[1][-1] == 1900 + (499999 % 11)
+    assert block_reads == [False, False]
+
+    # Linear reading gives a ratio near 10; a quadratic reader gives ~100
+    assert large_time / small_time < 30
+
+
+@pytest.mark.benchmark
+def test_read_x_range_from_mmap_index_parses_only_window():
+    "Tests that reading a range of a large 1001 file via the mmap index is fast and correct."
+    path = write_synthetic_1001(os.path.join(test_outputs, "synthetic_1001_500k.na"), 500000)
+    fin, full_time = _time_read(path)
+
+    start = time.perf_counter()
+    fwin = nappy.openNAFile(path, mmap=True)
+    fwin.readData(x_range=(1000.0, 1099.95))
+    window_time = time.perf_counter() - start
+
+    assert len(fwin.X) == 1000
+    assert fwin.X[0] == 1000.0 and fwin.X[-1] == 1099.9
+    assert list(fwin.V[0]) == list(fin.V[0][10000:11000])
+    assert window_time < full_time
+    fwin.close()
+
+
+def test_open_na_file_opens_file_once(tmp_path, monkeypatch):
+    "Tests that opening a file reads its FFI and header through a single file handle."
+    path = write_synthetic_1001(str(tmp_path / "small.na"), 5)
+    opened = []
+
+    builtin_open = builtins.open
+    def recording_open(file, *args, **kwargs):
+        opened.append(file)
+        return builtin_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", recording_open)
+
+    fin = nappy.openNAFile(path)
+    fin.close()
+    assert fin.VNAME == ["CO2 (ppm)", "CH4 (ppb)"]
+    assert opened == [path]
+
+
+@pytest.mark.benchmark
+def test_open_10k_small_files(tmp_path):
+    "Micro-benchmark: opens (and reads the header of) 10,000 small 1001 files."
+    paths = [write_synthetic_1001(str(tmp_path / ("small_%05d.na" % i)), 5) for i in range(10000)]
+
+    start = time.perf_counter()
+    for path in paths:
+        fin = nappy.openNAFile(path)
+        fin.close()
+    elapsed = time.perf_counter() - start
+
+    print("\nOpened 10,000 small files in %.2fs (%.3f ms per file)" % (elapsed, elapsed / 10.))
+    assert fin.VNAME == ["CO2 (ppm)", "CH4 (ppb)"]
+
+
+@pytest.mark.benchmark
+def test_read_selected_variables_of_wide_file():
+    "Tests that reading 3 of 100 variables is quicker than reading them all."
+    path = os.path.join(test_outputs, "synthetic_1001_wide.na")
+    nvars = 100
+    header = synthetic_1001_header.replace("16    1001", "%d    1001" % (14 + nvars)).split("\n")
+    header[9:14] = (["%d" % nvars, "    ".join(["1.0"] * nvars), "    ".join(["-9999"] * nvars)] +
+                    ["VAR_%d (units)" % n for n in range(nvars)])
+
+    with open(path, "w") as fh:
+        fh.write("\n".join(header))
+        fh.writelines("%d    " % i + "    ".join(["%.2f" % (i + n / 100.) for n in range(nvars)]) + "\n"
+                      for i in range(20000))
+
+    fin, full_time = _time_read(path)
+    assert len(fin.V) == nvars
+
+    start = time.perf_counter()
+    fsel = nappy.openNAFile(path)
+    fsel.readData(variables=["VAR_97", "VAR_3", "VAR_50"])
+    select_time = time.perf_counter() - start
+
+    assert fsel.var_numbers == [97, 3, 50]
+    assert list(fsel.V[0]) == list(fin.V[97]) and list(fsel.V[2]) == list(fin.V[50])
+    assert select_time < full_time
@@ -6,7 +6,8 @@ from .common import MINI_BADC_DIR
 from nappy.nc_interface.xarray_to_na import XarrayDatasetToNA
 
 from nappy.nc_interface.xarray_utils import (getBestName, getMissingValue, isUniformlySpaced,
-                                             areAxesIdentical, isAxisRegularlySpacedSubsetOf)
+                                             areAxesIdentical, isAxisRegularlySpacedSubsetOf,
+                                             getArrayAsList, LazyValueList, AxisCache)
 
 temp_nc = MINI_BADC_DIR / "cru/data/cru_ts/cru_ts_4.04/data/tmp/cru_ts4.04.1901.2019.tmp.dat.nc"
 wet_nc = MINI_BADC_DIR / "cru/data/cru_ts/cru_ts_4.04/data/wet/cru_ts4.04.1901.2019.wet.dat.nc"
@@ -56,3 +57,51 @@ def test_isAxisRegularlySpacedSubsetOf(load_ceda_test_data):
     ax1, ax2 = temp.lon, temp.lon[:-2]
     assert isAxisRegularlySpacedSubsetOf(ax2, ax1) == False
 
+
+def test_LazyValueList_matches_getArrayAsList(monkeypatch):
+    monkeypatch.setattr(LazyValueList, "chunk_size", 7)
+    data = np.arange(60, dtype=np.float32).reshape(20, 3) / 3
+    data[[0, 8, 19], 1] = np.nan
+    da = xr.DataArray(data, dims=("x", "y"), name="v")
+
+    expected = getArrayAsList(da, missing_value=-1.e20)
+    values = LazyValueList(da, missing_value=-1.e20)
+
+    assert len(values) == 20
+    assert list(values) == expected
+    assert values.tolist() == expected
+    assert values[3:17] == expected[3:17]
+    assert [values[i] for i in (19, 0, 8, 9, -1)] == [expected[i] for i in (19, 0, 8, 9, -1)]
+
+
+def test_AxisCache_shares_axis_between_variables():
+    ds = xr.Dataset({"a": ("x", np.arange(5.)), "b": ("x", np.ones(5))},
+                    coords={"x": [0., 0.5, 1., 1.5, 2.], "y": ("y", [1, 2, 4])})
+    cache = AxisCache()
+
+    assert cache.getIncrement(ds["a"].coords["x"]) == 0.5
+    assert cache.getValues(ds["b"].coords["x"]) is cache.getValues(ds["a"].coords["x"])
+    assert len(cache._axes) == 1
+
+    # Irregular axes have no increment
+    assert cache.getIncrement(ds.y) is None
+    assert cache.getValues(ds.y).tolist() == [1, 2, 4]
+
+
+def test_LazyValueList_and_list_windows_do_not_copy_values():
+    import pickle
+    from nappy.utils.common_utils import ListWindow, getListWindow
+
+    data = np.arange(20.)
+    data[5] = np.nan
+    values = LazyValueList(xr.DataArray(data, dims="x"), missing_value=-999.)
+
+    window = getListWindow(values, 4, 9)
+    assert isinstance(window, LazyValueList) and np.shares_memory(window.da.values, data)
+    assert list(window) == [4., -999., 6., 7., 8.]
+
+    items = list(range(20))
+    window = getListWindow(items, 15, 25)
+    assert isinstance(window, ListWindow) and window.values is items
+    assert (len(window), list(window), window[-1], window[1:3]) == (5, items[15:], 19, [16, 17])
+    assert pickle.loads(pickle.dumps(window)) == items[15:]